@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from loguru import logger
+from typing import Any, Dict, List, Optional
+
+# The ICache class is an abstract base class for the key-value stores the account cache can be kept in.
+# Values are plain JSON-compatible data; entries expire after the time-to-live the backend was configured with.
+class ICache(ABC):
+
+    # Initializes the cache with a URN for tracking and a logger bound to it.
+    def __init__(self, urn: str = None) -> None:
+        self.urn = urn
+        self.logger = logger.bind(urn=self.urn)
+
+    # Return the value stored for the key, or None if it is missing or expired.
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        pass
+
+    # Return the values stored for the keys in order, with None for every missing or expired key.
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        pass
+
+    # Store the values of all the given keys.
+    @abstractmethod
+    async def set_many(self, values: Dict[str, Any]) -> None:
+        pass
+
+    # Store the values of all the given keys, except where the cached value has a higher version than the new one.
+    # Every value is a dictionary holding its version, an integer that grows with every change, under version_field.
+    # The comparison and the write are atomic per key, so writes landing out of order never replace a newer value with an older one.
+    @abstractmethod
+    async def set_many_if_newer(self, values: Dict[str, dict], version_field: str) -> None:
+        pass
+
+    # Remove the entries of the given keys, if any.
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    # Release any resources held by the cache.
+    async def close(self) -> None:
+        pass
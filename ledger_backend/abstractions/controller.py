@@ -2,7 +2,7 @@ from abc import ABC
 #
 from errors.bad_input_error import BadInputError
 #
-from start_utils import db_session, logger
+from start_utils import logger
 #
 from utilities.dictionary import DictionaryUtility
 
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from loguru import logger
+
+# The IEmailTransport class is an abstract base class for the ways the notification dispatcher can deliver emails.
+# Implementations may keep a connection open between messages; close() releases it when the dispatcher stops.
+class IEmailTransport(ABC):
+
+    # Initializes the transport with a URN for tracking and a logger bound to it.
+    def __init__(self, urn: str = None) -> None:
+        self.urn = urn
+        self.logger = logger.bind(urn=self.urn)
+
+    # Open the connection messages are sent over if it is not open yet, raising an exception if the server cannot be reached.
+    def open(self) -> None:
+        pass
+
+    # Deliver one message, raising an exception if it could not be delivered.
+    @abstractmethod
+    def send(self, message: EmailMessage) -> None:
+        pass
+
+    # Release any resources held between messages.
+    def close(self) -> None:
+        pass
@@ -1,4 +1,5 @@
 from abc import ABC
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from start_utils import logger
 
@@ -8,8 +9,10 @@ class IService(ABC):
 
     # This constructor binds the URN, user URN, and API name to the service, allowing for context-specific logging.
     # The logger is configured to log information about the particular service execution using these attributes.
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
+    # The db_session is the request-scoped async session opened by DBSessionMiddleware and shared by the service's repositories.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
         self.logger = logger.bind(urn=self.urn, user_urn=self.user_urn, api_name=self.api_name)
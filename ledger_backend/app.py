@@ -1,7 +1,8 @@
 # Import necessary modules and libraries
 import cgi
 import ulid
-import uvicorn
+
+from contextlib import asynccontextmanager
 
 # Import FastAPI and necessary FastAPI components
 from fastapi import FastAPI
@@ -21,22 +22,56 @@ from loguru import logger
 
 # Import routers from your application controllers
 from controllers.apis import router as APIsRouter
+from controllers.metrics import router as MetricsRouter
 from controllers.user import router as UserRouter
 
-# Import custom middlewares for authentication and request context
+# Import custom middlewares for authentication, database sessions, request context and metrics
 from middlewares.authetication import AuthenticationMiddleware
+from middlewares.db_session import DBSessionMiddleware
+from middlewares.metrics import MetricsMiddleware
 from middlewares.request_context import RequestContextMiddleware
 
 # Import and configure CORS middleware to allow cross-origin resource sharing
 from fastapi.middleware.cors import CORSMiddleware  # Import CORSMiddleware
 
-# Import database utilities for creating tables
-from start_utils import Base, engine
-# Create tables in the database
-Base.metadata.create_all(engine)
+# Import the email transport factory and the dispatcher delivering the notification outbox
+from factories.email_transport import EmailTransportFactory
+from workers.notification_dispatcher import NotificationDispatcher
+
+# Import the startup and shutdown steps of the database and the shared caches
+from start_utils import account_cache, currency_registry, dispose_database, initialize_database, logout_cache, NOTIFICATION_DISPATCHER_ENABLED, NOTIFICATION_TRANSPORT
+
+# Prepare every worker for serving requests, and release its resources when it stops
+# The database is only contacted here, not when the app is imported: the currencies are loaded
+# The currency registry and the notification dispatcher run alongside the app for as long as it serves requests
+# The account and logout caches are closed on shutdown, releasing their connections when they are backed by Redis
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    await initialize_database()
+    currency_registry.start()
+
+    notification_dispatcher = None
+    if NOTIFICATION_DISPATCHER_ENABLED:
+        notification_dispatcher = NotificationDispatcher(
+            transport=EmailTransportFactory().build(name=NOTIFICATION_TRANSPORT)
+        )
+        notification_dispatcher.start()
+
+    # Shut down even when the lifespan is left with an error, so that no connection threads keep the process alive
+    try:
+        yield
+    finally:
+        if notification_dispatcher:
+            await notification_dispatcher.stop()
+
+        await currency_registry.stop()
+        await account_cache.close()
+        await logout_cache.close()
+        await dispose_database()
 
 # Initialize FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS middleware to allow cross-origin requests from frontend
 app.add_middleware(
@@ -103,9 +138,13 @@ app.add_middleware(
 
 # Log the initialization of the middleware stack
 logger.debug("Initialising middleware stack")
-# Add custom authentication and request context middlewares
+# Add custom authentication, database session, request context and metrics middlewares
+# Middlewares added later wrap the earlier ones, so the session is open before authentication runs
+# and the metrics middleware, added last, measures the whole stack
 app.add_middleware(AuthenticationMiddleware)
+app.add_middleware(DBSessionMiddleware)
 app.add_middleware(RequestContextMiddleware)
+app.add_middleware(MetricsMiddleware)
 logger.debug("Initialised middleware stack")
 
 # Log the initialization of the routers
@@ -114,9 +153,13 @@ logger.debug("Initialising routers")
 app.include_router(UserRouter)
 # Include the APIs router for other API-related endpoints
 app.include_router(APIsRouter)
+# Include the metrics router exposing the worker's metrics to Prometheus
+app.include_router(MetricsRouter)
 logger.debug("Initialised routers")
 
 # Main entry point for the FastAPI app
 if __name__ == '__main__':
-    # Run the application using uvicorn, with hot-reloading enabled
-    uvicorn.run("app:app", port=8002, host='127.0.0.1', reload=True)
+    # Run the application in the mode set by SERVER_MODE, with hot-reloading in development mode only
+    # server.py accepts the same settings as command-line options
+    from server import run
+    run()
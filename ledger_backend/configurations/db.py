@@ -34,9 +34,17 @@ class DBConfiguration:
 
     def get_config(self):
         return DBConfigurationDTO(
+            dialect=self.config.get("dialect", "mysql"),
+            driver=self.config.get("driver", "pymysql"),
+            async_driver=self.config.get("async_driver", "aiomysql"),
             user_name=self.config.get("user_name", {}),
             password=self.config.get("password", {}),
             host=self.config.get("host", {}),
             port=self.config.get("port", {}),
             database=self.config.get("database", {}),
+            pool_size=self.config.get("pool_size", 10),
+            max_overflow=self.config.get("max_overflow", 20),
+            pool_timeout=self.config.get("pool_timeout", 30),
+            pool_recycle=self.config.get("pool_recycle", 1800),
+            pool_pre_ping=self.config.get("pool_pre_ping", True),
         )
\ No newline at end of file
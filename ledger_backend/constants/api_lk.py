@@ -12,9 +12,13 @@ class APILK:
     # C
     CREATE_ACCOUNT: Final[str] = "CREATE_ACCOUNT"
     CREATE_TRANSACTION: Final[str] = "CREATE_TRANSACTION"
+    CREATE_TRANSACTIONS: Final[str] = "CREATE_TRANSACTIONS"
     # D
     # E
     # F
+    FETCH_BALANCE_AT: Final[str] = "FETCH_BALANCE_AT"
+    FETCH_STATEMENT_EXPORT: Final[str] = "FETCH_STATEMENT_EXPORT"
+    FETCH_SUMMARY: Final[str] = "FETCH_SUMMARY"
     # G
     # H
     # I
@@ -0,0 +1,13 @@
+from typing import Final, Set
+
+# This class defines the backends the account cache can be stored in.
+# MEMORY keeps the entries in the worker process, REDIS shares them between all workers through a Redis server.
+class CacheBackend:
+
+    MEMORY: Final[str] = "memory"
+    REDIS: Final[str] = "redis"
+
+    ALL: Final[Set[str]] = {
+        MEMORY,
+        REDIS,
+    }
@@ -0,0 +1,10 @@
+from typing import Final
+
+# This class defines the formats of the keys stored in the account and session caches.
+# ACCOUNT holds an account with its balances, USER_ACCOUNTS the URNs of all accounts of a user with their number as version,
+# USER_LOGOUT the time of the user's last logout.
+class CacheKey:
+
+    ACCOUNT: Final[str] = "account:{account_urn}"
+    USER_ACCOUNTS: Final[str] = "user_accounts:{user_id}"
+    USER_LOGOUT: Final[str] = "user_logout:{user_id}"
@@ -5,6 +5,9 @@ class Table:
 
     USER: Final[str] = "user"
     ACCOUNT: Final[str] = "account"
+    ACCOUNT_DAILY_ROLLUP: Final[str] = "account_daily_rollup"
+    BALANCE_CHECKPOINT: Final[str] = "balance_checkpoint"
     BALANCES: Final[str] = "balances"
     CURRENCY_LK : Final[str] = "currency_lk"
+    NOTIFICATION_OUTBOX: Final[str] = "notification_outbox"
     TRANSACTION: Final[str] = "transaction"
\ No newline at end of file
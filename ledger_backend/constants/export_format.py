@@ -0,0 +1,20 @@
+from typing import Dict, Final, Set
+
+# This class defines the file formats a statement can be exported in, and the media type each one is served with.
+class ExportFormat:
+
+    CSV: Final[str] = "csv"
+    NDJSON: Final[str] = "ndjson"
+
+    ALL: Final[Set[str]] = {
+        CSV,
+        NDJSON,
+    }
+
+    MEDIA_TYPES: Final[Dict[str, str]] = {
+        CSV: "text/csv",
+        NDJSON: "application/x-ndjson",
+    }
+
+    # Number of rows fetched from the database per round-trip while streaming an export
+    YIELD_PER: Final[int] = 1000
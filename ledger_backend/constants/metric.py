@@ -0,0 +1,13 @@
+from typing import Final
+
+# This class defines the names of the metrics exposed in Prometheus text format on /metrics.
+# Durations are in seconds, following the Prometheus naming conventions, and every name carries the fintrack_ prefix.
+class Metric:
+
+    REPOSITORY_METHOD_DURATION_SECONDS: Final[str] = "fintrack_repository_method_duration_seconds"
+    HTTP_REQUEST_DURATION_SECONDS: Final[str] = "fintrack_http_request_duration_seconds"
+    HTTP_REQUEST_QUERIES: Final[str] = "fintrack_http_request_queries"
+    DB_QUERIES_TOTAL: Final[str] = "fintrack_db_queries_total"
+    DB_POOL_SIZE: Final[str] = "fintrack_db_pool_size"
+    DB_POOL_CHECKED_OUT: Final[str] = "fintrack_db_pool_checked_out"
+    DB_POOL_OVERFLOW: Final[str] = "fintrack_db_pool_overflow"
@@ -0,0 +1,11 @@
+from typing import Final
+
+# This class defines the delivery states of a notification in the outbox.
+# Notifications start as PENDING, are SENDING while a dispatcher holds their lease, become SENT once delivered,
+# and FAILED once every delivery attempt has been used.
+class NotificationStatus:
+
+    PENDING: Final[str] = "PENDING"
+    SENDING: Final[str] = "SENDING"
+    SENT: Final[str] = "SENT"
+    FAILED: Final[str] = "FAILED"
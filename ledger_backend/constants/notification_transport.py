@@ -0,0 +1,13 @@
+from typing import Final, Set
+
+# This class defines the transports the notification dispatcher can deliver emails with.
+# SMTP delivers through an SMTP server (for example Gmail, or a local SMTP stub), LOG only writes the emails to the log.
+class NotificationTransport:
+
+    LOG: Final[str] = "log"
+    SMTP: Final[str] = "smtp"
+
+    ALL: Final[Set[str]] = {
+        LOG,
+        SMTP,
+    }
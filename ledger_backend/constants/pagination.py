@@ -0,0 +1,7 @@
+from typing import Final
+
+# This class defines the page sizes used by APIs that return keyset-paginated results.
+class Pagination:
+
+    DEFAULT_LIMIT: Final[int] = 100
+    MAX_LIMIT: Final[int] = 1000
@@ -0,0 +1,13 @@
+from typing import Final, Set
+
+# This class defines the modes the server can be launched in.
+# DEVELOPMENT runs one worker that reloads on code changes, PRODUCTION runs several workers on uvloop and httptools.
+class ServerMode:
+
+    DEVELOPMENT: Final[str] = "development"
+    PRODUCTION: Final[str] = "production"
+
+    ALL: Final[Set[str]] = {
+        DEVELOPMENT,
+        PRODUCTION,
+    }
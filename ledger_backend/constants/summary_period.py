@@ -0,0 +1,12 @@
+from typing import Final, Set
+
+# This class defines the periods an account summary can be grouped by, each built from the account's daily rollups.
+class SummaryPeriod:
+
+    DAY: Final[str] = "DAY"
+    MONTH: Final[str] = "MONTH"
+
+    ALL: Final[Set[str]] = {
+        DAY,
+        MONTH,
+    }
@@ -0,0 +1,12 @@
+from typing import Final, Set
+
+# This class defines the types of a transaction as seen from the account whose statement is being read.
+class TransactionType:
+
+    CREDIT: Final[str] = "CREDIT"
+    DEBIT: Final[str] = "DEBIT"
+
+    ALL: Final[Set[str]] = {
+        CREDIT,
+        DEBIT,
+    }
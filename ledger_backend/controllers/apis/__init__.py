@@ -2,9 +2,13 @@ from fastapi import APIRouter
 #
 from controllers.apis.create.account import CreateAccountController
 from controllers.apis.create.transaction import CreateTransactionController
+from controllers.apis.create.transactions import CreateTransactionsController
 from controllers.apis.fetch.statement import FetchStatementController
+from controllers.apis.fetch.statement_export import FetchStatementExportController
+from controllers.apis.fetch.summary import FetchSummaryController
 from controllers.apis.fetch.account import FetchAccountController
 from controllers.apis.fetch.account_usr import FetchUsrAccountController
+from controllers.apis.fetch.balance_at import FetchBalanceAtController
 #
 from start_utils import logger
 
@@ -30,6 +34,15 @@ router.add_api_route(
 )
 logger.debug(f"Registered {CreateTransactionController.__name__} route.")
 
+# Register the CreateTransactionsController's route for creating a batch of transactions
+logger.debug(f"Registering {CreateTransactionsController.__name__} route.")
+router.add_api_route(
+    path="/create/transactions",  # Route for creating many transactions at once
+    endpoint=CreateTransactionsController().post,  # The POST method handler from the CreateTransactionsController
+    methods=["POST"]  # HTTP method supported by this route
+)
+logger.debug(f"Registered {CreateTransactionsController.__name__} route.")
+
 # Register the FetchStatementController's route for fetching a statement
 logger.debug(f"Registering {FetchStatementController.__name__} route.")
 router.add_api_route(
@@ -39,6 +52,24 @@ router.add_api_route(
 )
 logger.debug(f"Registered {FetchStatementController.__name__} route.")
 
+# Register the FetchStatementExportController's route for exporting a full statement as a file
+logger.debug(f"Registering {FetchStatementExportController.__name__} route.")
+router.add_api_route(
+    path="/fetch/statement/export",  # Route for streaming a statement export
+    endpoint=FetchStatementExportController().get,  # The GET method handler from the FetchStatementExportController
+    methods=["POST"]  # HTTP method supported by this route (intentionally POST here)
+)
+logger.debug(f"Registered {FetchStatementExportController.__name__} route.")
+
+# Register the FetchSummaryController's route for fetching an account summary over a date range
+logger.debug(f"Registering {FetchSummaryController.__name__} route.")
+router.add_api_route(
+    path="/fetch/summary",  # Route for fetching an account summary
+    endpoint=FetchSummaryController().get,  # The GET method handler from the FetchSummaryController
+    methods=["POST"]  # HTTP method supported by this route (intentionally POST here)
+)
+logger.debug(f"Registered {FetchSummaryController.__name__} route.")
+
 # Register the FetchAccountController's route for fetching an account
 logger.debug(f"Registering {FetchAccountController.__name__} route.")
 router.add_api_route(
@@ -56,3 +87,12 @@ router.add_api_route(
     methods=["GET"]  # HTTP method supported by this route
 )
 logger.debug(f"Registered {FetchUsrAccountController.__name__} route.")
+
+# Register the FetchBalanceAtController's route for fetching the balance of an account at a past instant
+logger.debug(f"Registering {FetchBalanceAtController.__name__} route.")
+router.add_api_route(
+    path="/fetch/balance-at",  # Route for fetching the balance of an account at an instant
+    endpoint=FetchBalanceAtController().get,  # The GET method handler from the FetchBalanceAtController
+    methods=["POST"]  # HTTP method supported by this route (intentionally POST here)
+)
+logger.debug(f"Registered {FetchBalanceAtController.__name__} route.")
@@ -1,6 +1,5 @@
 from datetime import datetime
 from fastapi import Request
-from fastapi.responses import JSONResponse
 from http import HTTPStatus
 #
 from abstractions.controller import IController
@@ -18,6 +17,7 @@ from errors.unexpected_response_error import UnexpectedResponseError
 from services.apis.create.account import CreateAccountService
 #
 from utilities.dictionary import DictionaryUtility
+from utilities.orjson_response import ORJSONResponse
 
 
 class CreateAccountController(IController):
@@ -69,7 +69,8 @@ class CreateAccountController(IController):
             response_dto: BaseResponseDTO = await CreateAccountService(
                 urn=self.urn,
                 user_urn=self.user_urn,
-                api_name=self.api_name
+                api_name=self.api_name,
+                db_session=request.state.db_session
             ).run(
                 data=self.request_payload  # Pass the updated request payload to the service
             )
@@ -114,7 +115,7 @@ class CreateAccountController(IController):
             self.logger.debug("Prepared response metadata")
 
         # Return the final JSON response with the appropriate status code and content
-        return JSONResponse(
-            content=response_dto.to_dict(),
+        return ORJSONResponse(
+            content=response_dto,
             status_code=http_status_code
         )
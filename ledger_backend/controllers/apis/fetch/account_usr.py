@@ -1,5 +1,4 @@
 from fastapi import Request
-from fastapi.responses import JSONResponse
 from http import HTTPStatus
 #
 from abstractions.controller import IController
@@ -17,6 +16,7 @@ from errors.unexpected_response_error import UnexpectedResponseError
 from services.apis.fetch.account_usr import FetchUsrAccountService
 #
 from utilities.dictionary import DictionaryUtility
+from utilities.orjson_response import ORJSONResponse
 
 
 class FetchUsrAccountController(IController):
@@ -51,7 +51,8 @@ class FetchUsrAccountController(IController):
             response_dto: BaseResponseDTO = await FetchUsrAccountService(
                 urn=self.urn,
                 user_urn=self.user_urn,
-                api_name=self.api_name
+                api_name=self.api_name,
+                db_session=request.state.db_session
             ).run(
                 data=self.request_payload  # Pass the updated payload to the service
             )
@@ -96,7 +97,7 @@ class FetchUsrAccountController(IController):
             self.logger.debug("Prepared response metadata")
 
         # Return the final JSON response with the appropriate status code and content
-        return JSONResponse(
-            content=response_dto.to_dict(),  
+        return ORJSONResponse(
+            content=response_dto,  
             status_code=http_status_code  
         )
@@ -1,6 +1,5 @@
 from datetime import datetime
 from fastapi import Request
-from fastapi.responses import JSONResponse
 from http import HTTPStatus
 #
 from abstractions.controller import IController
@@ -18,6 +17,7 @@ from errors.unexpected_response_error import UnexpectedResponseError
 from services.apis.fetch.statement import FetchStatementService
 #
 from utilities.dictionary import DictionaryUtility
+from utilities.orjson_response import ORJSONResponse
 
 
 class FetchStatementController(IController):
@@ -69,7 +69,8 @@ class FetchStatementController(IController):
             response_dto: BaseResponseDTO = await FetchStatementService(
                 urn=self.urn,  # Pass URN for tracking
                 user_urn=self.user_urn,  # Pass the user's URN
-                api_name=self.api_name  # Pass the API name for logging
+                api_name=self.api_name,  # Pass the API name for logging
+                db_session=request.state.db_session
             ).run(
                 data=self.request_payload  # Provide the updated request payload to the service
             )
@@ -114,7 +115,7 @@ class FetchStatementController(IController):
             self.logger.debug("Prepared response metadata")
 
         # Return the final JSON response with the appropriate status code and content
-        return JSONResponse(
-            content=response_dto.to_dict(),  # Convert response DTO to a dictionary
+        return ORJSONResponse(
+            content=response_dto,  # The response DTO is serialized by the response
             status_code=http_status_code  # Set the status code for the response
         )
@@ -0,0 +1,129 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from http import HTTPStatus
+from typing import AsyncIterator
+#
+from abstractions.controller import IController
+#
+from constants.api_lk import APILK
+from constants.api_status import APIStatus
+from constants.export_format import ExportFormat
+#
+from dtos.requests.apis.fetch.statement_export import FetchStatementExportRequestDTO
+#
+from dtos.responses.base import BaseResponseDTO
+#
+from errors.bad_input_error import BadInputError
+from errors.unexpected_response_error import UnexpectedResponseError
+#
+from services.apis.fetch.statement_export import FetchStatementExportService
+#
+from utilities.dictionary import DictionaryUtility
+from utilities.orjson_response import ORJSONResponse
+
+
+class FetchStatementExportController(IController):
+
+    # Constructor to initialize the controller and set the API name
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.api_name = APILK.FETCH_STATEMENT_EXPORT
+
+    # GET method to handle exporting a full statement as a streamed file
+    async def get(self, request: Request, request_payload: FetchStatementExportRequestDTO):
+
+        # Fetch and log the request URN for tracking
+        self.logger.debug("Fetching request URN")
+        self.urn = request.state.urn  # Retrieve the request's URN from state
+        self.user_id = getattr(request.state, "user_id", None)  # Get user_id from the request state
+        self.user_urn = getattr(request.state, "user_urn", None)  # Get user_urn from the request state
+        self.logger = self.logger.bind(urn=self.urn, user_urn=self.user_urn, api_name=self.api_name)  # Bind logger
+        self.dictionary_utility = DictionaryUtility(urn=self.urn)  # Initialize dictionary utility
+
+        try:
+            # Validate the incoming request payload
+            self.logger.debug("Validating request")
+            self.request_payload = request_payload.model_dump()  # Dump the request payload into a dictionary
+
+            ## Validate the original request using request details
+            await self.validate_request(
+                urn=self.urn,  # Pass the URN for tracking
+                user_urn=self.user_urn,  # Pass the user's URN
+                request_payload=self.request_payload,  # Payload for validation
+                request_headers=dict(request.headers.mutablecopy()),  # Log the request headers
+                api_name=self.api_name,  # API name for reference
+                user_id=self.user_id  # Pass the user ID
+            )
+            self.logger.debug("Validated request")
+
+            # Modify the request payload after validation
+            self.logger.debug("Updating request payload")
+            self.request_payload.update(
+                {
+                    "user_id": self.user_id,  # Update with user_id from the state
+                    "user_urn": self.user_urn  # Update with user_urn from the state
+                }
+            )
+            self.logger.debug("Updated request payload")
+
+            # Call the service to validate the export and obtain the streamed file content
+            self.logger.debug("Running fetch statement export service")
+            content: AsyncIterator[bytes] = await FetchStatementExportService(
+                urn=self.urn,  # Pass URN for tracking
+                user_urn=self.user_urn,  # Pass the user's URN
+                api_name=self.api_name,  # Pass the API name for logging
+                db_session=request.state.db_session
+            ).run(
+                data=self.request_payload  # Provide the updated request payload to the service
+            )
+
+            # Stream the file to the client as it is read from the database
+            export_format = self.request_payload.get("format") or ExportFormat.NDJSON
+            return StreamingResponse(
+                content=content,  # Chunks of the encoded file
+                status_code=HTTPStatus.OK,  # Set HTTP status code to 200 OK
+                media_type=ExportFormat.MEDIA_TYPES[export_format],  # Media type of the chosen format
+                headers={
+                    "Content-Disposition": f'attachment; filename="statement_{self.request_payload.get("account_urn")}.{export_format}"'
+                }
+            )
+
+        # Handle specific known errors (BadInputError and UnexpectedResponseError)
+        except (BadInputError, UnexpectedResponseError) as err:
+
+            self.logger.error(f"{err.__class__} error occurred while exporting statement: {err}")
+            self.logger.debug("Preparing response metadata")
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,  # Include the transaction URN
+                status=APIStatus.FAILED,  # Mark the status as failed
+                response_message=err.response_message,  # Provide the error message
+                response_key=err.response_key,  # Error key for specific failure
+                data={},  # No data in case of failure
+                error={}  # No error details to expose
+            )
+            http_status_code = err.http_status_code  # Set the error's HTTP status code
+            self.logger.debug("Prepared response metadata")
+
+        # Handle general exceptions
+        except Exception as err:
+
+            self.logger.error(f"{err.__class__} error occurred while exporting statement: {err}")
+
+            # Prepare a general error response for internal server errors
+            self.logger.debug("Preparing response metadata")
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,  # Include the transaction URN
+                status=APIStatus.FAILED,  # Mark the status as failed
+                response_message="Failed to export statement.",  # General error message
+                response_key="error_internal_server_error",  # Error key for internal server error
+                data={},  # No data in case of failure
+                error={}  # No error details to expose
+            )
+            http_status_code = HTTPStatus.INTERNAL_SERVER_ERROR  # Set HTTP status to 500
+            self.logger.debug("Prepared response metadata")
+
+        # Return the JSON error response with the appropriate status code and content
+        return ORJSONResponse(
+            content=response_dto,  # The response DTO is serialized by the response
+            status_code=http_status_code  # Set the status code for the response
+        )
@@ -0,0 +1,23 @@
+# Import FastAPI's APIRouter for handling routes
+from fastapi import APIRouter
+
+# Import the controller exposing the metrics
+from controllers.metrics.metrics import MetricsController
+
+# Import logger for logging information
+from start_utils import logger
+
+# Create an APIRouter without a prefix, as Prometheus scrapes /metrics by default
+router = APIRouter()
+
+# Log the registration of the MetricsController route
+logger.debug(f"Registering {MetricsController.__name__} route.")
+# Add a route for the metrics (GET request), left out of the OpenAPI schema as it is not part of the API
+router.add_api_route(
+    path="/metrics",  # The URL path for the metrics route
+    endpoint=MetricsController().get,  # The controller method handling the request
+    methods=["GET"],  # HTTP method used for the route
+    include_in_schema=False
+)
+# Log that the metrics route has been registered
+logger.debug(f"Registered {MetricsController.__name__} route.")
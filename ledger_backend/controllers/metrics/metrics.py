@@ -0,0 +1,22 @@
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+#
+from abstractions.controller import IController
+#
+from utilities.metrics import MetricsRegistry
+
+
+class MetricsController(IController):
+
+    # Constructor to initialize the controller with the URN and the metrics registry of the worker
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.metrics_registry = MetricsRegistry()
+
+    # GET method returning the metrics of this worker in Prometheus text format
+    async def get(self, request: Request):
+
+        return PlainTextResponse(
+            content=self.metrics_registry.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
@@ -2,7 +2,6 @@ import json
 #
 from datetime import datetime
 from fastapi import Request
-from fastapi.responses import JSONResponse
 from http import HTTPStatus
 #
 from abstractions.controller import IController
@@ -20,6 +19,7 @@ from errors.unexpected_response_error import UnexpectedResponseError
 from services.user.logout import UserLogoutService
 #
 from utilities.dictionary import DictionaryUtility
+from utilities.orjson_response import ORJSONResponse
 
 
 # LogoutController handles the process of logging out users by validating the request and calling the logout service
@@ -64,7 +64,8 @@ class LogoutController(IController):
             response_payload = await UserLogoutService(
                 urn=self.urn,
                 user_urn=self.user_urn,
-                api_name=self.api_name
+                api_name=self.api_name,
+                db_session=request.state.db_session
             ).run(
                 data=self.request_payload
             )
@@ -117,7 +118,7 @@ class LogoutController(IController):
             self.logger.debug("Prepared response metadata")
 
         # Return the final JSON response with the appropriate status code and response data
-        return JSONResponse(
-            content=response_dto.to_dict(),
+        return ORJSONResponse(
+            content=response_dto,
             status_code=http_status_code
         )
@@ -2,7 +2,6 @@ import json
 #
 from datetime import datetime
 from fastapi import Request
-from fastapi.responses import JSONResponse
 from http import HTTPStatus
 #
 from abstractions.controller import IController
@@ -20,6 +19,7 @@ from errors.unexpected_response_error import UnexpectedResponseError
 from services.user.register import UserRegistrationService
 #
 from utilities.dictionary import DictionaryUtility
+from utilities.orjson_response import ORJSONResponse
 
 # The RegisterController class is responsible for handling the registration process for new users.
 class RegisterController(IController):
@@ -59,7 +59,8 @@ class RegisterController(IController):
             user_registration_service = UserRegistrationService(
                 urn=self.urn,
                 user_urn=self.user_urn,
-                api_name=self.api_name
+                api_name=self.api_name,
+                db_session=request.state.db_session
             )
             response_payload: dict = await user_registration_service.run(
                 data=request_payload.model_dump()
@@ -113,7 +114,7 @@ class RegisterController(IController):
             self.logger.debug("Prepared response metadata")
 
         # Return the final JSON response with the appropriate status code and response data
-        return JSONResponse(
-            content=response_dto.to_dict(),
+        return ORJSONResponse(
+            content=response_dto,
             status_code=http_status_code
         )
@@ -2,9 +2,19 @@ from dataclasses import dataclass
 
 @dataclass
 class DBConfigurationDTO:
+    dialect: str
+    driver: str
+    async_driver: str
     user_name: str
     password: str
     host: str
     port: int
     database: str
+    pool_size: int
+    max_overflow: int
+    pool_timeout: int
+    pool_recycle: int
+    pool_pre_ping: bool
 # This class defines a Data Transfer Object (DTO) for database configuration settings.
+# The driver is used by the synchronous engine and async_driver by the asyncio engine serving requests.
+# The pool_* fields size the connection pool shared by the request-scoped sessions.
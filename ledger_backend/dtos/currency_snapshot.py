@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+@dataclass(frozen=True)
+class CurrencySnapshotDTO:
+    version: Tuple = None
+    by_id: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    by_name: Mapping = field(default_factory=lambda: MappingProxyType({}))
+# This class defines an immutable snapshot of the currency lookup table held by the currency registry.
+# by_id and by_name map the currency id and name to the CurrencyLK record, and version identifies the table state they were loaded from.
+# A snapshot is never changed once built: a refresh builds a new snapshot and replaces the registry's reference to it.
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+#
+from dtos.requests.apis.base import BaseRequestDTO
+
+# DTO class for one transfer of a Create Transactions request, with the same fields as a Create Transaction request.
+# The purpose of the request applies to every transfer that does not set its own.
+class CreateTransactionsItemDTO(BaseModel):
+
+    payee_account_urn: Optional[str]
+    payer_account_urn: Optional[str]
+    amount: float
+    purpose: Optional[str] = None
+
+# DTO class for the Create Transactions request, containing the list of transfers to create together.
+class CreateTransactionsRequestDTO(BaseRequestDTO):
+
+    transactions: List[CreateTransactionsItemDTO]
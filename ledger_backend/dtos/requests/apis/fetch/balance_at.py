@@ -0,0 +1,10 @@
+from datetime import datetime
+#
+from dtos.requests.apis.base import BaseRequestDTO
+
+# DTO class for fetching the balance of an account at a past instant, requiring an account URN.
+# The balance includes every transaction of the account created at or before the timestamp.
+class FetchBalanceAtRequestDTO(BaseRequestDTO):
+
+    account_urn: str
+    timestamp: datetime
@@ -1,6 +1,17 @@
+from datetime import datetime
+from typing import Optional
+#
 from dtos.requests.apis.base import BaseRequestDTO
 
 # DTO class for fetching account statements, requiring an account URN.
+# Results are keyset-paginated: pass the next_cursor of a page as cursor to fetch the following page.
+# The optional from/to timestamps select created_on >= from_timestamp and created_on < to_timestamp,
+# and transaction_type restricts the statement to CREDIT or DEBIT transactions.
 class FetchStatementRequestDTO(BaseRequestDTO):
 
-    account_urn: str
\ No newline at end of file
+    account_urn: str
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    from_timestamp: Optional[datetime] = None
+    to_timestamp: Optional[datetime] = None
+    transaction_type: Optional[str] = None
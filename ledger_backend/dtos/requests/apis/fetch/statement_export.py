@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+#
+from dtos.requests.apis.base import BaseRequestDTO
+
+# DTO class for exporting the full statement of an account as a downloadable file.
+# The format is either ndjson (one JSON object per line) or csv (a header row followed by one row per transaction).
+# The optional from/to timestamps and transaction_type filter the rows the same way as the paginated statement API.
+class FetchStatementExportRequestDTO(BaseRequestDTO):
+
+    account_urn: str
+    format: Optional[str] = "ndjson"
+    from_timestamp: Optional[datetime] = None
+    to_timestamp: Optional[datetime] = None
+    transaction_type: Optional[str] = None
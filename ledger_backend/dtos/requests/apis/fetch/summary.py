@@ -0,0 +1,13 @@
+from datetime import date
+from typing import Optional
+#
+from dtos.requests.apis.base import BaseRequestDTO
+
+# DTO class for fetching the summary of an account over a date range, requiring an account URN.
+# The from/to dates are both included, and the credits, debits and closing balances are grouped by DAY or MONTH.
+class FetchSummaryRequestDTO(BaseRequestDTO):
+
+    account_urn: str
+    from_date: date
+    to_date: date
+    period: Optional[str] = "DAY"
@@ -0,0 +1,22 @@
+from abstractions.cache import ICache
+from abstractions.factory import IFactory
+#
+from constants.cache_backend import CacheBackend
+#
+from utilities.cache import MemoryCache, RedisCache
+
+
+# CacheFactory builds the cache backend selected by configuration.
+# The settings are passed in rather than read from start_utils, which builds the shared account cache with this factory.
+class CacheFactory(IFactory):
+
+    # Build the cache backend with the given name.
+    def build(self, name: str, ttl_seconds: float, max_size: int = 100000, redis_url: str = None) -> ICache:
+
+        if name == CacheBackend.MEMORY:
+            return MemoryCache(ttl_seconds=ttl_seconds, max_size=max_size, urn=self.urn)
+
+        if name == CacheBackend.REDIS:
+            return RedisCache(url=redis_url, ttl_seconds=ttl_seconds, urn=self.urn)
+
+        raise ValueError(f"Unknown cache backend {name}. Allowed values are {', '.join(sorted(CacheBackend.ALL))}")
@@ -0,0 +1,36 @@
+from abstractions.email_transport import IEmailTransport
+from abstractions.factory import IFactory
+#
+from constants.notification_transport import NotificationTransport
+#
+from start_utils import (
+    SENDER_EMAIL,
+    SENDER_PASSWORD,
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_USE_TLS
+)
+#
+from utilities.email_transport import LogEmailTransport, SMTPEmailTransport
+
+
+# EmailTransportFactory builds the email transport selected by configuration for the notification dispatcher.
+class EmailTransportFactory(IFactory):
+
+    # Build the transport with the given name, configured from the environment.
+    def build(self, name: str) -> IEmailTransport:
+
+        if name == NotificationTransport.SMTP:
+            return SMTPEmailTransport(
+                host=SMTP_HOST,
+                port=SMTP_PORT,
+                use_tls=SMTP_USE_TLS,
+                user_name=SENDER_EMAIL,
+                password=SENDER_PASSWORD,
+                urn=self.urn
+            )
+
+        if name == NotificationTransport.LOG:
+            return LogEmailTransport(urn=self.urn)
+
+        raise ValueError(f"Unknown notification transport {name}. Allowed values are {', '.join(sorted(NotificationTransport.ALL))}")
@@ -1,25 +1,51 @@
 # Import necessary modules from FastAPI and standard libraries
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
+from fastapi import Request
 from http import HTTPStatus  # For using standard HTTP status codes
-from starlette.middleware.base import BaseHTTPMiddleware  # Middleware base class
+from starlette.types import ASGIApp, Receive, Scope, Send  # ASGI types for a pure ASGI middleware
 from constants.api_status import APIStatus  # API status constants
 from dtos.responses.base import BaseResponseDTO  # Base response DTO for standard responses
-from repositories.user import UserRepository  # User repository for user data access
-from start_utils import db_session, logger, unprotected_routes  # Utilities and database session
+from repositories.user import AsyncUserRepository  # User repository for user data access
+from start_utils import logger, logout_cache, session_cache, unprotected_routes  # Utilities, the login session and logout caches and unprotected routes
 from utilities.jwt import JWTUtility  # Utility class for JWT token handling
+from utilities.orjson_response import ORJSONResponse  # JSON response rendered with orjson
+from utilities.session_cache import SessionCacheUtility  # Checks cached login sessions against the recorded logouts
 
-# Define the AuthenticationMiddleware class, extending from BaseHTTPMiddleware
-class AuthenticationMiddleware(BaseHTTPMiddleware):
+# Define the AuthenticationMiddleware class as a pure ASGI middleware
+# Rejected requests are answered directly, accepted ones are passed on with the caller's identity in the request state
+class AuthenticationMiddleware:
 
-    # The dispatch method processes every request before reaching the endpoint
-    async def dispatch(self, request: Request, call_next):
+    # Keep a reference to the next application in the stack
+    # The JWT utility holds no per-request state, so one instance is shared by every request
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.jwt_utility = JWTUtility()
+
+    # Authenticate every HTTP request before it reaches the endpoint
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+
+        # Only HTTP requests are authenticated
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response = await self.authenticate(request=Request(scope))
+
+        # Send the failure response, or proceed to the next middleware or endpoint after successful authentication
+        if response:
+            await response(scope, receive, send)
+            return
+
+        logger.debug("Procceding with the request execution.", urn=scope["state"].get("urn"))
+        await self.app(scope, receive, send)
+
+    # Check the bearer token of the request, returning an error response if it is rejected and None if it is accepted
+    async def authenticate(self, request: Request):
         logger.debug("Inside authentication middleware")
 
         # Bypass authentication for OPTIONS HTTP method (used in CORS preflight requests)
         if request.method == "OPTIONS":
             logger.debug("OPTIONS request bypassed authentication")
-            return await call_next(request)
+            return None
 
         urn: str = request.state.urn  # Retrieve transaction URN (unique identifier)
         endpoint: str = request.url.path  # Get the current request's endpoint
@@ -27,8 +53,7 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         # If the endpoint is unprotected, allow access without authentication
         if endpoint in unprotected_routes or endpoint in ["/docs", "/redoc", "/openapi.json"]:
             logger.debug("Accessing Unprotected Route", urn=request.state.urn)
-            response: Response = await call_next(request)
-            return response
+            return None
         
         # For protected routes, proceed with JWT token validation
         logger.debug("Accessing Protected Route", urn=request.state.urn)
@@ -46,8 +71,8 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             )
             http_status_code = HTTPStatus.UNAUTHORIZED  # Set response status to 401 Unauthorized
             logger.debug("Prepared response metadata", urn=request.state.urn)
-            return JSONResponse(
-                content=response_dto.to_dict(),
+            return ORJSONResponse(
+                content=response_dto,
                 status_code=http_status_code
             )
 
@@ -57,38 +82,52 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             token = token.split(" ")[1]  # Extract the actual token part from 'Bearer <token>'
 
             # Decode the JWT token and retrieve user data
-            user_data: dict = JWTUtility(
-                urn=urn
-            ).decode_token(token=token)
+            user_data: dict = self.jwt_utility.decode_token(token=token)
             logger.debug("Decoded the authetication token", urn=request.state.urn)
 
-            # Verify if the user is still logged in by checking the session in the database
-            logger.debug("Fetching user logged in status.", urn=request.state.urn)
-            user = UserRepository(
-                urn=urn,
-                session=db_session
-            ).retrieve_record_by_id_and_is_logged_in(
-                id=user_data.get("user_id"),
-                is_logged_in=True,
-                is_deleted=False
-            )
-            logger.debug("Fetched user logged in status.", urn=request.state.urn)
-
-            # If no user session is found, return a session expired error
-            if not user:
-                logger.debug("Preparing response metadata", urn=request.state.urn)
-                response_dto: BaseResponseDTO = BaseResponseDTO(
-                    transaction_urn=urn,
-                    status=APIStatus.FAILED,
-                    response_message="User Session Expired.",
-                    response_key="error_session_expiry",
-                )
-                http_status_code = HTTPStatus.UNAUTHORIZED
-                logger.debug("Prepared response metadata", urn=request.state.urn)
-                return JSONResponse(
-                    content=response_dto.to_dict(),
-                    status_code=http_status_code
+            # Verify if the user is still logged in, checking the session in the database only when the token is not cached
+            # Only confirmed sessions are cached, under the token they were confirmed for, and a cached session confirmed before
+            # the user's last recorded logout is checked again, so a logged out user is rejected right away by every worker
+            # sharing the logout cache
+            session_cache_utility = SessionCacheUtility(cache=logout_cache, urn=urn)
+            cached_session: dict = session_cache.get(token)
+            if cached_session is None or not await session_cache_utility.is_session_current(
+                user_id=cached_session["user_id"],
+                confirmed_on=cached_session["confirmed_on"]
+            ):
+
+                # Take the time before reading the session, so a logout committed during the read is recorded after it
+                confirmed_on: int = session_cache_utility.now()
+
+                logger.debug("Fetching user logged in status.", urn=request.state.urn)
+                user = await AsyncUserRepository(
+                    urn=urn,
+                    session=request.state.db_session  # Request-scoped session opened by DBSessionMiddleware
+                ).retrieve_record_by_id_and_is_logged_in(
+                    id=user_data.get("user_id"),
+                    is_logged_in=True,
+                    is_deleted=False
                 )
+                logger.debug("Fetched user logged in status.", urn=request.state.urn)
+
+                # If no user session is found, return a session expired error
+                if not user:
+                    logger.debug("Preparing response metadata", urn=request.state.urn)
+                    response_dto: BaseResponseDTO = BaseResponseDTO(
+                        transaction_urn=urn,
+                        status=APIStatus.FAILED,
+                        response_message="User Session Expired.",
+                        response_key="error_session_expiry",
+                    )
+                    http_status_code = HTTPStatus.UNAUTHORIZED
+                    logger.debug("Prepared response metadata", urn=request.state.urn)
+                    return ORJSONResponse(
+                        content=response_dto,
+                        status_code=http_status_code
+                    )
+
+                # Remember the confirmed session so repeat requests skip the database check
+                session_cache.set(token, {"user_id": user_data.get("user_id"), "confirmed_on": confirmed_on})
             
             # Store the user ID and URN in the request state for use in other parts of the app
             request.state.user_id = user_data.get("user_id")
@@ -108,13 +147,10 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             )
             http_status_code = HTTPStatus.UNAUTHORIZED
             logger.debug("Prepared response metadata", urn=request.state.urn)
-            return JSONResponse(
-                content=response_dto.to_dict(),
+            return ORJSONResponse(
+                content=response_dto,
                 status_code=http_status_code
             )
         
-        # Proceed to the next middleware or endpoint after successful authentication
-        logger.debug("Procceding with the request execution.", urn=request.state.urn)
-        response: Response = await call_next(request)
-
-        return response
+        # The request is authenticated
+        return None
@@ -0,0 +1,38 @@
+# Import Starlette ASGI types for writing a pure ASGI middleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Import logger and the async session factory bound to the pooled engine
+from start_utils import logger, get_async_session_factory
+
+# Define the DBSessionMiddleware class as a pure ASGI middleware
+# The session stays open until the whole response, including a streamed body, has been sent
+class DBSessionMiddleware:
+
+    # Keep a reference to the next application in the stack
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    # Open a database session for the request and close it once the response is complete
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+
+        # Only HTTP requests use a database session
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Log entry into the middleware
+        state: dict = scope.setdefault("state", {})
+        logger.debug("Inside db session middleware", urn=state.get("urn"))
+
+        # Open a session for this request only; a pooled connection is checked out lazily on first use
+        db_session = get_async_session_factory()()
+        state["db_session"] = db_session  # Store the session in the request state for middlewares and controllers
+
+        try:
+            # Call the next middleware or route handler in the stack
+            await self.app(scope, receive, send)
+
+        finally:
+            # Roll back anything left uncommitted and return the connection to the pool
+            logger.debug("Closing db session", urn=state.get("urn"))
+            await db_session.close()
@@ -0,0 +1,62 @@
+# Import Python libraries for timing requests
+import time
+
+# Import Starlette ASGI types for writing a pure ASGI middleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Import the metrics registry and the per-request query counter
+from utilities.metrics import MetricsRegistry, request_query_count
+
+# Define the MetricsMiddleware class as a pure ASGI middleware
+# It is the outermost middleware, so the recorded duration covers every other middleware and the whole response body
+class MetricsMiddleware:
+
+    # Keep a reference to the next application in the stack and the metrics registry of the worker
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.metrics_registry = MetricsRegistry()
+        self.route_paths: set = None
+
+    # Record the duration and query count of every HTTP request
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+
+        # Only HTTP requests are measured
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        query_count = [0]
+        token = request_query_count.set(query_count)  # Count the queries of this request in the engine event hook
+        status = "500"  # Reported when the app fails before sending a response
+
+        # Remember the status code of the response as it is sent
+        async def send_with_status(message: Message) -> None:
+
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_query_count.reset(token)
+            route = self.route_path(scope)
+            self.metrics_registry.http_request_duration.observe((time.perf_counter_ns() - start_time) / 1e9, scope["method"], route, status)
+            self.metrics_registry.http_request_queries.observe(query_count[0], scope["method"], route)
+
+    # Return the route template of the request, so that the metrics have one series per route rather than per URL
+    # Requests rejected before routing, e.g. by authentication, have no matched route and are labelled by their path
+    # when it is a path of the app; any other path is labelled "unmatched" so that unknown URLs cannot add series
+    def route_path(self, scope: Scope) -> str:
+
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+
+        if self.route_paths is None:
+            self.route_paths = {getattr(route, "path", None) for route in scope["app"].routes}
+
+        return scope["path"] if scope["path"] in self.route_paths else "unmatched"
@@ -2,19 +2,28 @@
 from datetime import datetime
 from ulid import ulid
 
-# Import FastAPI and Starlette middleware base class for creating middleware
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+# Import Starlette ASGI types and header helpers for writing a pure ASGI middleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Import logger for logging requests and middleware actions
 from start_utils import logger
 
-# Define the RequestContextMiddleware class, extending from BaseHTTPMiddleware
-class RequestContextMiddleware(BaseHTTPMiddleware):
-    
-    # The dispatch method processes the request before and after it is handled by the main application
-    async def dispatch(self, request: Request, call_next):
-        # Code to execute before the request is processed by the main application
+# Define the RequestContextMiddleware class as a pure ASGI middleware
+# It wraps the ASGI send callable instead of the response, so streaming responses pass through untouched
+class RequestContextMiddleware:
+
+    # Keep a reference to the next application in the stack
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    # Process the request before and after it is handled by the main application
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+
+        # Only HTTP requests carry a request context, lifespan and websocket messages pass straight through
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
         # Log entry into the middleware
         logger.debug("Inside request context middleware")
@@ -25,21 +34,26 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         # Generate a unique request URN using ULID and store it in the request state
         logger.debug("Generating request urn", urn=None)
         request_urn: str = ulid()  # Generate a unique ULID
-        request.state.urn = request_urn  # Store the URN in the request state
+        scope.setdefault("state", {})["urn"] = request_urn  # Store the URN in the request state
         logger.debug("Generated request urn", urn=request_urn)
 
-        # Call the next middleware or route handler in the stack and get the response
-        response: Response = await call_next(request)
-        
-        # After the request is processed, capture the end time and calculate the processing time
-        end_time: datetime = datetime.now()
-        process_time = end_time - start_time
-
-        # Add custom headers to the response with the processing time and request URN
-        logger.debug("Updating process time header", urn=request_urn)
-        response.headers["X-Process-Time"] = str(process_time)  # Include processing time in headers
-        response.headers["X-Request-URN"] = request_urn  # Include request URN in headers
-        logger.debug("Updated process time header", urn=request_urn)
-        
-        # Return the response to the client
-        return response
+        # Add custom headers to the response as soon as its status line and headers are sent
+        async def send_with_headers(message: Message) -> None:
+
+            if message["type"] == "http.response.start":
+
+                # Capture the end time and calculate the processing time
+                end_time: datetime = datetime.now()
+                process_time = end_time - start_time
+
+                # Add the processing time and request URN headers
+                logger.debug("Updating process time header", urn=request_urn)
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(process_time)  # Include processing time in headers
+                headers["X-Request-URN"] = request_urn  # Include request URN in headers
+                logger.debug("Updated process time header", urn=request_urn)
+
+            await send(message)
+
+        # Call the next middleware or route handler in the stack
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, BigInteger, Date, DateTime, ForeignKey, Index
+from sqlalchemy.ext.declarative import declarative_base
+
+from models.account import Account
+
+# This code defines the AccountDailyRollup class, representing the 'account_daily_rollup' table in the database.
+# Each row totals the transactions of one account on one day: its credits, debits, number of transactions and closing balance.
+# The rows are written in the same commit as the transactions they total, so summaries over a date range read one row per day
+# instead of every transaction of the account.
+# The amounts are integer numbers of minor units of the account's currency, e.g. cents.
+
+Base = declarative_base()
+
+class AccountDailyRollup(Base):
+    __tablename__ = 'account_daily_rollup'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    account_id = Column(BigInteger, ForeignKey(Account.id), nullable=False)
+    day = Column(Date, nullable=False)
+    credit_amount = Column(BigInteger, nullable=False, default=0, server_default="0")
+    debit_amount = Column(BigInteger, nullable=False, default=0, server_default="0")
+    transaction_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    closing_balance = Column(BigInteger, nullable=False, default=0, server_default="0")
+    created_on = Column(DateTime)
+    updated_on = Column(DateTime)
+
+    # Each account has one row per day with transactions, read by account and day range.
+    __table_args__ = (
+        Index('uq_account_daily_rollup_account_id_day', 'account_id', 'day', unique=True),
+    )
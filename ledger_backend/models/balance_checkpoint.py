@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.ext.declarative import declarative_base
+
+from models.account import Account
+from models.transaction import Transaction
+
+# This code defines the BalanceCheckpoint class, representing the 'balance_checkpoint' table in the database.
+# A checkpoint is the balance of an account right after one of its transactions: every transaction of the account up to and
+# including transaction_id, whose creation time is kept as transaction_on, is in the balance.
+# Transfers write one every BALANCE_CHECKPOINT_INTERVAL transactions of an account and day, so the balance at any past instant
+# is found by replaying only the transactions after the nearest checkpoint instead of the whole history of the account.
+# The balance is an integer number of minor units of the account's currency, e.g. cents.
+
+Base = declarative_base()
+
+class BalanceCheckpoint(Base):
+    __tablename__ = 'balance_checkpoint'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    account_id = Column(BigInteger, ForeignKey(Account.id), nullable=False)
+    transaction_id = Column(BigInteger, ForeignKey(Transaction.id), nullable=False)
+    transaction_on = Column(DateTime, nullable=False)
+    balance = Column(BigInteger, nullable=False)
+    created_on = Column(DateTime)
+
+    # Checkpoints are looked up as the latest one of an account at or before an instant.
+    __table_args__ = (
+        Index('idx_balance_checkpoint_account_id_transaction_on', 'account_id', 'transaction_on'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Float, Text, ForeignKey, DateTime
+from sqlalchemy import Column, BigInteger, String, ForeignKey, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 from models.user import User
@@ -9,6 +9,8 @@ from models.account import Account
 # Foreign keys link the balances to the associated 'Account' and 'User' tables.
 # The table includes fields for balance creation and updates, helping maintain a record of when the balance data was created and last updated.
 # The structure also allows for tracking the account's state (e.g., total balance) over time.
+# The totals are integer numbers of minor units of the account's currency, e.g. cents.
+# This row is the only store of an account's balance; total_balance is always total_credit_balance - total_debit_balance.
 
 Base = declarative_base()
 
@@ -17,11 +19,17 @@ class Balances(Base):
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     account_id = Column(BigInteger, ForeignKey(Account.id))
-    account_urn = Column(Text, nullable=False)
-    total_balance = Column(Float)
-    total_credit_balance = Column(Float)
-    total_debit_balance = Column(Float)
+    account_urn = Column(String(64), nullable=False)
+    total_balance = Column(BigInteger, nullable=False, default=0, server_default="0")
+    total_credit_balance = Column(BigInteger, nullable=False, default=0, server_default="0")
+    total_debit_balance = Column(BigInteger, nullable=False, default=0, server_default="0")
     created_on = Column(DateTime)
     created_by = Column(BigInteger, ForeignKey(User.id))
     updated_on = Column(DateTime)
     updated_by = Column(BigInteger)
+
+    # Each account has exactly one balances row, read by account URN and updated by account id.
+    __table_args__ = (
+        Index('uq_balances_account_urn', 'account_urn', unique=True),
+        Index('uq_balances_account_id', 'account_id', unique=True),
+    )
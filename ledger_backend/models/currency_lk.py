@@ -1,9 +1,10 @@
-from sqlalchemy import Column, BigInteger, Text, DateTime
+from sqlalchemy import Column, BigInteger, Integer, Text, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 
 # This code defines the CurrencyLK class which represents the 'currency_lk' table in the database.
 # The table stores currency information such as the currency code, name, and description.
 # It also tracks when the currency data was created and last updated.
+# The exponent is the number of decimal places of the currency's minor unit, e.g. 2 for cents, by which amounts are scaled.
 # The id is an auto-incremented primary key, ensuring each currency entry is unique.
 
 Base = declarative_base()
@@ -15,5 +16,6 @@ class CurrencyLK(Base):
     code = Column(Text)
     name = Column(Text, nullable=False)
     description = Column(Text, nullable=False)
+    exponent = Column(Integer, nullable=False, default=2, server_default="2")
     created_on = Column(DateTime)
     updated_on = Column(DateTime)
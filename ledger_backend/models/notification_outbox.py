@@ -0,0 +1,33 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index
+from sqlalchemy.ext.declarative import declarative_base
+
+# This code defines the NotificationOutbox class, representing the 'notification_outbox' table in the database.
+# Every email the ledger sends is first written to this table in the same commit as the ledger change that caused it.
+# A background dispatcher later delivers the pending rows and records the outcome, retrying failed deliveries.
+# The index on status and next_attempt_on lets the dispatcher find the notifications that are due without a table scan.
+# A dispatcher claims a batch by setting it SENDING with its claim_urn, and next_attempt_on to the end of its lease, after which
+# the batch can be claimed again if the dispatcher never recorded the outcome.
+
+Base = declarative_base()
+
+class NotificationOutbox(Base):
+    __tablename__ = 'notification_outbox'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    urn = Column(String(32), nullable=False)
+    recipient_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_on = Column(DateTime, nullable=False)
+    sent_on = Column(DateTime, nullable=True)
+    claim_urn = Column(String(64), nullable=True)
+    created_on = Column(DateTime)
+    updated_on = Column(DateTime)
+
+    __table_args__ = (
+        Index('idx_notification_outbox_status_next_attempt_on', 'status', 'next_attempt_on'),
+        Index('idx_notification_outbox_claim_urn', 'claim_urn'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Float, Text, ForeignKey, DateTime
+from sqlalchemy import Column, BigInteger, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 from models.account import Account
@@ -7,6 +7,7 @@ from models.user import User
 # This code defines the Transaction class, representing the 'transaction' table in the database.
 # The table stores transactional data, linking payers and payees via their account IDs and URNs.
 # It also stores the transaction amount, purpose, and timestamps for creation and updates.
+# The amount is an integer number of minor units of the currency of both accounts, e.g. cents.
 # The ForeignKey relationships link transactions to the user and account tables for integrity.
 
 Base = declarative_base()
@@ -15,14 +16,22 @@ class Transaction(Base):
     __tablename__ = 'transaction'
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    urn = Column(Text)
+    urn = Column(String(64))
     payer_account_id = Column(BigInteger, ForeignKey(Account.id))
-    payer_account_urn = Column(Text, nullable=True)
+    payer_account_urn = Column(String(64), nullable=True)
     payee_account_id = Column(BigInteger, ForeignKey(Account.id))
-    payee_account_urn = Column(Text, nullable=True)
-    amount = Column(Float)
+    payee_account_urn = Column(String(64), nullable=True)
+    amount = Column(BigInteger)
     purpose = Column(Text, nullable=True)
     created_on = Column(DateTime)
     created_by = Column(BigInteger, ForeignKey(User.id))
     updated_on = Column(DateTime)
     updated_by = Column(BigInteger)
+
+    # Statements read an account's credits and debits newest first, so each side is indexed by account URN and creation time.
+    # The primary key is the implicit last column of every secondary index, which also covers the (created_on, id) keyset.
+    __table_args__ = (
+        Index('uq_transaction_urn', 'urn', unique=True),
+        Index('idx_transaction_payee_account_urn_created_on', 'payee_account_urn', 'created_on'),
+        Index('idx_transaction_payer_account_urn_created_on', 'payer_account_urn', 'created_on'),
+    )
@@ -1,11 +1,17 @@
-from datetime import datetime
+from sqlalchemy import Select, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import List
 #
 from constants.db.table import Table
 #
 from models.account import Account
+from models.balances import Balances
 #
 from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
 
 
 # AccountRepository is responsible for interacting with the `Account` table in the database.
@@ -26,52 +32,40 @@ class AccountRepository(IRepository):
             raise RuntimeError("DB session not found")
     
     # Method to create and save a new `Account` record in the database.
-    # It tracks the execution time for adding the record.
+    @measure_execution_time
     def create_record(self, account: Account) -> Account:
 
-        start_time = datetime.now()
         self.session.add(account)  # Add the new account to the session.
         self.session.commit()  # Commit the session to save the changes to the database.
 
-        end_time = datetime.now()
-        execution_time = end_time - start_time  # Calculate the execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")
-
         return account  # Return the newly created account object.
 
     # Method to retrieve an account by its unique URN (Universal Resource Name).
-    # The function tracks the execution time for querying the record.
+    @measure_execution_time
     def retrieve_record_by_urn(self, urn: str) -> Account:
 
-        start_time = datetime.now()
         # Query the database for the account matching the given URN.
         record = self.session.query(Account).filter(Account.urn == urn).first()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
 
         # Return the account record if found, otherwise return None.
         return record if record else None
     
     # Method to retrieve an account based on the `user_id` and account `name`.
     # This is useful to check if a user already has an account with a specific name.
+    @measure_execution_time
     def retrieve_record_by_user_id_name(self, user_id: int, name: str) -> Account:
 
-        start_time = datetime.now()
         # Query the database for the account matching the `user_id` and `name`.
         record = self.session.query(Account).filter(Account.user_id == user_id, Account.name == name).first()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
 
         # Return the account record if found, otherwise return None.
         return record if record else None
     
     # Method to update an existing `Account` record with new data based on the provided URN.
     # This method allows you to update multiple fields of an account.
+    @measure_execution_time
     def update_record(self, urn: str, new_data: dict) -> Account:
         
-        start_time = datetime.now()
         # Retrieve the account to be updated.
         _account = self.session.query(Account).filter(Account.urn == urn).first()
 
@@ -85,26 +79,195 @@ class AccountRepository(IRepository):
 
         # Commit the changes to the database.
         self.session.commit()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
 
         return _account  # Return the updated account object.
     
     # Method to retrieve all accounts associated with a specific user_id.
     # This function is useful when a user has multiple accounts.
+    @measure_execution_time
     def retrieve_records_by_user_id(self, user_id: int) -> list[Account]:
         """
         Retrieve all accounts associated with a specific user_id.
         """
-        start_time = datetime.now()
         
         # Query to get all accounts that match the user_id.
         records = self.session.query(Account).filter(Account.user_id == user_id).all()
-        
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
-        
+
+        # Return the list of accounts if found, otherwise return an empty list.
+        return records if records else []
+
+    # Method to retrieve the id and balances columns of every account, in id order; the balances columns are None without a balances row.
+    @measure_execution_time
+    def retrieve_balance_columns(self) -> List[tuple]:
+
+        return self.session.execute(
+            select(
+                Account.id,
+                Account.urn,
+                Balances.total_balance,
+                Balances.total_credit_balance,
+                Balances.total_debit_balance
+            )
+            .outerjoin(Balances, Balances.account_id == Account.id)
+            .order_by(Account.id)
+        ).all()
+
+
+# AsyncAccountRepository is the asynchronous variant of AccountRepository used on the request path.
+# It mirrors the synchronous methods but awaits an AsyncSession so the event loop is never blocked on a query.
+class AsyncAccountRepository(IRepository):
+
+    # Constructor method to initialize the repository with essential data, such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.ACCOUNT
+
+        # Raise an error if the database session is not provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to create a new `Account` record in the database, without committing, so it is stored by the caller's commit.
+    @measure_execution_time
+    async def create_record(self, account: Account) -> Account:
+
+        self.session.add(account)  # Add the new account to the session.
+        await self.session.flush()  # Flush the session to insert the account and assign its id.
+
+        return account  # Return the newly created account object.
+
+    # Method to retrieve an account by its unique URN (Universal Resource Name).
+    @measure_execution_time
+    async def retrieve_record_by_urn(self, urn: str) -> Account:
+
+        # Query the database for the account matching the given URN.
+        result = await self.session.execute(select(Account).filter(Account.urn == urn))
+        record = result.scalars().first()
+
+        # Return the account record if found, otherwise return None.
+        return record if record else None
+
+    # Method to retrieve an account based on the `user_id` and account `name`.
+    @measure_execution_time
+    async def retrieve_record_by_user_id_name(self, user_id: int, name: str) -> Account:
+
+        # Query the database for the account matching the `user_id` and `name`.
+        result = await self.session.execute(select(Account).filter(Account.user_id == user_id, Account.name == name))
+        record = result.scalars().first()
+
+        # Return the account record if found, otherwise return None.
+        return record if record else None
+
+    # Method to update an existing `Account` record with new data based on the provided URN.
+    @measure_execution_time
+    async def update_record(self, urn: str, new_data: dict) -> Account:
+
+        # Retrieve the account to be updated.
+        result = await self.session.execute(select(Account).filter(Account.urn == urn))
+        _account = result.scalars().first()
+
+        # Raise an error if the account is not found.
+        if not _account:
+            raise ValueError(f"Account with urn {urn} not found")
+
+        # Update each attribute in the account with the new values.
+        for attr, value in new_data.items():
+            setattr(_account, attr, value)
+
+        # Commit the changes to the database.
+        await self.session.commit()
+
+        return _account  # Return the updated account object.
+
+    # Method to retrieve all accounts associated with a specific user_id.
+    @measure_execution_time
+    async def retrieve_records_by_user_id(self, user_id: int) -> list[Account]:
+
+        # Query to get all accounts that match the user_id.
+        result = await self.session.execute(select(Account).filter(Account.user_id == user_id))
+        records = result.scalars().all()
+
         # Return the list of accounts if found, otherwise return an empty list.
         return records if records else []
+
+    # Method to build the query of accounts joined with their balances.
+    # Only the columns cached and returned by the account APIs are selected, so no full ORM objects are loaded.
+    # The balances version orders the cached copies of an account, see AccountCacheUtility.
+    def build_with_balances_query(self) -> Select:
+
+        return (
+            select(
+                Account.urn.label("account_urn"),
+                Account.user_id.label("user_id"),
+                Account.name.label("name"),
+                Account.currency_id.label("currency_id"),
+                Balances.total_balance.label("total_balance"),
+                Balances.total_credit_balance.label("total_credit_balance"),
+                Balances.total_debit_balance.label("total_debit_balance"),
+                (Balances.total_credit_balance + Balances.total_debit_balance).label("balances_version"),
+            )
+            .join(Balances, Balances.account_id == Account.id)
+            .order_by(Account.id)
+        )
+
+    # Method to retrieve an account together with its balances by the account URN in a single query.
+    @measure_execution_time
+    async def retrieve_record_with_balances_by_urn(self, urn: str) -> RowMapping:
+
+        # Query the account joined with its balances.
+        result = await self.session.execute(self.build_with_balances_query().filter(Account.urn == urn))
+        record = result.mappings().first()
+
+        # Return the account row if found, otherwise return None.
+        return record if record else None
+
+    # Method to retrieve all accounts of a user together with their balances in a single query.
+    @measure_execution_time
+    async def retrieve_records_with_balances_by_user_id(self, user_id: int) -> List[RowMapping]:
+
+        # Query the user's accounts joined with their balances, in account creation order.
+        result = await self.session.execute(self.build_with_balances_query().filter(Account.user_id == user_id))
+        records = result.mappings().all()
+
+        # Return the list of account rows, empty if the user has no accounts.
+        return records
+
+    # Method to retrieve accounts together with their balances by their ids in a single query.
+    # Inside a transaction this reads the balances as written by that transaction, before it is committed.
+    @measure_execution_time
+    async def retrieve_records_with_balances_by_ids(self, ids: List[int]) -> List[RowMapping]:
+
+        # Query the accounts joined with their balances, in id order.
+        result = await self.session.execute(self.build_with_balances_query().filter(Account.id.in_(ids)))
+        records = result.mappings().all()
+
+        # Return the list of account rows.
+        return records
+
+    # Method to retrieve accounts by their URNs in a single query, locking their balances rows, which hold the balance of each account.
+    # The balances are locked in ascending account id order like AsyncBalancesRepository.retrieve_records_by_account_ids_for_update,
+    # so batches and single transfers cannot deadlock.
+    @measure_execution_time
+    async def retrieve_records_with_balances_by_urns_for_update(self, urns: List[str]) -> List[RowMapping]:
+
+        # Query the accounts joined with their balances with SELECT ... FOR UPDATE OF balances.
+        result = await self.session.execute(
+            select(
+                Account.id.label("id"),
+                Account.urn.label("urn"),
+                Account.user_id.label("user_id"),
+                Account.currency_id.label("currency_id"),
+                Balances.total_balance.label("balance"),
+            )
+            .join(Balances, Balances.account_id == Account.id)
+            .filter(Account.urn.in_(urns))
+            .order_by(Account.id)
+            .with_for_update(of=Balances)
+        )
+        records = result.mappings().all()
+
+        # Return the locked account rows in id order.
+        return records
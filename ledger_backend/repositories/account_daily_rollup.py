@@ -0,0 +1,171 @@
+from datetime import date, datetime
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict, List, Tuple
+#
+from constants.db.table import Table
+#
+from models.account_daily_rollup import AccountDailyRollup
+#
+from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
+
+
+# The AccountDailyRollupRepository class handles database operations for the account_daily_rollup table from jobs.
+# It is used by the backfill job, which builds the rollups of the existing transactions chunk by chunk.
+class AccountDailyRollupRepository(IRepository):
+
+    # Constructor initializes the repository with necessary parameters such as URN, user URN, API name, and the database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: Session = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.ACCOUNT_DAILY_ROLLUP  # Refers to the AccountDailyRollup table in the database.
+
+        # Ensure that a valid database session is provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to delete every rollup, without committing; returns the number of deleted rows.
+    @measure_execution_time
+    def delete_records(self) -> int:
+
+        return self.session.execute(delete(AccountDailyRollup)).rowcount
+
+    # Method to add the totals of some transactions to the rollups of their accounts and days, without committing.
+    # Each rollup holds an account_id, a day, the credit_amount, debit_amount and transaction_count to add, and the closing_balance
+    # after the last of the transactions; rollups that do not exist yet are inserted, the others are incremented with one executemany.
+    # Returns the transaction count of every (account_id, day) before the addition, 0 for new rollups.
+    @measure_execution_time
+    def add_to_records(self, rollups: List[dict]) -> Dict[Tuple[int, date], int]:
+
+        result = self.session.execute(
+            select(AccountDailyRollup.account_id, AccountDailyRollup.day, AccountDailyRollup.transaction_count)
+            .filter(AccountDailyRollup.account_id.in_({rollup["account_id"] for rollup in rollups}))
+            .filter(AccountDailyRollup.day.in_({rollup["day"] for rollup in rollups}))
+        )
+        previous_counts = {(account_id, day): transaction_count for account_id, day, transaction_count in result.all()}
+        existing_keys = {(rollup["account_id"], rollup["day"]) for rollup in rollups} & previous_counts.keys()
+
+        now = datetime.now()
+        increments = [rollup for rollup in rollups if (rollup["account_id"], rollup["day"]) in existing_keys]
+        if increments:
+            self.session.execute(
+                AccountDailyRollupRepository.build_increment_query(now=now),
+                [{f"b_{key}": value for key, value in increment.items()} for increment in increments]
+            )
+
+        additions = [rollup for rollup in rollups if (rollup["account_id"], rollup["day"]) not in existing_keys]
+        if additions:
+            self.session.execute(
+                insert(AccountDailyRollup),
+                [{**addition, "created_on": now, "updated_on": now} for addition in additions]
+            )
+
+        return {(rollup["account_id"], rollup["day"]): previous_counts.get((rollup["account_id"], rollup["day"]), 0) for rollup in rollups}
+
+    # Method to build the executemany update adding the totals of a rollup to its row and replacing its closing balance.
+    # Bound parameters cannot share the names of the updated columns, so the values are bound with a prefix.
+    @staticmethod
+    def build_increment_query(now: datetime):
+
+        account_daily_rollup = AccountDailyRollup.__table__
+        return (
+            update(account_daily_rollup)
+            .where(account_daily_rollup.c.account_id == bindparam("b_account_id"))
+            .where(account_daily_rollup.c.day == bindparam("b_day"))
+            .values(
+                credit_amount=account_daily_rollup.c.credit_amount + bindparam("b_credit_amount"),
+                debit_amount=account_daily_rollup.c.debit_amount + bindparam("b_debit_amount"),
+                transaction_count=account_daily_rollup.c.transaction_count + bindparam("b_transaction_count"),
+                closing_balance=bindparam("b_closing_balance"),
+                updated_on=now
+            )
+        )
+
+
+# The AsyncAccountDailyRollupRepository class is the asynchronous variant of AccountDailyRollupRepository used on the request path.
+# Transfers add to the rollups of their accounts in the same commit as the transactions, and summaries read them by day range.
+class AsyncAccountDailyRollupRepository(IRepository):
+
+    # Constructor initializes the repository with necessary parameters such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.ACCOUNT_DAILY_ROLLUP  # Refers to the AccountDailyRollup table in the database.
+
+        # Ensure that a valid database session is provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to add the totals of some transactions to the rollups of their accounts and days, without committing.
+    # It works like AccountDailyRollupRepository.add_to_records; the callers hold the balances locks of the accounts,
+    # so no other transfer can insert or update the same rollups in between.
+    @measure_execution_time
+    async def add_to_records(self, rollups: List[dict]) -> Dict[Tuple[int, date], int]:
+
+        result = await self.session.execute(
+            select(AccountDailyRollup.account_id, AccountDailyRollup.day, AccountDailyRollup.transaction_count)
+            .filter(AccountDailyRollup.account_id.in_({rollup["account_id"] for rollup in rollups}))
+            .filter(AccountDailyRollup.day.in_({rollup["day"] for rollup in rollups}))
+        )
+        previous_counts = {(account_id, day): transaction_count for account_id, day, transaction_count in result.all()}
+        existing_keys = {(rollup["account_id"], rollup["day"]) for rollup in rollups} & previous_counts.keys()
+
+        now = datetime.now()
+        increments = [rollup for rollup in rollups if (rollup["account_id"], rollup["day"]) in existing_keys]
+        if increments:
+            await self.session.execute(
+                AccountDailyRollupRepository.build_increment_query(now=now),
+                [{f"b_{key}": value for key, value in increment.items()} for increment in increments]
+            )
+
+        additions = [rollup for rollup in rollups if (rollup["account_id"], rollup["day"]) not in existing_keys]
+        if additions:
+            await self.session.execute(
+                insert(AccountDailyRollup),
+                [{**addition, "created_on": now, "updated_on": now} for addition in additions]
+            )
+
+        return {(rollup["account_id"], rollup["day"]): previous_counts.get((rollup["account_id"], rollup["day"]), 0) for rollup in rollups}
+
+    # Method to retrieve the rollups of an account from one day to another, both included, in day order.
+    @measure_execution_time
+    async def retrieve_records_by_account_id(self, account_id: int, from_day: date, to_day: date) -> List[AccountDailyRollup]:
+
+        # Query the rollups by the unique (account_id, day) index.
+        result = await self.session.execute(
+            select(AccountDailyRollup)
+            .filter(AccountDailyRollup.account_id == account_id)
+            .filter(AccountDailyRollup.day >= from_day)
+            .filter(AccountDailyRollup.day <= to_day)
+            .order_by(AccountDailyRollup.day)
+        )
+        records = result.scalars().all()
+
+        # Return the list of rollups, empty if the account had no transactions in the range.
+        return records
+
+    # Method to retrieve the last rollup of an account before a day, whose closing balance is the opening balance of that day.
+    @measure_execution_time
+    async def retrieve_last_record_before_day(self, account_id: int, day: date) -> AccountDailyRollup:
+
+        # Query the latest earlier rollup by the unique (account_id, day) index.
+        result = await self.session.execute(
+            select(AccountDailyRollup)
+            .filter(AccountDailyRollup.account_id == account_id)
+            .filter(AccountDailyRollup.day < day)
+            .order_by(AccountDailyRollup.day.desc())
+            .limit(1)
+        )
+        record = result.scalars().first()
+
+        # Return the rollup if found; otherwise, return None.
+        return record if record else None
@@ -0,0 +1,88 @@
+from datetime import datetime
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List
+#
+from constants.db.table import Table
+#
+from models.balance_checkpoint import BalanceCheckpoint
+#
+from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
+
+
+# The BalanceCheckpointRepository class handles database operations for the balance_checkpoint table from jobs.
+# It is used by the backfill job, which writes the checkpoints of the existing transactions chunk by chunk.
+class BalanceCheckpointRepository(IRepository):
+
+    # Constructor initializes the repository with necessary parameters such as URN, user URN, API name, and the database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: Session = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.BALANCE_CHECKPOINT  # Refers to the BalanceCheckpoint table in the database.
+
+        # Ensure that a valid database session is provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to delete every checkpoint, without committing; returns the number of deleted rows.
+    @measure_execution_time
+    def delete_records(self) -> int:
+
+        return self.session.execute(delete(BalanceCheckpoint)).rowcount
+
+    # Method to insert many checkpoints, given as dictionaries of account_id, transaction_id, transaction_on and balance, with one executemany.
+    @measure_execution_time
+    def add_records(self, checkpoints: List[dict]) -> None:
+
+        now = datetime.now()
+        self.session.execute(insert(BalanceCheckpoint), [{**checkpoint, "created_on": now} for checkpoint in checkpoints])
+
+
+# The AsyncBalanceCheckpointRepository class is the asynchronous variant of BalanceCheckpointRepository used on the request path.
+# Transfers add checkpoints in the same commit as the transactions, and point-in-time balance reads look up the nearest one.
+class AsyncBalanceCheckpointRepository(IRepository):
+
+    # Constructor initializes the repository with necessary parameters such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.BALANCE_CHECKPOINT  # Refers to the BalanceCheckpoint table in the database.
+
+        # Ensure that a valid database session is provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to insert many checkpoints, given as dictionaries of account_id, transaction_id, transaction_on and balance,
+    # with one executemany and without committing, so they are stored by the same commit as their transactions.
+    @measure_execution_time
+    async def add_records(self, checkpoints: List[dict]) -> None:
+
+        now = datetime.now()
+        await self.session.execute(insert(BalanceCheckpoint), [{**checkpoint, "created_on": now} for checkpoint in checkpoints])
+
+    # Method to retrieve the latest checkpoint of an account taken at or before an instant.
+    # Checkpoints of one account are written in transaction order, so the last of several taken in the same instant has the highest id.
+    @measure_execution_time
+    async def retrieve_last_record_by_account_id(self, account_id: int, timestamp: datetime) -> BalanceCheckpoint:
+
+        # Query the latest checkpoint by the (account_id, transaction_on) index.
+        result = await self.session.execute(
+            select(BalanceCheckpoint)
+            .filter(BalanceCheckpoint.account_id == account_id)
+            .filter(BalanceCheckpoint.transaction_on <= timestamp)
+            .order_by(BalanceCheckpoint.transaction_on.desc(), BalanceCheckpoint.id.desc())
+            .limit(1)
+        )
+        record = result.scalars().first()
+
+        # Return the checkpoint if found; otherwise, return None.
+        return record if record else None
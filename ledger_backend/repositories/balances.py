@@ -1,19 +1,23 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 #
 from constants.db.table import Table
 #
 from models.balances import Balances
 #
 from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
 
 
-# The BalancesRepository class handles database operations for the Balances table.
-# It includes methods to create and retrieve balance records.
-class BalancesRepository(IRepository):
+# The AsyncBalancesRepository class handles database operations for the Balances table on the request path.
+# It creates, locks, increments and retrieves balance records, awaiting an AsyncSession so the event loop is never blocked on a query.
+class AsyncBalancesRepository(IRepository):
 
-    # Constructor initializes the repository with essential parameters such as URN, user URN, API name, and the database session.
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: Session = None):
+    # Constructor initializes the repository with essential parameters such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
         super().__init__(urn, user_urn, api_name)
         self.urn = urn
         self.user_urn = user_urn
@@ -24,31 +28,96 @@ class BalancesRepository(IRepository):
         # If the session is not provided, raise an error as database operations cannot function without a session.
         if not self.session:
             raise RuntimeError("DB session not found")
-    
-    # Method to create a new `Balances` record in the database.
-    # It tracks the execution time for adding the record to the database.
-    def create_record(self, balances: Balances) -> Balances:
 
-        start_time = datetime.now()  # Record the start time before the operation begins.
-        self.session.add(balances)  # Add the new balances record to the session.
-        self.session.commit()  # Commit the session to persist the changes in the database.
+    # Method to create a new `Balances` record in the database, without committing, so it is stored by the caller's commit.
+    @measure_execution_time
+    async def create_record(self, balances: Balances) -> Balances:
 
-        end_time = datetime.now()  # Record the end time once the operation is complete.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
+        self.session.add(balances)  # Add the new balances record to the session.
+        await self.session.flush()  # Flush the session to insert the balances record.
 
         return balances  # Return the newly created balances object.
 
-    # Method to retrieve a `Balances` record by its associated account URN (unique identifier for an account).
-    # This is useful for checking the balance associated with a specific account.
-    def retrieve_record_by_account_urn(self, account_urn: str) -> Balances:
+    # Method to retrieve a `Balances` record by its associated account URN.
+    @measure_execution_time
+    async def retrieve_record_by_account_urn(self, account_urn: str) -> Balances:
 
-        start_time = datetime.now()  # Record the start time before the query.
         # Query the database for the balance record that matches the given account URN.
-        record = self.session.query(Balances).filter(Balances.account_urn == account_urn).first()
-        end_time = datetime.now()  # Record the end time after the query completes.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
+        result = await self.session.execute(select(Balances).filter(Balances.account_urn == account_urn))
+        record = result.scalars().first()
 
         # Return the balance record if found; otherwise, return None.
         return record if record else None
+
+    # Method to lock the balances of accounts for the rest of the current transaction, in ascending account id order.
+    # Every transfer locks its balances in the same order, so two transfers over the same accounts wait for each other instead of deadlocking.
+    # The rows are re-read from the database, so the returned balances are the ones as of the lock.
+    @measure_execution_time
+    async def retrieve_records_by_account_ids_for_update(self, account_ids: List[int]) -> List[Balances]:
+
+        # Query the balances by account id with SELECT ... FOR UPDATE.
+        result = await self.session.execute(
+            select(Balances)
+            .filter(Balances.account_id.in_(account_ids))
+            .order_by(Balances.account_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        records = result.scalars().all()
+
+        # Return the locked balances in account id order.
+        return records
+
+    # Method to add amounts to the balances of an account in SQL, without committing.
+    # The totals are incremented on their current database values, so concurrent updates are never lost; returns whether the row was updated.
+    # A minimum balance makes the update conditional, so a debit can never take the total balance below it.
+    @measure_execution_time
+    async def increment_record_by_account_id(
+        self,
+        account_id: int,
+        total_balance: int = 0,
+        total_credit_balance: int = 0,
+        total_debit_balance: int = 0,
+        minimum_balance: int = None
+    ) -> bool:
+
+        query = update(Balances).where(Balances.account_id == account_id)
+        if minimum_balance is not None:
+            query = query.where(Balances.total_balance + total_balance >= minimum_balance)
+
+        result = await self.session.execute(
+            query
+            .values(
+                total_balance=Balances.total_balance + total_balance,
+                total_credit_balance=Balances.total_credit_balance + total_credit_balance,
+                total_debit_balance=Balances.total_debit_balance + total_debit_balance,
+                updated_on=datetime.now()
+            )
+            .execution_options(synchronize_session=False)
+        )  # Apply the increments to the current database values.
+
+        return result.rowcount == 1
+
+    # Method to add amounts to the balances of several accounts in SQL with one executemany, without committing.
+    # Each row holds an account_id and the total_balance, total_credit_balance and total_debit_balance to add to it.
+    # A negative total balance change is only applied when the balance covers it, so a batch can never overdraw an account.
+    # Returns whether every row was updated.
+    @measure_execution_time
+    async def increment_records_by_account_ids(self, increments: List[dict]) -> bool:
+
+        # Bound parameters cannot share the names of the updated columns, so the increments are bound with a prefix.
+        balances = Balances.__table__
+        result = await self.session.execute(
+            update(balances)
+            .where(balances.c.account_id == bindparam("b_account_id"))
+            .where(or_(bindparam("b_total_balance") >= 0, balances.c.total_balance + bindparam("b_total_balance") >= 0))
+            .values(
+                total_balance=balances.c.total_balance + bindparam("b_total_balance"),
+                total_credit_balance=balances.c.total_credit_balance + bindparam("b_total_credit_balance"),
+                total_debit_balance=balances.c.total_debit_balance + bindparam("b_total_debit_balance"),
+                updated_on=datetime.now()
+            ),
+            [{f"b_{key}": value for key, value in increment.items()} for increment in increments]
+        )  # Apply the increments to the current database values.
+
+        return result.rowcount == len(increments)
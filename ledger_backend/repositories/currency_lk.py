@@ -1,20 +1,22 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Tuple
 #
 from constants.db.table import Table
 #
 from models.currency_lk import CurrencyLK
 #
 from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
 
 
-# The CurrencyLKRepository class handles database operations related to the Currency Lookup table.
-# It includes methods to create and retrieve all currency records.
-class CurrencyLKRepository(IRepository):
+# The AsyncCurrencyLKRepository class handles database operations related to the Currency Lookup table.
+# It awaits an AsyncSession so the event loop is never blocked on a query.
+class AsyncCurrencyLKRepository(IRepository):
 
-    # Constructor initializes the repository with essential parameters such as URN, user URN, API name, and the database session.
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: Session = None):
+    # Constructor initializes the repository with essential parameters such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
         super().__init__(urn, user_urn, api_name)
         self.urn = urn
         self.user_urn = user_urn
@@ -27,28 +29,32 @@ class CurrencyLKRepository(IRepository):
             raise RuntimeError("DB session not found")
 
     # Method to create a new currency lookup record in the database.
-    # It tracks the execution time for adding the record.
-    def create_record(self, currency_lk: CurrencyLK) -> CurrencyLK:
+    @measure_execution_time
+    async def create_record(self, currency_lk: CurrencyLK) -> CurrencyLK:
 
-        start_time = datetime.now()  # Record the start time of the operation.
         self.session.add(currency_lk)  # Add the new currency lookup record to the session.
-        self.session.commit()  # Commit the session to persist the changes in the database.
-
-        end_time = datetime.now()  # Record the end time after the commit.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
+        await self.session.commit()  # Commit the session to persist the changes in the database.
 
         return currency_lk  # Return the newly created currency lookup object.
 
     # Method to retrieve all records from the Currency Lookup table.
-    # It returns a list of all currency records.
-    def retrieve_all_records(self) -> List[CurrencyLK]:
-
-        start_time = datetime.now()  # Record the start time before the query.
-        records = self.session.query(CurrencyLK).all()  # Query the database for all currency records.
+    @measure_execution_time
+    async def retrieve_all_records(self) -> List[CurrencyLK]:
 
-        end_time = datetime.now()  # Record the end time after the query.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
+        result = await self.session.execute(select(CurrencyLK))  # Query the database for all currency records.
+        records = result.scalars().all()
 
         return records  # Return the list of all currency lookup records.
+
+    # Method to retrieve the version of the Currency Lookup table, used to detect changes without loading every record.
+    # The version is the record count with the highest id and update time: inserts change the count and the highest id,
+    # deletes change the count, and updates that set updated_on change the highest update time.
+    @measure_execution_time
+    async def retrieve_version(self) -> Tuple:
+
+        result = await self.session.execute(
+            select(func.count(CurrencyLK.id), func.max(CurrencyLK.id), func.max(CurrencyLK.updated_on))
+        )  # Query the aggregates of the table in a single row.
+        version = tuple(result.one())
+
+        return version  # Return the version of the currency lookup table.
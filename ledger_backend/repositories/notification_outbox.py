@@ -0,0 +1,92 @@
+from datetime import datetime
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+#
+from constants.db.table import Table
+from constants.notification_status import NotificationStatus
+#
+from models.notification_outbox import NotificationOutbox
+#
+from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
+
+
+# The AsyncNotificationOutboxRepository class handles database operations for the notification outbox.
+# Services add notifications next to their ledger changes, and the notification dispatcher claims and updates them.
+class AsyncNotificationOutboxRepository(IRepository):
+
+    # Constructor initializes the repository with necessary parameters such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.NOTIFICATION_OUTBOX  # Refers to the NotificationOutbox table in the database.
+
+        # Ensure that a valid database session is provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to add a notification to the session.
+    # It is deliberately not committed here, so the notification is stored by the same commit as the ledger change.
+    def add_record(self, notification: NotificationOutbox) -> NotificationOutbox:
+
+        self.session.add(notification)  # Add the notification to the session of the ledger change.
+        return notification
+
+    # Method to insert many notifications, given as dictionaries of column values, with one executemany.
+    # Like add_record it does not commit, so the notifications are stored by the same commit as the ledger change.
+    @measure_execution_time
+    async def add_records(self, notifications: List[dict]) -> None:
+
+        await self.session.execute(insert(NotificationOutbox.__table__), notifications)
+
+    # Method to claim a batch of notifications that are due for delivery, without committing; returns the number claimed.
+    # Due notifications are PENDING ones whose next attempt has come, and SENDING ones whose lease has run out because their
+    # dispatcher stopped before recording the outcome. They are set SENDING with the claim URN and leased until lease_until.
+    # Rows are locked with SKIP LOCKED where the database supports it, and the update only claims rows that are still due,
+    # so concurrent dispatchers never claim the same rows, also on databases without row locks.
+    @measure_execution_time
+    async def claim_due_records(self, limit: int, now: datetime, lease_until: datetime, claim_urn: str) -> int:
+
+        is_due = and_(
+            NotificationOutbox.status.in_([NotificationStatus.PENDING, NotificationStatus.SENDING]),
+            NotificationOutbox.next_attempt_on <= now
+        )
+
+        result = await self.session.execute(
+            select(NotificationOutbox.id)
+            .filter(is_due)
+            .order_by(NotificationOutbox.next_attempt_on, NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )  # Query the oldest due notifications.
+        ids = result.scalars().all()
+
+        if not ids:
+            return 0
+
+        result = await self.session.execute(
+            update(NotificationOutbox)
+            .filter(NotificationOutbox.id.in_(ids), is_due)
+            .values(status=NotificationStatus.SENDING, claim_urn=claim_urn, next_attempt_on=lease_until, updated_on=now)
+            .execution_options(synchronize_session=False)
+        )  # Claim the ones no other dispatcher has claimed in the meantime.
+
+        return result.rowcount  # Return the number of claimed notifications.
+
+    # Method to retrieve the notifications still held by a claim, in claiming order.
+    @measure_execution_time
+    async def retrieve_records_by_claim_urn(self, claim_urn: str) -> List[NotificationOutbox]:
+
+        result = await self.session.execute(
+            select(NotificationOutbox)
+            .filter(NotificationOutbox.claim_urn == claim_urn, NotificationOutbox.status == NotificationStatus.SENDING)
+            .order_by(NotificationOutbox.id)
+        )  # Query the notifications by the claim_urn index.
+        records = result.scalars().all()
+
+        return records  # Return the claimed notifications, empty if the claim has been taken over.
@@ -1,12 +1,20 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import Select, and_, func, insert, literal, or_, select, union_all
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from typing import AsyncIterator, Dict, List, Tuple
 #
 from constants.db.table import Table
+from constants.transaction_type import TransactionType
 #
+from models.account import Account
+from models.currency_lk import CurrencyLK
 from models.transaction import Transaction
 #
 from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
 
 
 # The TransactionRepository class is responsible for performing database operations related to transactions.
@@ -27,39 +35,292 @@ class TransactionRepository(IRepository):
             raise RuntimeError("DB session not found")
         
     # Method to create a new transaction record in the database.
-    # It adds the transaction to the session and commits it to the database, logging the execution time.
+    # It adds the transaction to the session and commits it to the database.
+    @measure_execution_time
     def create_record(self, transaction: Transaction) -> Transaction:
 
-        start_time = datetime.now()  # Record the start time for tracking execution.
         self.session.add(transaction)  # Add the new transaction to the session.
         self.session.commit()  # Commit the session to persist the transaction.
 
-        end_time = datetime.now()  # Record the end time after the commit.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
-
         return transaction  # Return the created transaction object.
 
+    # Method to retrieve the id, account ids and amount columns of a chunk of transactions, in id order after the given id.
+    # Only these columns are selected, so jobs can total the ledger chunk by chunk without loading ORM objects.
+    @measure_execution_time
+    def retrieve_amount_columns(self, after_id: int, limit: int) -> List[tuple]:
+
+        return self.session.execute(
+            select(Transaction.id, Transaction.payer_account_id, Transaction.payee_account_id, Transaction.amount)
+            .filter(Transaction.id > after_id)
+            .order_by(Transaction.id)
+            .limit(limit)
+        ).all()
+
+    # Method to retrieve the id, account ids, amount and creation time columns of a chunk of transactions, in id order after the given id.
+    # Jobs building per-day figures read the ledger with it chunk by chunk, like retrieve_amount_columns.
+    @measure_execution_time
+    def retrieve_rollup_columns(self, after_id: int, limit: int) -> List[tuple]:
+
+        return self.session.execute(
+            select(Transaction.id, Transaction.payer_account_id, Transaction.payee_account_id, Transaction.amount, Transaction.created_on)
+            .filter(Transaction.id > after_id)
+            .order_by(Transaction.id)
+            .limit(limit)
+        ).all()
+
     # Method to retrieve transaction records based on the payee account URN.
     # It fetches all transactions where the payee account matches the given URN.
+    @measure_execution_time
     def retrieve_record_by_payee_account_urn(self, payee_account_urn: str) -> List[Transaction]:
 
-        start_time = datetime.now()  # Record the start time before querying the database.
         record = self.session.query(Transaction).filter(Transaction.payee_account_urn == payee_account_urn).all()  # Query transactions by payee account URN.
-        end_time = datetime.now()  # Record the end time after the query.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
 
         return record if record else None  # Return the list of transactions, or None if no records are found.
     
     # Method to retrieve transaction records based on the payer account URN.
     # It fetches all transactions where the payer account matches the given URN.
+    @measure_execution_time
     def retrieve_record_by_payer_account_urn(self, payer_account_urn: str) -> List[Transaction]:
 
-        start_time = datetime.now()  # Record the start time before querying the database.
         record = self.session.query(Transaction).filter(Transaction.payer_account_urn == payer_account_urn).all()  # Query transactions by payer account URN.
-        end_time = datetime.now()  # Record the end time after the query.
-        execution_time = end_time - start_time  # Calculate the total execution time.
-        self.logger.info(f"Execution time: {execution_time} seconds")  # Log the execution time.
 
         return record if record else None  # Return the list of transactions, or None if no records are found.
+
+
+# The AsyncTransactionRepository class is the asynchronous variant of TransactionRepository used on the request path.
+# It mirrors the synchronous methods but awaits an AsyncSession so the event loop is never blocked on a query.
+class AsyncTransactionRepository(IRepository):
+
+    # Constructor initializes the repository with necessary parameters such as URN, user URN, API name, and the async database session.
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
+        super().__init__(urn, user_urn, api_name)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.session = session
+        self.table = Table.TRANSACTION  # Refers to the Transaction table in the database.
+
+        # Ensure that a valid database session is provided.
+        if not self.session:
+            raise RuntimeError("DB session not found")
+
+    # Method to create a new transaction record in the database.
+    @measure_execution_time
+    async def create_record(self, transaction: Transaction) -> Transaction:
+
+        self.session.add(transaction)  # Add the new transaction to the session.
+        await self.session.commit()  # Commit the session to persist the transaction.
+
+        return transaction  # Return the created transaction object.
+
+    # Method to add a new transaction to the current database transaction without committing it.
+    # The row is flushed so that its id is known, and is committed together with the balance updates by the caller.
+    @measure_execution_time
+    async def add_record(self, transaction: Transaction) -> Transaction:
+
+        self.session.add(transaction)  # Add the new transaction to the session.
+        await self.session.flush()  # Write the row inside the open database transaction.
+
+        return transaction  # Return the added transaction object.
+
+    # Method to insert many transactions, given as dictionaries of column values, with one executemany without committing.
+    # The driver sends them as multi-row INSERT statements, and they are committed together with the balance updates by the caller.
+    @measure_execution_time
+    async def add_records(self, transactions: List[dict]) -> None:
+
+        await self.session.execute(insert(Transaction.__table__), transactions)  # Write the rows inside the open database transaction.
+
+    # Method to retrieve the ids of transactions by their URNs, e.g. of rows inserted by add_records, as a URN to id dictionary.
+    @measure_execution_time
+    async def retrieve_ids_by_urns(self, urns: List[str]) -> Dict[str, int]:
+
+        result = await self.session.execute(select(Transaction.urn, Transaction.id).filter(Transaction.urn.in_(urns)))  # Query by the unique URN index.
+
+        return {urn: id for urn, id in result.all()}
+
+    # Method to total the transactions of an account created up to an instant, optionally only those after a transaction id
+    # or created from an instant on, as (credit amount, credit count, debit amount, debit count).
+    # Each side is an aggregate over its (account URN, created_on) index, and both are read with one query.
+    @measure_execution_time
+    async def retrieve_totals_by_account_urn(
+        self,
+        account_urn: str,
+        to_timestamp: datetime,
+        after_id: int = None,
+        from_timestamp: datetime = None
+    ) -> Tuple[int, int, int, int]:
+
+        def side_totals(account_urn_column):
+
+            conditions = [account_urn_column == account_urn, Transaction.created_on <= to_timestamp]
+            if after_id is not None:
+                conditions.append(Transaction.id > after_id)
+            if from_timestamp is not None:
+                conditions.append(Transaction.created_on >= from_timestamp)
+
+            return select(func.coalesce(func.sum(Transaction.amount), 0).label("amount"), func.count().label("count")).filter(*conditions).subquery()
+
+        # Both sides are single rows, so they are joined unconditionally
+        credits = side_totals(Transaction.payee_account_urn)
+        debits = side_totals(Transaction.payer_account_urn)
+        result = await self.session.execute(
+            select(credits.c.amount, credits.c.count, debits.c.amount, debits.c.count)
+            .select_from(credits.join(debits, literal(True)))
+        )
+
+        return tuple(int(value) for value in result.one())
+
+    # Method to retrieve transaction records based on the payee account URN.
+    @measure_execution_time
+    async def retrieve_record_by_payee_account_urn(self, payee_account_urn: str) -> List[Transaction]:
+
+        result = await self.session.execute(select(Transaction).filter(Transaction.payee_account_urn == payee_account_urn))  # Query transactions by payee account URN.
+        record = result.scalars().all()
+
+        return record if record else None  # Return the list of transactions, or None if no records are found.
+
+    # Method to retrieve transaction records based on the payer account URN.
+    @measure_execution_time
+    async def retrieve_record_by_payer_account_urn(self, payer_account_urn: str) -> List[Transaction]:
+
+        result = await self.session.execute(select(Transaction).filter(Transaction.payer_account_urn == payer_account_urn))  # Query transactions by payer account URN.
+        record = result.scalars().all()
+
+        return record if record else None  # Return the list of transactions, or None if no records are found.
+
+    # Method to build the statement query of an account.
+    # Credits (account is the payee) and debits (account is the payer) are selected as two branches of a UNION ALL,
+    # each joined to the payer and payee accounts for their names and to the statement account's currency for its code.
+    # Rows come back ordered newest first by (created_on, id), so no per-row account lookups or Python sorting are needed.
+    # The date range, transaction type and keyset position are applied inside each branch, and each branch is limited
+    # on its own, so the cost of a page depends on the page size rather than on the age of the account.
+    def build_statement_query(
+        self,
+        account_urn: str,
+        limit: int = None,
+        cursor_created_on: datetime = None,
+        cursor_id: int = None,
+        from_timestamp: datetime = None,
+        to_timestamp: datetime = None,
+        transaction_type: str = None
+    ) -> Select:
+
+        payer_account = aliased(Account)
+        payee_account = aliased(Account)
+
+        # Build one branch of the statement for the given transaction type.
+        # The statement account is the payee for credits and the payer for debits, and its currency is used for the row.
+        def statement_branch(branch_transaction_type: str, account_urn_column, statement_account):
+            branch = (
+                select(
+                    Transaction.id.label("id"),
+                    Transaction.urn.label("transaction_urn"),
+                    Transaction.payer_account_urn.label("payer_account_urn"),
+                    Transaction.payee_account_urn.label("payee_account_urn"),
+                    Transaction.amount.label("amount"),
+                    CurrencyLK.code.label("currency_code"),
+                    CurrencyLK.exponent.label("currency_exponent"),
+                    Transaction.created_on.label("transaction_timestamp"),
+                    literal(branch_transaction_type).label("transaction_type"),
+                    payer_account.name.label("payer_account_name"),
+                    payee_account.name.label("payee_account_name"),
+                    Transaction.purpose.label("purpose"),
+                )
+                .outerjoin(payer_account, payer_account.id == Transaction.payer_account_id)
+                .outerjoin(payee_account, payee_account.id == Transaction.payee_account_id)
+                .outerjoin(CurrencyLK, CurrencyLK.id == statement_account.currency_id)
+                .filter(account_urn_column == account_urn)
+            )
+
+            if from_timestamp:
+                branch = branch.filter(Transaction.created_on >= from_timestamp)
+
+            if to_timestamp:
+                branch = branch.filter(Transaction.created_on < to_timestamp)
+
+            # Continue strictly after the last row of the previous page.
+            if cursor_created_on and cursor_id:
+                branch = branch.filter(
+                    or_(
+                        Transaction.created_on < cursor_created_on,
+                        and_(Transaction.created_on == cursor_created_on, Transaction.id < cursor_id)
+                    )
+                )
+
+            if limit:
+                branch = branch.order_by(Transaction.created_on.desc(), Transaction.id.desc()).limit(limit)
+
+            # Wrap the branch so that its ORDER BY and LIMIT stay valid inside the UNION on every dialect.
+            return select(branch.subquery())
+
+        branches = [
+            statement_branch(branch_transaction_type, account_urn_column, statement_account)
+            for branch_transaction_type, account_urn_column, statement_account in (
+                (TransactionType.CREDIT, Transaction.payee_account_urn, payee_account),
+                (TransactionType.DEBIT, Transaction.payer_account_urn, payer_account),
+            )
+            if not transaction_type or transaction_type == branch_transaction_type
+        ]
+        statement = union_all(*branches).subquery()
+
+        query = select(statement).order_by(statement.c.transaction_timestamp.desc(), statement.c.id.desc())
+        if limit:
+            query = query.limit(limit)
+
+        return query
+
+    # Method to retrieve a page of an account's statement in a single round-trip.
+    @measure_execution_time
+    async def retrieve_statement_records_by_account_urn(
+        self,
+        account_urn: str,
+        limit: int = None,
+        cursor_created_on: datetime = None,
+        cursor_id: int = None,
+        from_timestamp: datetime = None,
+        to_timestamp: datetime = None,
+        transaction_type: str = None
+    ) -> List[RowMapping]:
+
+        query = self.build_statement_query(
+            account_urn=account_urn,
+            limit=limit,
+            cursor_created_on=cursor_created_on,
+            cursor_id=cursor_id,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            transaction_type=transaction_type
+        )
+
+        result = await self.session.execute(query)  # Query credit and debit transactions together, ordered in SQL.
+        records = result.mappings().all()
+
+        return records  # Return the list of statement rows, empty if no transactions match.
+
+    # Method to stream the full statement of an account through a server-side cursor.
+    # Rows are fetched from the database in partitions of yield_per rows and handed out one partition at a time,
+    # so memory use stays bounded by the partition size however long the statement is.
+    @measure_execution_time
+    async def stream_statement_records_by_account_urn(
+        self,
+        account_urn: str,
+        from_timestamp: datetime = None,
+        to_timestamp: datetime = None,
+        transaction_type: str = None,
+        yield_per: int = 1000
+    ) -> AsyncIterator[List[RowMapping]]:
+
+        query = self.build_statement_query(
+            account_urn=account_urn,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            transaction_type=transaction_type
+        ).execution_options(yield_per=yield_per)
+
+        result = await self.session.stream(query)  # Open a server-side cursor over the ordered statement rows.
+        try:
+            async for partition in result.mappings().partitions():
+                yield partition  # Hand out one partition of statement rows at a time.
+
+        finally:
+            await result.close()  # Release the cursor even if the consumer stops early.
@@ -1,19 +1,20 @@
-import bcrypt
-#
-from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 #
 from models.user import User
 #
 from abstractions.repository import IRepository
+#
+from utilities.metrics import measure_execution_time
 
-# The UserRepository class handles all database operations related to users,
-# such as creating, updating, and retrieving user records based on various filters.
-class UserRepository(IRepository):
+# The AsyncUserRepository class handles all database operations related to users on the request path,
+# such as creating, updating, and retrieving user records, awaiting an AsyncSession so the event loop is never blocked on a query.
+class AsyncUserRepository(IRepository):
 
-    # Constructor that initializes the repository with parameters like URN, user URN, API name, and a database session.
+    # Constructor that initializes the repository with parameters like URN, user URN, API name, and an async database session.
     # The session is required to interact with the database. Raises an error if the session is missing.
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: Session = None):
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, session: AsyncSession = None):
         super().__init__(urn, user_urn, api_name)
         self.urn = urn
         self.user_urn = user_urn
@@ -22,115 +23,101 @@ class UserRepository(IRepository):
 
         if not self.session:
             raise RuntimeError("DB session not found")
-        
+
     # Method to create a new user record in the database.
-    # Adds the user to the session and commits the transaction, logging the execution time.
-    def create_record(self, user: User) -> User:
+    @measure_execution_time
+    async def create_record(self, user: User) -> User:
 
-        start_time = datetime.now()
         self.session.add(user)
-        self.session.commit()
-
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        await self.session.commit()
 
         return user
 
     # Method to retrieve a user record by email and password.
-    # Filters the query based on the provided email, password, and whether the user is marked as deleted.
-    def retrieve_record_by_email_and_password(
+    @measure_execution_time
+    async def retrieve_record_by_email_and_password(
         self, 
         email: str, 
         password: str,
         is_deleted: bool = False
     ) -> User:
 
-        start_time = datetime.now()
-        record = self.session.query(User).filter(
+        result = await self.session.execute(select(User).filter(
             User.email == email, 
             User.password == password, 
             User.is_deleted == is_deleted
-        ).first()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        ))
+        record = result.scalars().first()
 
         return record if record else None
 
     # Method to retrieve a user record by email.
-    # This method is useful when searching for users by their email address and checking if they are not deleted.
-    def retrieve_record_by_email(
+    @measure_execution_time
+    async def retrieve_record_by_email(
         self, 
         email: str,
         is_deleted: bool = False
     ) -> User:
 
-        start_time = datetime.now()
-        record = self.session.query(User).filter(
+        result = await self.session.execute(select(User).filter(
             User.email == email,
             User.is_deleted == is_deleted
-        ).first()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        ))
+        record = result.scalars().first()
 
         return record if record else None
 
     # Method to retrieve a user record by user ID.
-    # This method checks if the user exists and is not deleted.
-    def retrieve_record_by_id(self, id: str, is_deleted: bool = False) -> User:
+    @measure_execution_time
+    async def retrieve_record_by_id(self, id: str, is_deleted: bool = False) -> User:
 
-        start_time = datetime.now()
-        record = self.session.query(User).filter(User.id == id, User.is_deleted == is_deleted).first()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        result = await self.session.execute(select(User).filter(User.id == id, User.is_deleted == is_deleted))
+        record = result.scalars().first()
 
         return record if record else None
-    
+
+    # Method to retrieve the user records of several user IDs in a single query.
+    @measure_execution_time
+    async def retrieve_records_by_ids(self, ids: List[int], is_deleted: bool = False) -> List[User]:
+
+        result = await self.session.execute(select(User).filter(User.id.in_(ids), User.is_deleted == is_deleted))
+        records = result.scalars().all()
+
+        return records
+
     # Method to retrieve a user record by ID and check if the user is logged in.
-    # This method can be used to check the login status of a specific user.
-    def retrieve_record_by_id_and_is_logged_in(self, id: str, is_logged_in: bool, is_deleted: bool = False) -> User:
+    @measure_execution_time
+    async def retrieve_record_by_id_and_is_logged_in(self, id: str, is_logged_in: bool, is_deleted: bool = False) -> User:
 
-        start_time = datetime.now()
-        records = self.session.query(User).filter(User.id == id, User.is_logged_in == is_logged_in, User.is_deleted == is_deleted).all()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        result = await self.session.execute(select(User).filter(User.id == id, User.is_logged_in == is_logged_in, User.is_deleted == is_deleted))
+        records = result.scalars().all()
 
         return records
-    
-    # Similar to the above, this method checks if a user is logged in based on the user's ID.
-    # It retrieves only the logged-in user records, which is useful for authentication and session management.
-    def retrieve_record_by_id_is_logged_in(self, id: int,  is_logged_in: bool, is_deleted: bool = False) -> User:
 
-        start_time = datetime.now()
-        record = self.session.query(User).filter(User.id == id, User.is_logged_in == is_logged_in, User.is_deleted == is_deleted).one_or_none()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+    # Similar to the above, this method returns the single logged-in user record for the given ID, or None.
+    @measure_execution_time
+    async def retrieve_record_by_id_is_logged_in(self, id: int,  is_logged_in: bool, is_deleted: bool = False) -> User:
+
+        result = await self.session.execute(select(User).filter(User.id == id, User.is_logged_in == is_logged_in, User.is_deleted == is_deleted))
+        record = result.scalars().one_or_none()
 
         return record
-    
+
     # Method to retrieve all users who are currently logged in.
-    # This is helpful for tracking active sessions in an application.
-    def retrieve_record_by_is_logged_in(self, is_logged_in: bool, is_deleted: bool = False) -> User:
+    @measure_execution_time
+    async def retrieve_record_by_is_logged_in(self, is_logged_in: bool, is_deleted: bool = False) -> User:
 
-        start_time = datetime.now()
-        records = self.session.query(User).filter(User.is_logged_in == is_logged_in, User.is_deleted == is_deleted).all()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        result = await self.session.execute(select(User).filter(User.is_logged_in == is_logged_in, User.is_deleted == is_deleted))
+        records = result.scalars().all()
 
         return records
-    
+
     # Method to update a user record in the database.
-    # This method takes the user ID and a dictionary of new data to update the corresponding fields.
-    def update_record(self, id: str, new_data: dict) -> User:
+    @measure_execution_time
+    async def update_record(self, id: str, new_data: dict) -> User:
 
-        start_time = datetime.now()
-        user = self.session.query(User).filter(User.id == id).first()
+        result = await self.session.execute(select(User).filter(User.id == id))
+        user = result.scalars().first()
 
         if not user:
             raise ValueError(f"User with id {id} not found")
@@ -138,9 +125,6 @@ class UserRepository(IRepository):
         for attr, value in new_data.items():
             setattr(user, attr, value)
 
-        self.session.commit()
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        self.logger.info(f"Execution time: {execution_time} seconds")
+        await self.session.commit()
 
         return user
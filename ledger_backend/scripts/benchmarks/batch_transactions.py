@@ -0,0 +1,99 @@
+# Benchmark of a payroll-style payout from one funding account, sent as single transfers and as one batch.
+# The same transfers are created once with one /apis/create/transaction request each and once with a single
+# /apis/create/transactions request, and the wall time and database queries of both are reported.
+# The app runs in-process on a throwaway SQLite database.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/batch_transactions.py [--transfers 1000] [--payees 50]
+import argparse
+import asyncio
+import tempfile
+import time
+#
+from typing import List
+
+import sqlite_app
+
+# Credentials of the user owning the funding and payee accounts
+CREDENTIALS: dict = {"reference_number": "benchmark", "email": "payroll@example.com", "password": "benchmark"}
+
+# Fields every API request carries
+BASE_REQUEST: dict = {"reference_number": "benchmark", "consent": True, "purpose": "payroll"}
+
+
+# Create an account through the API and return its URN
+async def create_account(client, headers: dict, name: str) -> str:
+
+    response = await client.post("/apis/create/account", json={**BASE_REQUEST, "account_name": name, "currency_code": "USD"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["account_urn"]
+
+
+# Return the number of queries run by the worker so far
+def query_count() -> float:
+
+    from utilities.metrics import MetricsRegistry
+
+    return sum(MetricsRegistry().db_queries.values.values())
+
+
+async def main(transfers: int, payees: int) -> None:
+
+    import httpx
+
+    sqlite_app.prepare(work_dir=tempfile.mkdtemp(prefix="fintrack-benchmark-"))
+    from app import app
+    sqlite_app.quiet_logs()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            await client.post("/user/register", json=CREDENTIALS)
+            response = await client.post("/user/login", json=CREDENTIALS)
+            headers = {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+            # Fund one account with enough for both runs, and create the payee accounts
+            funding_account_urn = await create_account(client=client, headers=headers, name="funding")
+            payee_account_urns: List[str] = [await create_account(client=client, headers=headers, name=f"payee-{index}") for index in range(payees)]
+            response = await client.post(
+                "/apis/create/transaction",
+                json={**BASE_REQUEST, "payer_account_urn": None, "payee_account_urn": funding_account_urn, "amount": transfers * 2},
+                headers=headers
+            )
+            assert response.status_code == 200, response.text
+
+            items = [
+                {"payer_account_urn": funding_account_urn, "payee_account_urn": payee_account_urns[index % payees], "amount": 1}
+                for index in range(transfers)
+            ]
+
+            # Send every transfer as its own request
+            queries = query_count()
+            start = time.perf_counter()
+            for item in items:
+                response = await client.post("/apis/create/transaction", json={**BASE_REQUEST, **item}, headers=headers)
+                assert response.status_code == 200, response.text
+            single_seconds = time.perf_counter() - start
+            single_queries = query_count() - queries
+
+            # Send all transfers in one batch
+            queries = query_count()
+            start = time.perf_counter()
+            response = await client.post("/apis/create/transactions", json={**BASE_REQUEST, "transactions": items}, headers=headers)
+            batch_seconds = time.perf_counter() - start
+            batch_queries = query_count() - queries
+            assert response.status_code == 200 and response.json()["data"]["created_count"] == transfers, response.text
+
+    print(f"{transfers} transfers from one account to {payees} payees")
+    print(f"{'single':<8} time: {single_seconds * 1000:10.1f} ms | queries: {single_queries:8.0f}")
+    print(f"{'batch':<8} time: {batch_seconds * 1000:10.1f} ms | queries: {batch_queries:8.0f}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Single transfers against one batch of transfers")
+    parser.add_argument("--transfers", type=int, default=1000)
+    parser.add_argument("--payees", type=int, default=50)
+    arguments = parser.parse_args()
+
+    asyncio.run(main(transfers=arguments.transfers, payees=arguments.payees))
@@ -0,0 +1,75 @@
+# Benchmark of totalling the credits and debits of every account over the transaction columns.
+# Per-row Python arithmetic on float amounts, as the balances were summed before amounts were stored in minor units,
+# is compared with the NumPy int64 vector sums used by the reconciliation job, on synthetic transactions.
+# The float totals also show the rounding drift that integer minor units avoid.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/ledger_totals.py [--transactions 1000000] [--accounts 10000]
+import argparse
+import os
+import random
+import sys
+import time
+#
+from collections import defaultdict
+from typing import Dict, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+#
+from utilities.money import add_account_totals
+
+
+# Total credits and debits per account with a Python loop over float amounts in major units
+def total_with_python(payer_account_ids: list, payee_account_ids: list, amounts: list) -> Tuple[Dict[int, float], Dict[int, float]]:
+
+    credits: Dict[int, float] = defaultdict(float)
+    debits: Dict[int, float] = defaultdict(float)
+    for payer_account_id, payee_account_id, amount in zip(payer_account_ids, payee_account_ids, amounts):
+        if payee_account_id:
+            credits[payee_account_id] += amount
+        if payer_account_id:
+            debits[payer_account_id] += amount
+    return credits, debits
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Per-row float totals against NumPy int64 vector sums")
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--accounts", type=int, default=10000)
+    arguments = parser.parse_args()
+
+    # Random transfers of up to 1000.00 between accounts, with 10% deposits, as fetched columns
+    randomizer = random.Random(7)
+    payer_account_ids = [0 if randomizer.random() < 0.1 else randomizer.randint(1, arguments.accounts) for _ in range(arguments.transactions)]
+    payee_account_ids = [randomizer.randint(1, arguments.accounts) for _ in range(arguments.transactions)]
+    minor_units = [randomizer.randint(1, 100000) for _ in range(arguments.transactions)]
+    major_units = [amount / 100 for amount in minor_units]
+
+    start = time.perf_counter()
+    python_credits, python_debits = total_with_python(payer_account_ids, payee_account_ids, major_units)
+    python_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    account_ids = np.arange(1, arguments.accounts + 1, dtype=np.int64)
+    credits = np.zeros(arguments.accounts, dtype=np.int64)
+    debits = np.zeros(arguments.accounts, dtype=np.int64)
+    add_account_totals(
+        account_ids=account_ids,
+        credits=credits,
+        debits=debits,
+        payer_account_ids=np.array(payer_account_ids, dtype=np.int64),
+        payee_account_ids=np.array(payee_account_ids, dtype=np.int64),
+        amounts=np.array(minor_units, dtype=np.int64)
+    )
+    numpy_seconds = time.perf_counter() - start
+
+    # Count the accounts whose float credit total is not the exact total in cents
+    drifted = sum(1 for index, account_id in enumerate(account_ids.tolist()) if python_credits[account_id] * 100 != credits[index])
+
+    print(f"{arguments.transactions} transactions over {arguments.accounts} accounts")
+    print(f"{'python':<8} time: {python_seconds * 1000:8.1f} ms")
+    print(f"{'numpy':<8} time: {numpy_seconds * 1000:8.1f} ms")
+    print(f"accounts whose float credit total is not exact: {drifted}")
@@ -0,0 +1,338 @@
+# End-to-end load test of the ledger API.
+# The app runs in-process with its lifespan, by default on a throwaway SQLite database, or on an existing migrated
+# database when --config points at its config.json (e.g. a local MySQL). Users, accounts and transactions are seeded
+# through the API, then concurrent clients drive a weighted mix of register, login, create transaction, fetch account,
+# fetch usr-account and fetch statement calls for a fixed duration. Throughput and p50/p95/p99 latencies are reported
+# per endpoint, and the results are written as JSON together with the commit they were measured on, so that runs of
+# different commits can be compared with --baseline.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/load_test.py [--users 20] [--concurrency 32] [--duration 20] [--output load_test.json]
+#   python scripts/benchmarks/load_test.py --baseline load_test_before.json --output load_test_after.json
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import ulid
+#
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List
+
+import sqlite_app
+
+# Relative weight of each operation in the request mix
+OPERATION_WEIGHTS: Dict[str, int] = {
+    "fetch_usr_account": 30,
+    "fetch_account": 20,
+    "create_transaction": 20,
+    "fetch_statement": 20,
+    "login": 5,
+    "register": 5,
+}
+
+# Fields every API request carries
+BASE_PAYLOAD: Dict = {"reference_number": "load-test", "consent": True, "purpose": "load test"}
+
+# Amount deposited into every seeded account, large enough that the transfers of a run never run out
+DEPOSIT_AMOUNT: float = 1_000_000
+
+# Password of every user created by the load test
+PASSWORD: str = "load-test"
+
+# Statement page size requested by the fetch statement calls
+STATEMENT_PAGE_SIZE: int = 50
+
+
+# A seeded user with its authorization headers and account URNs
+@dataclass
+class SeededUser:
+    email: str
+    headers: dict
+    account_urns: List[str] = field(default_factory=list)
+
+
+# Latencies and failures recorded per endpoint
+@dataclass
+class EndpointResults:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+# Send a request, failing the run if it was not answered successfully; used while seeding
+async def checked(response_future) -> dict:
+
+    response = await response_future
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+# Register and log in a user, give it accounts funded with a deposit, and return it
+async def seed_user(client, run_id: str, index: int, accounts_per_user: int) -> SeededUser:
+
+    email = f"load-test-{run_id}-{index}@example.com"
+    credentials = {"reference_number": "load-test", "email": email, "password": PASSWORD}
+    await checked(client.post("/user/register", json=credentials))
+    token = (await checked(client.post("/user/login", json=credentials)))["token"]
+    user = SeededUser(email=email, headers={"Authorization": f"Bearer {token}"})
+
+    for account_index in range(accounts_per_user):
+        account = await checked(client.post(
+            "/apis/create/account",
+            json=dict(BASE_PAYLOAD, account_name=f"load test {account_index}", currency_code="USD"),
+            headers=user.headers
+        ))
+        await checked(client.post(
+            "/apis/create/transaction",
+            json=dict(BASE_PAYLOAD, payer_account_urn=None, payee_account_urn=account["account_urn"], amount=DEPOSIT_AMOUNT),
+            headers=user.headers
+        ))
+        user.account_urns.append(account["account_urn"])
+
+    return user
+
+
+# Seed the users and their accounts, then give every account a statement history of transfers to random accounts
+async def seed(client, run_id: str, users: int, accounts_per_user: int, transactions_per_account: int, rng: random.Random) -> List[SeededUser]:
+
+    seeded_users: List[SeededUser] = list(await asyncio.gather(*[
+        seed_user(client=client, run_id=run_id, index=index, accounts_per_user=accounts_per_user)
+        for index in range(users)
+    ]))
+
+    all_account_urns = [account_urn for user in seeded_users for account_urn in user.account_urns]
+    for user in seeded_users:
+        await asyncio.gather(*[
+            checked(client.post(
+                "/apis/create/transaction",
+                json=dict(BASE_PAYLOAD, payer_account_urn=account_urn, payee_account_urn=payee_account_urn, amount=1),
+                headers=user.headers
+            ))
+            for account_urn in user.account_urns
+            for payee_account_urn in [rng.choice([urn for urn in all_account_urns if urn != account_urn]) for _ in range(transactions_per_account)]
+        ])
+
+    return seeded_users
+
+
+# Send one request of the given operation on behalf of a random seeded user
+async def send_operation(client, operation: str, seeded_users: List[SeededUser], all_account_urns: List[str], run_id: str, rng: random.Random):
+
+    user = rng.choice(seeded_users)
+    account_urn = rng.choice(user.account_urns)
+
+    if operation == "fetch_usr_account":
+        return await client.get("/apis/fetch/usr-account", headers=user.headers)
+
+    if operation == "fetch_account":
+        return await client.post("/apis/fetch/account", json=dict(BASE_PAYLOAD, account_urn=account_urn), headers=user.headers)
+
+    if operation == "fetch_statement":
+        return await client.post(
+            "/apis/fetch/statement",
+            json=dict(BASE_PAYLOAD, account_urn=account_urn, limit=STATEMENT_PAGE_SIZE),
+            headers=user.headers
+        )
+
+    if operation == "create_transaction":
+        payee_account_urn = rng.choice([urn for urn in all_account_urns if urn != account_urn])
+        return await client.post(
+            "/apis/create/transaction",
+            json=dict(BASE_PAYLOAD, payer_account_urn=account_urn, payee_account_urn=payee_account_urn, amount=1),
+            headers=user.headers
+        )
+
+    if operation == "login":
+        return await client.post("/user/login", json={"reference_number": "load-test", "email": user.email, "password": PASSWORD})
+
+    if operation == "register":
+        email = f"load-test-{run_id}-{ulid.ulid()}@example.com"
+        return await client.post("/user/register", json={"reference_number": "load-test", "email": email, "password": PASSWORD})
+
+    raise ValueError(f"Unknown operation {operation}")
+
+
+# Send operations of the mix back to back until the deadline, recording the latency and outcome of each one
+async def client_loop(client, seeded_users: List[SeededUser], all_account_urns: List[str], run_id: str, deadline: float, rng: random.Random, results: Dict[str, EndpointResults]) -> None:
+
+    operations = list(OPERATION_WEIGHTS.keys())
+    weights = list(OPERATION_WEIGHTS.values())
+
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights=weights)[0]
+        start = time.perf_counter()
+
+        # Cached requests complete without suspending, so yield like the network round-trip of a real client would
+        await asyncio.sleep(0)
+        response = await send_operation(
+            client=client,
+            operation=operation,
+            seeded_users=seeded_users,
+            all_account_urns=all_account_urns,
+            run_id=run_id,
+            rng=rng
+        )
+        results[operation].latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            results[operation].errors += 1
+
+
+# Summarize the latencies of an endpoint as throughput and percentiles in milliseconds
+def summarize(results: EndpointResults, elapsed: float) -> dict:
+
+    latencies = sorted(results.latencies)
+    if not latencies:
+        return {"requests": 0, "errors": results.errors, "throughput": 0.0}
+
+    percentile = lambda fraction: round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": results.errors,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+# Return the commit the backend is checked out at, so that results can be matched to the code they measured
+def current_commit() -> str:
+
+    completed = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=sqlite_app.BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    return completed.stdout.strip() or None
+
+
+# Print the summary of every endpoint, with the change from the baseline run when one is given
+def report(summary: dict, baseline: dict = None) -> None:
+
+    for name, endpoint in summary["endpoints"].items():
+        line = f"{name:<20} requests: {endpoint['requests']:6d} | errors: {endpoint['errors']:4d} | {endpoint['throughput']:8.1f} req/s"
+        if endpoint["requests"]:
+            line += f" | p50: {endpoint['p50_ms']:8.2f} ms | p95: {endpoint['p95_ms']:8.2f} ms | p99: {endpoint['p99_ms']:8.2f} ms"
+
+        baseline_endpoint = (baseline or {}).get("endpoints", {}).get(name)
+        if baseline_endpoint and baseline_endpoint.get("requests") and endpoint["requests"]:
+            line += f" | vs {baseline.get('commit')}: p99 {endpoint['p99_ms'] - baseline_endpoint['p99_ms']:+.2f} ms, {endpoint['throughput'] - baseline_endpoint['throughput']:+.1f} req/s"
+
+        print(line)
+
+
+async def main(arguments: argparse.Namespace) -> None:
+
+    import httpx
+
+    rng = random.Random(arguments.seed)
+    run_id = ulid.ulid().lower()
+
+    # Boot on a throwaway SQLite database, or on the database of the given configuration
+    work_dir = tempfile.mkdtemp(prefix="fintrack-load-test-")
+    if arguments.config:
+        os.makedirs(os.path.join(work_dir, "config", "db"))
+        shutil.copy(arguments.config, os.path.join(work_dir, "config", "db", "config.json"))
+        sqlite_app.use_work_dir(work_dir=work_dir)
+    else:
+        sqlite_app.prepare(work_dir=work_dir, pool_size=arguments.pool_size, max_overflow=arguments.pool_size * 2)
+
+    from app import app
+    sqlite_app.quiet_logs()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+
+            seed_start = time.perf_counter()
+            seeded_users = await seed(
+                client=client,
+                run_id=run_id,
+                users=arguments.users,
+                accounts_per_user=arguments.accounts_per_user,
+                transactions_per_account=arguments.transactions_per_account,
+                rng=rng
+            )
+            all_account_urns = [account_urn for user in seeded_users for account_urn in user.account_urns]
+            print(f"seeded {len(seeded_users)} users with {len(all_account_urns)} accounts in {time.perf_counter() - seed_start:.1f} s")
+
+            results: Dict[str, EndpointResults] = {operation: EndpointResults() for operation in OPERATION_WEIGHTS}
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                client_loop(
+                    client=client,
+                    seeded_users=seeded_users,
+                    all_account_urns=all_account_urns,
+                    run_id=run_id,
+                    deadline=start + arguments.duration,
+                    rng=random.Random(rng.random()),
+                    results=results
+                )
+                for _ in range(arguments.concurrency)
+            ])
+            elapsed = time.perf_counter() - start
+
+    total = EndpointResults(
+        latencies=[latency for endpoint in results.values() for latency in endpoint.latencies],
+        errors=sum(endpoint.errors for endpoint in results.values())
+    )
+    summary = {
+        "commit": current_commit(),
+        "created_on": datetime.now().isoformat(timespec="seconds"),
+        "database": "config" if arguments.config else "sqlite",
+        "settings": {
+            "users": arguments.users,
+            "accounts_per_user": arguments.accounts_per_user,
+            "transactions_per_account": arguments.transactions_per_account,
+            "concurrency": arguments.concurrency,
+            "duration": arguments.duration,
+            "seed": arguments.seed,
+            "operation_weights": OPERATION_WEIGHTS,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "endpoints": {name: summarize(results=endpoint, elapsed=elapsed) for name, endpoint in results.items()},
+        "total": summarize(results=total, elapsed=elapsed),
+    }
+
+    baseline = None
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+
+    print(f"{arguments.concurrency} clients for {elapsed:.1f} s")
+    report(summary=summary, baseline=baseline)
+    report(summary={"endpoints": {"total": summary["total"]}}, baseline={"commit": (baseline or {}).get("commit"), "endpoints": {"total": (baseline or {}).get("total")}})
+
+    with open(arguments.output, "w") as file:
+        json.dump(summary, file, indent=2)
+    print(f"results written to {arguments.output}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load test of the ledger API with a concurrent mix of calls")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--accounts-per-user", type=int, default=2)
+    parser.add_argument("--transactions-per-account", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--config", help="config.json of an existing migrated database to run against instead of SQLite")
+    parser.add_argument("--baseline", help="results of an earlier run to compare against")
+    parser.add_argument("--output", default="load_test.json")
+    arguments = parser.parse_args()
+
+    # The app runs from a work directory, so keep the paths given on the command line relative to the caller
+    for path in ("config", "baseline", "output"):
+        if getattr(arguments, path):
+            setattr(arguments, path, os.path.abspath(getattr(arguments, path)))
+
+    asyncio.run(main(arguments=arguments))
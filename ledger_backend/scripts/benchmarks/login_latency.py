@@ -0,0 +1,100 @@
+# Benchmark of the login latency while other API traffic is served by the same worker.
+# Background clients keep requesting /apis/fetch/usr-account while login clients log in back to back,
+# so the background latencies show how long the event loop is held by password hashing during a login.
+# The app runs in-process on a throwaway SQLite database with the production bcrypt cost.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/login_latency.py [--background 16] [--logins 2] [--duration 20]
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+#
+from typing import Dict, List
+
+from middleware_throughput import seed
+
+import sqlite_app
+
+# Credentials of the user logging in repeatedly, distinct from the user of the background traffic
+LOGIN_CREDENTIALS: Dict[str, str] = {"reference_number": "benchmark", "email": "login@example.com", "password": "benchmark"}
+
+
+# Send background requests back to back until the deadline, recording the latency of each one
+async def background_loop(client, headers: dict, deadline: float, latencies: List[float]) -> None:
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+
+        # Cached requests complete without suspending, so yield like the network round-trip of a real client would
+        # Time spent waiting for the event loop here is part of the latency the client sees
+        await asyncio.sleep(0)
+        response = await client.get("/apis/fetch/usr-account", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+
+# Log in back to back until the deadline, recording the latency of each login
+async def login_loop(client, deadline: float, latencies: List[float]) -> None:
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/user/login", json=LOGIN_CREDENTIALS)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+
+# Print the count and percentiles of a list of latencies in milliseconds
+def report(name: str, latencies: List[float]) -> None:
+
+    latencies.sort()
+    percentile = lambda fraction: latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+    print(f"{name:<12} requests: {len(latencies):6d} | p50: {percentile(0.50):8.2f} ms | p95: {percentile(0.95):8.2f} ms | p99: {percentile(0.99):8.2f} ms")
+
+
+async def main(background: int, logins: int, duration: float) -> None:
+
+    import httpx
+
+    # Hash passwords with the production cost rather than the cheap default of the benchmark app
+    os.environ["BCRYPT_SALT"] = "$2b$12$abcdefghijklmnopqrstuu"
+    os.environ["BCRYPT_ROUNDS"] = "12"
+
+    database = sqlite_app.prepare(work_dir=tempfile.mkdtemp(prefix="fintrack-benchmark-"))
+    from app import app
+    sqlite_app.quiet_logs()
+
+    # Run the app's startup and shutdown as a server would, which also closes its pooled connections at the end
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            headers = await seed(client=client, database=database)
+            await client.post("/user/register", json=LOGIN_CREDENTIALS)
+
+            # Warm up the connection pool and caches before measuring
+            await client.post("/user/login", json=LOGIN_CREDENTIALS)
+            await asyncio.gather(*[client.get("/apis/fetch/usr-account", headers=headers) for _ in range(background)])
+
+            background_latencies: List[float] = []
+            login_latencies: List[float] = []
+            deadline = time.perf_counter() + duration
+            await asyncio.gather(
+                *[background_loop(client=client, headers=headers, deadline=deadline, latencies=background_latencies) for _ in range(background)],
+                *[login_loop(client=client, deadline=deadline, latencies=login_latencies) for _ in range(logins)]
+            )
+
+    print(f"{background} background clients and {logins} login clients for {duration:.0f} s")
+    report(name="login", latencies=login_latencies)
+    report(name="background", latencies=background_latencies)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Login latency under background API traffic")
+    parser.add_argument("--background", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=20)
+    arguments = parser.parse_args()
+
+    asyncio.run(main(background=arguments.background, logins=arguments.logins, duration=arguments.duration))
@@ -0,0 +1,95 @@
+# Benchmark of the requests per second served by /apis/fetch/usr-account through the full middleware stack.
+# The app runs in-process on a throwaway SQLite database and is driven by concurrent clients over ASGI,
+# so the numbers reflect the middlewares, routing and services rather than network or server overhead.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/middleware_throughput.py [--concurrency 32] [--duration 10]
+import argparse
+import asyncio
+import tempfile
+import time
+#
+from datetime import datetime
+from typing import List
+
+import sqlite_app
+
+
+# Register and log in a user, then give it two accounts; returns the authorization headers
+async def seed(client, database: str) -> dict:
+
+    import sqlite3
+
+    credentials = {"reference_number": "benchmark", "email": "benchmark@example.com", "password": "benchmark"}
+    await client.post("/user/register", json=credentials)
+    response = await client.post("/user/login", json=credentials)
+    token = response.json()["data"]["token"]
+
+    # Accounts are inserted directly so that no account creation emails are sent
+    connection = sqlite3.connect(database)
+    user_id = connection.execute("SELECT id FROM user WHERE email = ?", (credentials["email"],)).fetchone()[0]
+    for index in range(2):
+        account_urn = f"ACCOUNT_BENCHMARK_{index}"
+        account_id = connection.execute(
+            "INSERT INTO account (urn, user_id, name, currency_id, is_deleted, created_on) VALUES (?, ?, ?, 1, 0, ?)",
+            (account_urn, user_id, f"benchmark {index}", datetime.now())
+        ).lastrowid
+        connection.execute(
+            "INSERT INTO balances (account_id, account_urn, total_balance, total_credit_balance, total_debit_balance, created_on) VALUES (?, ?, 0, 0, 0, ?)",
+            (account_id, account_urn, datetime.now())
+        )
+    connection.commit()
+    connection.close()
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+# Send requests back to back until the deadline, recording the latency of each one
+async def client_loop(client, headers: dict, deadline: float, latencies: List[float]) -> None:
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/apis/fetch/usr-account", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+
+async def main(concurrency: int, duration: float) -> None:
+
+    import httpx
+
+    database = sqlite_app.prepare(work_dir=tempfile.mkdtemp(prefix="fintrack-benchmark-"))
+    from app import app
+    sqlite_app.quiet_logs()
+
+    # Run the app's startup and shutdown as a server would, which also closes its pooled connections at the end
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            headers = await seed(client=client, database=database)
+
+            # Warm up the connection pool and caches before measuring
+            await asyncio.gather(*[client.get("/apis/fetch/usr-account", headers=headers) for _ in range(concurrency)])
+
+            latencies: List[float] = []
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                client_loop(client=client, headers=headers, deadline=start + duration, latencies=latencies)
+                for _ in range(concurrency)
+            ])
+            elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"requests: {len(latencies)} in {elapsed:.1f} s with {concurrency} concurrent clients")
+    print(f"throughput: {len(latencies) / elapsed:.1f} requests/s")
+    print(f"latency p50: {latencies[len(latencies) // 2] * 1000:.2f} ms | p99: {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Requests per second of /apis/fetch/usr-account")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    arguments = parser.parse_args()
+
+    asyncio.run(main(concurrency=arguments.concurrency, duration=arguments.duration))
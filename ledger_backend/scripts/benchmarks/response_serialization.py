@@ -0,0 +1,71 @@
+# Benchmark of rendering a statement response, comparing the former JSONResponse path with ORJSONResponse.
+# The former path converts every timestamp to a string, walks the DTO with dataclasses_json to_dict and encodes
+# the result with the standard library json module; the current path hands the DTO with datetimes to orjson.
+# Both responses are checked to render to the same bytes before they are timed.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/response_serialization.py
+import os
+import sys
+import timeit
+#
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi.responses import JSONResponse
+#
+from dtos.responses.base import BaseResponseDTO
+#
+from statement_serialization import COLUMNS, build_rows
+#
+from utilities.orjson_response import ORJSONResponse
+
+# Row counts the two paths are compared at
+ROW_COUNTS: List[int] = [100, 1_000, 10_000]
+
+# Number of timed runs per path and row count; the best run is reported
+REPEAT: int = 5
+
+
+# Build the statement response DTO as the statement service does, with or without string timestamps
+def build_response_dto(rows: List[Dict], timestamps_as_strings: bool) -> BaseResponseDTO:
+
+    transactions = [{column: row[column] for column in COLUMNS} for row in rows]
+    if timestamps_as_strings:
+        for transaction in transactions:
+            transaction["transaction_timestamp"] = str(transaction["transaction_timestamp"])
+
+    return BaseResponseDTO(
+        transaction_urn="benchmark",
+        status="SUCCESS",
+        response_message="Successfully created ledger account.",
+        response_key="success_payee_account_creation",
+        data={"transactions": transactions, "next_cursor": None}
+    )
+
+
+# The former path: string timestamps, to_dict, then the standard library encoder
+def render_with_json_response(rows: List[Dict]) -> bytes:
+
+    return JSONResponse(content=build_response_dto(rows=rows, timestamps_as_strings=True).to_dict()).body
+
+
+# The current path: the DTO with datetimes is rendered by orjson
+def render_with_orjson_response(rows: List[Dict]) -> bytes:
+
+    return ORJSONResponse(content=build_response_dto(rows=rows, timestamps_as_strings=False)).body
+
+
+if __name__ == "__main__":
+
+    for row_count in ROW_COUNTS:
+        rows = build_rows(row_count=row_count)
+        assert render_with_json_response(rows=rows) == render_with_orjson_response(rows=rows)
+
+        json_time = min(timeit.repeat(lambda: render_with_json_response(rows=rows), number=1, repeat=REPEAT))
+        orjson_time = min(timeit.repeat(lambda: render_with_orjson_response(rows=rows), number=1, repeat=REPEAT))
+        print(
+            f"{row_count:>6} rows | JSONResponse: {json_time * 1000:8.2f} ms | ORJSONResponse: {orjson_time * 1000:8.2f} ms"
+            f" | speedup: {json_time / orjson_time:5.1f}x"
+        )
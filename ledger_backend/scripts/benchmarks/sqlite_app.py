@@ -0,0 +1,102 @@
+# Helpers to boot the ledger backend on a throwaway SQLite database, for the benchmarks in this folder and the tests.
+# The backend reads config/db/config.json relative to the working directory and loads currencies in its lifespan,
+# so prepare() has to run before the app is imported and the lifespan has to run before requests are served.
+import importlib
+import json
+import os
+import sqlite3
+import sys
+#
+from pathlib import Path
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.compiler import compiles
+from typing import List
+
+# Root of the backend package, two levels above this folder
+BACKEND_DIR: Path = Path(__file__).resolve().parents[2]
+
+# Model modules in foreign key order, each with its own declarative base
+MODEL_MODULES: List[str] = [
+    "models.user",
+    "models.currency_lk",
+    "models.account",
+    "models.balances",
+    "models.transaction",
+    "models.notification_outbox",
+    "models.account_daily_rollup",
+    "models.balance_checkpoint",
+]
+
+# Currencies seeded into the lookup table
+CURRENCIES: List[tuple] = [
+    ("USD", "USD", "United States dollar"),
+    ("EUR", "EUR", "Euro"),
+]
+
+
+# SQLite only auto-increments INTEGER primary keys, so BIGINT keys are created as INTEGER there
+@compiles(BigInteger, "sqlite")
+def compile_big_integer_for_sqlite(type_, compiler, **kwargs) -> str:
+    return "INTEGER"
+
+
+# Run the backend from work_dir, whose config/db/config.json it reads, with the settings it expects from its .env file
+def use_work_dir(work_dir: str) -> None:
+
+    os.chdir(work_dir)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("BCRYPT_SALT", "$2b$04$abcdefghijklmnopqrstuu")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("NOTIFICATION_DISPATCHER_ENABLED", "false")
+
+
+# Write a SQLite configuration into work_dir, switch to it and create the schema with seeded currencies
+def prepare(work_dir: str, pool_size: int = 10, max_overflow: int = 20) -> str:
+
+    database = os.path.join(work_dir, "benchmark.db")
+    os.makedirs(os.path.join(work_dir, "config", "db"), exist_ok=True)
+    if os.path.exists(database):
+        os.remove(database)
+
+    with open(os.path.join(work_dir, "config", "db", "config.json"), "w") as file:
+        json.dump(
+            {
+                "dialect": "sqlite",
+                "driver": "pysqlite",
+                "async_driver": "aiosqlite",
+                "database": database,
+                "pool_size": pool_size,
+                "max_overflow": max_overflow,
+            },
+            file
+        )
+
+    use_work_dir(work_dir=work_dir)
+
+    engine = create_engine(f"sqlite:///{database}")
+    for module_name in MODEL_MODULES:
+        module = importlib.import_module(module_name)
+        for value in vars(module).values():
+            if hasattr(value, "__table__"):
+                value.metadata.create_all(engine)
+    engine.dispose()
+
+    connection = sqlite3.connect(database)
+    connection.executemany("INSERT INTO currency_lk (code, name, description) VALUES (?, ?, ?)", CURRENCIES)
+    connection.commit()
+    connection.close()
+
+    return database
+
+
+# Keep only warnings and errors from the backend logger, so logging does not dominate the measurements
+def quiet_logs() -> None:
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
@@ -0,0 +1,112 @@
+# Benchmark of the statement serialization step, comparing the former pandas pipeline with the plain Python one.
+# Both paths turn the ordered statement rows returned by the repository into the list of dicts sent in the response.
+# It also measures how long importing pandas takes, which was paid by every worker at startup.
+#
+# Usage (from ledger_backend, pandas is only needed to run this benchmark):
+#   pip install pandas==2.2.2
+#   python scripts/benchmarks/statement_serialization.py
+import subprocess
+import sys
+import timeit
+#
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Row counts the two paths are compared at
+ROW_COUNTS: List[int] = [1_000, 100_000]
+
+# Number of timed runs per path and row count; the best run is reported
+REPEAT: int = 5
+
+# Columns returned to the client for every statement row
+COLUMNS: List[str] = [
+    "transaction_urn",
+    "payer_account_urn",
+    "payee_account_urn",
+    "amount",
+    "currency_code",
+    "transaction_timestamp",
+    "transaction_type",
+    "payer_account_name",
+    "payee_account_name",
+    "purpose",
+]
+
+
+# Build synthetic statement rows, newest first, shaped like the rows of the statement query
+def build_rows(row_count: int) -> List[Dict]:
+
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": row_count - index,
+            "transaction_urn": f"01J{index:023d}",
+            "payer_account_urn": "ACCOUNT_PAYER",
+            "payee_account_urn": "ACCOUNT_PAYEE",
+            "amount": float(index % 1000) + 0.25,
+            "currency_code": "USD",
+            "transaction_timestamp": start + timedelta(seconds=row_count - index, microseconds=index % 1000),
+            "transaction_type": "CREDIT" if index % 2 else "DEBIT",
+            "payer_account_name": "Payer",
+            "payee_account_name": "Payee",
+            "purpose": "benchmark",
+        }
+        for index in range(row_count)
+    ]
+
+
+# The former path: list of dicts, DataFrame, string timestamps, then back to a list of dicts
+def serialize_with_pandas(rows: List[Dict]) -> List[Dict]:
+
+    import pandas as pd
+
+    all_transactions = [{column: row[column] for column in COLUMNS} for row in rows]
+    df_transactions = pd.DataFrame(data=all_transactions)
+    df_transactions = df_transactions.sort_values(by="transaction_timestamp", ascending=False)
+    df_transactions["transaction_timestamp"] = df_transactions["transaction_timestamp"].astype("string")
+    return df_transactions.to_dict("records")
+
+
+# The current path: rows are already ordered by SQL, so one pass builds the response dicts
+def serialize_plain(rows: List[Dict]) -> List[Dict]:
+
+    return [
+        {
+            "transaction_urn": row["transaction_urn"],
+            "payer_account_urn": row["payer_account_urn"],
+            "payee_account_urn": row["payee_account_urn"],
+            "amount": row["amount"],
+            "currency_code": row["currency_code"],
+            "transaction_timestamp": str(row["transaction_timestamp"]) if row["transaction_timestamp"] else None,
+            "transaction_type": row["transaction_type"],
+            "payer_account_name": row["payer_account_name"],
+            "payee_account_name": row["payee_account_name"],
+            "purpose": row["purpose"],
+        }
+        for row in rows
+    ]
+
+
+# Measure the import time of a module in a fresh interpreter, in milliseconds
+def measure_import(module: str) -> float:
+
+    output = subprocess.check_output(
+        [sys.executable, "-c", f"import time; start = time.perf_counter(); import {module}; print((time.perf_counter() - start) * 1000)"]
+    )
+    return float(output.strip())
+
+
+if __name__ == "__main__":
+
+    print(f"import pandas: {measure_import('pandas'):.1f} ms")
+
+    for row_count in ROW_COUNTS:
+        rows = build_rows(row_count=row_count)
+        serialize_with_pandas(rows=rows[:10])  # Warm up pandas so its import is not timed
+
+        pandas_time = min(timeit.repeat(lambda: serialize_with_pandas(rows=rows), number=1, repeat=REPEAT))
+        plain_time = min(timeit.repeat(lambda: serialize_plain(rows=rows), number=1, repeat=REPEAT))
+        print(
+            f"{row_count:>7} rows | pandas: {pandas_time * 1000:9.2f} ms | plain: {plain_time * 1000:9.2f} ms"
+            f" | speedup: {pandas_time / plain_time:5.1f}x"
+        )
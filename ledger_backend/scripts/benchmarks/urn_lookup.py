@@ -0,0 +1,138 @@
+# Benchmark of the URN lookups on a ledger of 10^6 transactions, with and without the URN indexes of the models.
+# The schema is created from the models on a throwaway SQLite database and seeded directly with synthetic rows.
+# Each lookup is timed for a sample of accounts with the indexes in place, then again after dropping them.
+#
+# Usage (from ledger_backend):
+#   python scripts/benchmarks/urn_lookup.py [--transactions 1000000] [--accounts 10000] [--samples 200]
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+#
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import sqlite_app
+
+# Indexes added for the URN lookups, dropped for the second run
+URN_INDEXES: List[str] = [
+    "uq_account_urn",
+    "uq_balances_account_urn",
+    "uq_balances_account_id",
+    "uq_transaction_urn",
+    "idx_transaction_payee_account_urn_created_on",
+    "idx_transaction_payer_account_urn_created_on",
+]
+
+
+# Insert the accounts, their balances and random transfers between them
+def seed(database: str, account_count: int, transaction_count: int) -> List[str]:
+
+    connection = sqlite3.connect(database)
+    connection.execute("INSERT INTO user (urn, email, password, created_at, is_logged_in, is_deleted) VALUES ('USER', 'benchmark@example.com', '', ?, 0, 0)", (datetime.now(),))
+
+    account_urns = [f"ACCOUNT_{index:026d}" for index in range(account_count)]
+    connection.executemany(
+        "INSERT INTO account (id, urn, user_id, name, currency_id, is_deleted) VALUES (?, ?, 1, ?, 1, 0)",
+        ((index + 1, account_urn, account_urn) for index, account_urn in enumerate(account_urns))
+    )
+    connection.executemany(
+        "INSERT INTO balances (account_id, account_urn, total_balance, total_credit_balance, total_debit_balance) VALUES (?, ?, 0, 0, 0)",
+        ((index + 1, account_urn) for index, account_urn in enumerate(account_urns))
+    )
+
+    start = datetime(2024, 1, 1)
+    randomizer = random.Random(42)
+
+    def transactions():
+        for index in range(transaction_count):
+            payer, payee = randomizer.sample(range(account_count), 2)
+            yield (
+                f"{index:026d}",
+                payer + 1, account_urns[payer],
+                payee + 1, account_urns[payee],
+                randomizer.randint(1, 100000),
+                start + timedelta(seconds=index),
+            )
+
+    connection.executemany(
+        "INSERT INTO `transaction` (urn, payer_account_id, payer_account_urn, payee_account_id, payee_account_urn, amount, purpose, created_on) VALUES (?, ?, ?, ?, ?, ?, 'benchmark', ?)",
+        transactions()
+    )
+    connection.commit()
+    connection.close()
+
+    return account_urns
+
+
+# Time a lookup for every sampled account URN, returning the mean and p99 latency in milliseconds
+def measure(lookup: Callable[[str], None], account_urns: List[str]) -> Dict[str, float]:
+
+    latencies = []
+    for account_urn in account_urns:
+        start = time.perf_counter()
+        lookup(account_urn)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {"mean": sum(latencies) / len(latencies), "p99": latencies[int(len(latencies) * 0.99)]}
+
+
+# Run every lookup of the repositories over the sample and print the latencies
+def run_lookups(database: str, account_urns: List[str], label: str) -> None:
+
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    #
+    from models.account import Account
+    from models.balances import Balances
+    from models.transaction import Transaction
+    from repositories.transaction import AsyncTransactionRepository
+
+    engine = create_engine(f"sqlite:///{database}")
+    with Session(engine) as session:
+
+        # The statement query only needs a session object to be built, it is executed here on the sync session
+        statement_builder = AsyncTransactionRepository(session=session)
+
+        lookups = {
+            "account by urn": lambda urn: session.execute(select(Account).filter(Account.urn == urn)).scalars().first(),
+            "balances by account_urn": lambda urn: session.execute(select(Balances).filter(Balances.account_urn == urn)).scalars().first(),
+            "transactions by payee_account_urn": lambda urn: session.execute(select(Transaction).filter(Transaction.payee_account_urn == urn)).scalars().all(),
+            "statement page (100 rows)": lambda urn: session.execute(statement_builder.build_statement_query(account_urn=urn, limit=100)).mappings().all(),
+        }
+
+        print(f"\n{label}")
+        for name, lookup in lookups.items():
+            session.expunge_all()
+            result = measure(lookup=lookup, account_urns=account_urns)
+            print(f"  {name:<36} mean: {result['mean']:9.3f} ms | p99: {result['p99']:9.3f} ms")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="URN lookup latency with and without indexes")
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--samples", type=int, default=200)
+    arguments = parser.parse_args()
+
+    database = sqlite_app.prepare(work_dir=tempfile.mkdtemp(prefix="fintrack-benchmark-"))
+    sqlite_app.quiet_logs()
+
+    print(f"Seeding {arguments.accounts} accounts and {arguments.transactions} transactions")
+    account_urns = seed(database=database, account_count=arguments.accounts, transaction_count=arguments.transactions)
+    sample = random.Random(7).sample(account_urns, arguments.samples)
+
+    run_lookups(database=database, account_urns=sample, label="With URN indexes")
+
+    connection = sqlite3.connect(database)
+    for index_name in URN_INDEXES:
+        connection.execute(f"DROP INDEX {index_name}")
+    connection.commit()
+    connection.close()
+
+    run_lookups(database=database, account_urns=sample, label="Without URN indexes")
@@ -0,0 +1,116 @@
+# Build the daily rollups and balance checkpoints of every account from the existing transactions.
+# The rollups and checkpoints are deleted, then the transaction table is read in chunks of its id, account ids, amount and
+# creation time columns, in id order. The credits, debits and number of transactions of every account and day are totalled
+# per chunk, with the running balance of the account after its last transaction of the day as closing balance, and the
+# running balance is checkpointed after every BALANCE_CHECKPOINT_INTERVAL transactions of an account and day, as transfers do.
+# Each chunk is added to the tables and committed on its own, so the job never holds more than one chunk of the ledger.
+#
+# Run it once after migrations 0.0.8 and 0.0.9, before the release that maintains the rollups takes transfers: transfers
+# made while it runs would be counted twice. Running it again rebuilds both tables from scratch.
+#
+# Usage (from ledger_backend, with the configuration of the database to fill):
+#   python scripts/jobs/backfill_daily_rollups.py [--chunk-size 10000]
+import argparse
+import sys
+#
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Import the backend from its root, two levels above this folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from repositories.account_daily_rollup import AccountDailyRollupRepository
+from repositories.balance_checkpoint import BalanceCheckpointRepository
+from repositories.transaction import TransactionRepository
+#
+from start_utils import BALANCE_CHECKPOINT_INTERVAL, get_engine, get_session_factory, logger
+
+
+# Rebuild the rollups and checkpoints of all accounts and return the number of transactions they total
+def backfill(chunk_size: int) -> int:
+
+    with get_session_factory()() as session:
+
+        account_daily_rollup_repository = AccountDailyRollupRepository(urn="backfill_daily_rollups", session=session)
+        balance_checkpoint_repository = BalanceCheckpointRepository(urn="backfill_daily_rollups", session=session)
+        transaction_repository = TransactionRepository(urn="backfill_daily_rollups", session=session)
+
+        deleted = account_daily_rollup_repository.delete_records()
+        deleted_checkpoints = balance_checkpoint_repository.delete_records()
+        session.commit()
+        logger.info(f"Deleted {deleted} rollups and {deleted_checkpoints} checkpoints")
+
+        # Running balance of every account, and its day and number of transactions that day, over the transactions read so far
+        balances: Dict[int, int] = defaultdict(int)
+        day_counts: Dict[int, Tuple[date, int]] = {}
+        after_id = 0
+        transaction_count = 0
+        skipped_count = 0
+        while True:
+            rows = transaction_repository.retrieve_rollup_columns(after_id=after_id, limit=chunk_size)
+            if not rows:
+                break
+
+            # Total the chunk per account and day; transactions without a creation time have no day and are skipped
+            # The day is taken from the creation time as read back from the database, so it is the stored day of the transaction
+            rollups: Dict[Tuple[int, date], dict] = {}
+            checkpoints: List[dict] = []
+            for id, payer_account_id, payee_account_id, amount, created_on in rows:
+                if created_on is None:
+                    skipped_count += 1
+                    continue
+
+                for account_id, sign in ((payee_account_id, 1), (payer_account_id, -1)):
+                    if not account_id:
+                        continue
+
+                    balances[account_id] += sign * (amount or 0)
+                    rollup = rollups.setdefault((account_id, created_on.date()), {
+                        "account_id": account_id,
+                        "day": created_on.date(),
+                        "credit_amount": 0,
+                        "debit_amount": 0,
+                        "transaction_count": 0
+                    })
+                    rollup["credit_amount" if sign > 0 else "debit_amount"] += amount or 0
+                    rollup["transaction_count"] += 1
+                    rollup["closing_balance"] = balances[account_id]
+
+                    day, day_count = day_counts.get(account_id, (None, 0))
+                    day_count = day_count + 1 if day == created_on.date() else 1
+                    day_counts[account_id] = (created_on.date(), day_count)
+                    if day_count % BALANCE_CHECKPOINT_INTERVAL == 0:
+                        checkpoints.append({
+                            "account_id": account_id,
+                            "transaction_id": id,
+                            "transaction_on": created_on,
+                            "balance": balances[account_id]
+                        })
+
+            if rollups:
+                account_daily_rollup_repository.add_to_records(rollups=list(rollups.values()))
+            if checkpoints:
+                balance_checkpoint_repository.add_records(checkpoints=checkpoints)
+            session.commit()
+
+            after_id = rows[-1][0]
+            transaction_count += len(rows)
+            logger.info(f"Rolled up {transaction_count} transactions")
+
+    if skipped_count:
+        logger.warning(f"Skipped {skipped_count} transactions without a creation time")
+
+    logger.info(f"Rolled up {transaction_count} transactions")
+    return transaction_count
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Build the daily rollups and balance checkpoints of every account from its transactions")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    arguments = parser.parse_args()
+
+    backfill(chunk_size=arguments.chunk_size)
+    get_engine().dispose()
@@ -0,0 +1,88 @@
+# Reconcile the stored balances of every account with its transactions.
+# The transaction table is read in chunks of its id, account id and amount columns, and the credits and debits of every
+# account are totalled as exact NumPy int64 vector sums. An account is reported when its balances totals differ from
+# the totals of its transactions; the job exits with status 1 if any account was reported.
+#
+# Usage (from ledger_backend, with the configuration of the database to check):
+#   python scripts/jobs/reconcile_balances.py [--chunk-size 100000]
+import argparse
+import sys
+#
+from pathlib import Path
+
+# Import the backend from its root, two levels above this folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+#
+from repositories.account import AccountRepository
+from repositories.transaction import TransactionRepository
+#
+from start_utils import get_engine, get_session_factory, logger
+#
+from utilities.money import add_account_totals, to_minor_units_column
+
+
+# Reconcile all accounts and return the number of accounts whose stored balances do not match their transactions
+def reconcile(chunk_size: int) -> int:
+
+    with get_session_factory()() as session:
+
+        # Load the stored balances of every account as columns
+        account_rows = AccountRepository(urn="reconcile_balances", session=session).retrieve_balance_columns()
+        account_ids = to_minor_units_column((row[0] for row in account_rows), count=len(account_rows))
+        credits = np.zeros(len(account_rows), dtype=np.int64)
+        debits = np.zeros(len(account_rows), dtype=np.int64)
+        logger.info(f"Loaded {len(account_rows)} accounts")
+
+        # Total the transactions chunk by chunk
+        transaction_repository = TransactionRepository(urn="reconcile_balances", session=session)
+        after_id = 0
+        transaction_count = 0
+        while True:
+            rows = transaction_repository.retrieve_amount_columns(after_id=after_id, limit=chunk_size)
+            if not rows:
+                break
+
+            add_account_totals(
+                account_ids=account_ids,
+                credits=credits,
+                debits=debits,
+                payer_account_ids=to_minor_units_column((row[1] or 0 for row in rows), count=len(rows)),
+                payee_account_ids=to_minor_units_column((row[2] or 0 for row in rows), count=len(rows)),
+                amounts=to_minor_units_column((row[3] or 0 for row in rows), count=len(rows))
+            )
+            after_id = rows[-1][0]
+            transaction_count += len(rows)
+            logger.info(f"Totalled {transaction_count} transactions")
+
+    # Compare the stored balances with the totals, column by column; an account without a balances row is always reported
+    column = lambda position: to_minor_units_column((row[position] or 0 for row in account_rows), count=len(account_rows))
+    has_balances = np.fromiter((row[2] is not None for row in account_rows), dtype=bool, count=len(account_rows))
+    balances = credits - debits
+    mismatched = np.flatnonzero(
+        ~has_balances
+        | (column(2) != balances)
+        | (column(3) != credits)
+        | (column(4) != debits)
+    )
+
+    for index in mismatched:
+        logger.warning(
+            f"Account {account_rows[index][1]}: stored totals {list(account_rows[index][2:])}, "
+            f"expected balance {balances[index]}, credits {credits[index]} and debits {debits[index]}"
+        )
+
+    logger.info(f"Reconciled {len(account_rows)} accounts against {transaction_count} transactions, {len(mismatched)} mismatched")
+    return len(mismatched)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Reconcile stored account balances with their transactions")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    arguments = parser.parse_args()
+
+    mismatched = reconcile(chunk_size=arguments.chunk_size)
+    get_engine().dispose()
+    sys.exit(1 if mismatched else 0)
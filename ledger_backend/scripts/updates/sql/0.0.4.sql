@@ -0,0 +1,17 @@
+CREATE TABLE notification_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    urn VARCHAR(32) NOT NULL,
+    recipient_email VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_on DATETIME NOT NULL,
+    sent_on DATETIME,
+    claim_urn VARCHAR(64),
+    created_on DATETIME,
+    updated_on DATETIME,
+    INDEX idx_notification_outbox_status_next_attempt_on (status, next_attempt_on),
+    INDEX idx_notification_outbox_claim_urn (claim_urn)
+);
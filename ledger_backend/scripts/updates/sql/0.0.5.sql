@@ -0,0 +1,16 @@
+ALTER TABLE account
+    MODIFY urn VARCHAR(64) NOT NULL,
+    ADD UNIQUE INDEX uq_account_urn (urn);
+
+ALTER TABLE balances
+    MODIFY account_urn VARCHAR(64) NOT NULL,
+    ADD UNIQUE INDEX uq_balances_account_urn (account_urn),
+    ADD UNIQUE INDEX uq_balances_account_id (account_id);
+
+ALTER TABLE transaction
+    MODIFY urn VARCHAR(64),
+    MODIFY payer_account_urn VARCHAR(64),
+    MODIFY payee_account_urn VARCHAR(64),
+    ADD UNIQUE INDEX uq_transaction_urn (urn),
+    ADD INDEX idx_transaction_payee_account_urn_created_on (payee_account_urn, created_on),
+    ADD INDEX idx_transaction_payer_account_urn_created_on (payer_account_urn, created_on);
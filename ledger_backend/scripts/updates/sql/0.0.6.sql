@@ -0,0 +1,59 @@
+-- Store money as BIGINT minor units of the account's currency instead of FLOAT.
+-- The number of decimal places of each currency's minor unit is kept in currency_lk.exponent (ISO 4217).
+
+ALTER TABLE currency_lk
+    ADD COLUMN exponent INT NOT NULL DEFAULT 2;
+
+UPDATE currency_lk SET exponent = 0
+WHERE code IN ('BIF', 'CLP', 'DJF', 'GNF', 'ISK', 'JPY', 'KMF', 'KRW', 'PYG', 'RWF', 'UGX', 'VND', 'VUV', 'XAF', 'XOF', 'XPF');
+
+UPDATE currency_lk SET exponent = 3
+WHERE code IN ('BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND');
+
+-- Convert every amount into new columns, rounding to the nearest minor unit, then replace the FLOAT columns.
+-- A transaction uses the currency of its payer account, or of its payee account for deposits; both always share it.
+-- Accounts without a currency, and transactions without an account, are converted with the default exponent of 2,
+-- so no amount is left NULL.
+
+ALTER TABLE account
+    ADD COLUMN balance_minor BIGINT;
+
+UPDATE account
+LEFT JOIN currency_lk ON currency_lk.id = account.currency_id
+SET account.balance_minor = ROUND(account.balance * POW(10, COALESCE(currency_lk.exponent, 2)));
+
+ALTER TABLE account
+    DROP COLUMN balance,
+    CHANGE COLUMN balance_minor balance BIGINT NOT NULL;
+
+ALTER TABLE balances
+    ADD COLUMN total_balance_minor BIGINT,
+    ADD COLUMN total_credit_balance_minor BIGINT,
+    ADD COLUMN total_debit_balance_minor BIGINT;
+
+UPDATE balances
+LEFT JOIN account ON account.id = balances.account_id
+LEFT JOIN currency_lk ON currency_lk.id = account.currency_id
+SET balances.total_balance_minor = ROUND(balances.total_balance * POW(10, COALESCE(currency_lk.exponent, 2))),
+    balances.total_credit_balance_minor = ROUND(balances.total_credit_balance * POW(10, COALESCE(currency_lk.exponent, 2))),
+    balances.total_debit_balance_minor = ROUND(balances.total_debit_balance * POW(10, COALESCE(currency_lk.exponent, 2)));
+
+ALTER TABLE balances
+    DROP COLUMN total_balance,
+    DROP COLUMN total_credit_balance,
+    DROP COLUMN total_debit_balance,
+    CHANGE COLUMN total_balance_minor total_balance BIGINT,
+    CHANGE COLUMN total_credit_balance_minor total_credit_balance BIGINT,
+    CHANGE COLUMN total_debit_balance_minor total_debit_balance BIGINT;
+
+ALTER TABLE transaction
+    ADD COLUMN amount_minor BIGINT;
+
+UPDATE transaction
+LEFT JOIN account ON account.id = COALESCE(transaction.payer_account_id, transaction.payee_account_id)
+LEFT JOIN currency_lk ON currency_lk.id = account.currency_id
+SET transaction.amount_minor = ROUND(transaction.amount * POW(10, COALESCE(currency_lk.exponent, 2)));
+
+ALTER TABLE transaction
+    DROP COLUMN amount,
+    CHANGE COLUMN amount_minor amount BIGINT;
@@ -0,0 +1,39 @@
+-- Keep the balance of an account only in its balances row, so a transfer writes one row per side instead of two.
+-- Run scripts/jobs/reconcile_balances.py first: where account.balance and balances.total_balance disagree, the balances row is kept.
+
+-- Missing credit and debit totals are summed from the transaction table, where every transaction credits its payee account
+-- and debits its payer account.
+
+-- Give every account without a balances row one built from its balance and its transactions.
+INSERT INTO balances (account_id, account_urn, total_balance, total_credit_balance, total_debit_balance, created_on, created_by)
+SELECT account.id, account.urn, account.balance, COALESCE(credits.amount, 0), COALESCE(debits.amount, 0), NOW(), account.created_by
+FROM account
+LEFT JOIN balances ON balances.account_id = account.id
+LEFT JOIN (
+    SELECT payee_account_id AS account_id, SUM(amount) AS amount FROM transaction WHERE payee_account_id IS NOT NULL GROUP BY payee_account_id
+) credits ON credits.account_id = account.id
+LEFT JOIN (
+    SELECT payer_account_id AS account_id, SUM(amount) AS amount FROM transaction WHERE payer_account_id IS NOT NULL GROUP BY payer_account_id
+) debits ON debits.account_id = account.id
+WHERE balances.id IS NULL;
+
+-- Fill totals that were never set from the account balance and its transactions.
+UPDATE balances
+JOIN account ON account.id = balances.account_id
+LEFT JOIN (
+    SELECT payee_account_id AS account_id, SUM(amount) AS amount FROM transaction WHERE payee_account_id IS NOT NULL GROUP BY payee_account_id
+) credits ON credits.account_id = account.id
+LEFT JOIN (
+    SELECT payer_account_id AS account_id, SUM(amount) AS amount FROM transaction WHERE payer_account_id IS NOT NULL GROUP BY payer_account_id
+) debits ON debits.account_id = account.id
+SET balances.total_balance = COALESCE(balances.total_balance, account.balance),
+    balances.total_credit_balance = COALESCE(balances.total_credit_balance, credits.amount, 0),
+    balances.total_debit_balance = COALESCE(balances.total_debit_balance, debits.amount, 0);
+
+ALTER TABLE balances
+    MODIFY COLUMN total_balance BIGINT NOT NULL DEFAULT 0,
+    MODIFY COLUMN total_credit_balance BIGINT NOT NULL DEFAULT 0,
+    MODIFY COLUMN total_debit_balance BIGINT NOT NULL DEFAULT 0;
+
+ALTER TABLE account
+    DROP COLUMN balance;
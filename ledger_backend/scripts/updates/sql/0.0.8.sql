@@ -0,0 +1,16 @@
+-- Total the transactions of every account per day, so summaries over a date range read one row per day.
+-- The table is filled for existing transactions by scripts/jobs/backfill_daily_rollups.py and kept up to date by every transfer.
+
+CREATE TABLE account_daily_rollup (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    account_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    credit_amount BIGINT NOT NULL DEFAULT 0,
+    debit_amount BIGINT NOT NULL DEFAULT 0,
+    transaction_count BIGINT NOT NULL DEFAULT 0,
+    closing_balance BIGINT NOT NULL DEFAULT 0,
+    created_on DATETIME,
+    updated_on DATETIME,
+    UNIQUE INDEX uq_account_daily_rollup_account_id_day (account_id, day),
+    FOREIGN KEY (account_id) REFERENCES account(id)
+);
@@ -0,0 +1,15 @@
+-- Keep the balance of an account after every BALANCE_CHECKPOINT_INTERVAL transactions of a day, so the balance at a past
+-- instant replays only the transactions after the nearest checkpoint.
+-- Checkpoints of existing transactions are written by scripts/jobs/backfill_daily_rollups.py together with the daily rollups.
+
+CREATE TABLE balance_checkpoint (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    account_id BIGINT NOT NULL,
+    transaction_id BIGINT NOT NULL,
+    transaction_on DATETIME NOT NULL,
+    balance BIGINT NOT NULL,
+    created_on DATETIME,
+    INDEX idx_balance_checkpoint_account_id_transaction_on (account_id, transaction_on),
+    FOREIGN KEY (account_id) REFERENCES account(id),
+    FOREIGN KEY (transaction_id) REFERENCES transaction(id)
+);
@@ -0,0 +1,75 @@
+# Import Python libraries for parsing the command line and checking optional dependencies
+import argparse
+import importlib.util
+import uvicorn
+#
+from loguru import logger
+#
+from constants.server_mode import ServerMode
+#
+from start_utils import (
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    SERVER_HOST,
+    SERVER_KEEP_ALIVE_SECONDS,
+    SERVER_MODE,
+    SERVER_PORT,
+    SERVER_WORKERS
+)
+
+# Launch the ledger API with uvicorn
+# Development mode runs a single worker that reloads when the code changes.
+# Production mode runs several worker processes, each on uvloop and httptools, behind one listening socket.
+# Every worker imports the app on its own and builds its engines and connection pools in the app lifespan,
+# so no connection is shared between processes and each worker holds at most its own pool of connections.
+# On SIGINT or SIGTERM a worker stops accepting connections, waits up to the graceful shutdown timeout for
+# in-flight requests such as transfers to complete, and then runs the lifespan shutdown, disposing its pools.
+
+
+# Parse the command line, defaulting every option to its environment setting
+def parse_arguments() -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="Run the FinTrack ledger API.")
+    parser.add_argument("--mode", choices=sorted(ServerMode.ALL), default=SERVER_MODE, help="Launch mode of the server.")
+    parser.add_argument("--host", default=SERVER_HOST, help="Address the server listens on.")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port the server listens on.")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Worker processes in production mode.")
+    return parser.parse_args()
+
+
+# Return the event loop of the production workers, falling back to asyncio where uvloop is not available, e.g. on Windows
+def production_loop() -> str:
+
+    if importlib.util.find_spec("uvloop") is None:
+        logger.warning("uvloop is not installed, the workers run on the asyncio event loop")
+        return "asyncio"
+    return "uvloop"
+
+
+# Run the server in the given mode
+def run(mode: str = SERVER_MODE, host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS) -> None:
+
+    if mode not in ServerMode.ALL:
+        raise ValueError(f"Invalid server mode {mode}. Allowed values are {', '.join(sorted(ServerMode.ALL))}")
+
+    if mode == ServerMode.DEVELOPMENT:
+        logger.info(f"Starting the development server on {host}:{port}")
+        uvicorn.run("app:app", host=host, port=port, reload=True)
+        return
+
+    logger.info(f"Starting the production server on {host}:{port} with {workers} workers")
+    uvicorn.run(
+        "app:app",
+        host=host,
+        port=port,
+        workers=max(1, workers),
+        loop=production_loop(),
+        http="httptools",
+        timeout_keep_alive=SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_SHUTDOWN_SECONDS
+    )
+
+
+# Main entry point of the server, e.g. python server.py --mode production --workers 4
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    run(mode=arguments.mode, host=arguments.host, port=arguments.port, workers=arguments.workers)
@@ -1,15 +1,13 @@
 import ulid
 #
-import os
 from datetime import datetime
 from http import HTTPStatus
-import smtplib  # Added for sending emails
-from email.mime.multipart import MIMEMultipart  # Added for email format
-from email.mime.text import MIMEText  # Added for email body content
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
 from constants.api_status import APIStatus
+from constants.notification_status import NotificationStatus
 #
 from dtos.responses.base import BaseResponseDTO
 #
@@ -18,47 +16,68 @@ from errors.bad_input_error import BadInputError
 from models.currency_lk import CurrencyLK
 from models.account import Account
 from models.balances import Balances
+from models.notification_outbox import NotificationOutbox
 from models.user import User
 #
-from repositories.account import AccountRepository
-from repositories.balances import BalancesRepository
-from repositories.user import UserRepository
+from repositories.account import AsyncAccountRepository
+from repositories.balances import AsyncBalancesRepository
+from repositories.notification_outbox import AsyncNotificationOutboxRepository
+from repositories.user import AsyncUserRepository
 #
 from start_utils import (
-    db_session,
-    currency_lk_global_context_by_name
+    account_cache,
+    currency_registry
 )
+#
+from utilities.account_cache import AccountCacheUtility
+from utilities.money import Money
 
 
 class CreateAccountService(IService):
 
     # Constructor to initialize the CreateAccountService with necessary repositories and session
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
+
+        # Initialize the utility writing through to the shared account cache
+        self.account_cache_utility = AccountCacheUtility(
+            cache=account_cache,
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name
+        )
 
         # Initializing repositories for account, balances, and user
-        self.account_repository = AccountRepository(
+        self.account_repository = AsyncAccountRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.balances_repository = BalancesRepository(
+        self.balances_repository = AsyncBalancesRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.user_repository = UserRepository(
+        self.notification_outbox_repository = AsyncNotificationOutboxRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session     
+            session=self.db_session
+        )
+
+        self.user_repository = AsyncUserRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
         )
 
     # Main method to execute account creation logic
@@ -69,7 +88,7 @@ class CreateAccountService(IService):
 
         # Fetching the user based on user ID
         self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_id(
+        user: User = await self.user_repository.retrieve_record_by_id(
             id=user_id,
             is_deleted=False
         )
@@ -79,7 +98,7 @@ class CreateAccountService(IService):
 
         # Check if the ledger account already exists for the user
         self.logger.debug("Fetching ledger account")
-        ledger_account: Account = self.account_repository.retrieve_record_by_user_id_name(
+        ledger_account: Account = await self.account_repository.retrieve_record_by_user_id_name(
             user_id=user_id,
             name=account_name,
         )
@@ -91,18 +110,20 @@ class CreateAccountService(IService):
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
         
-        # Fetching currency from global context based on the currency code provided
+        # Fetching currency from the currency registry based on the currency code provided
+        # One snapshot is used for both the check and the lookup, so a refresh in between cannot make them disagree
         self.logger.debug("Fetching currency")
         currency_code: str = data.get("currency_code")
+        currencies_by_name = currency_registry.snapshot.by_name
 
-        if currency_code not in set(currency_lk_global_context_by_name.keys()):
+        if currency_code not in currencies_by_name:
             raise BadInputError(
-                response_message=f"Invalid currency code provided. Allowed values are {', '.join(list(currency_lk_global_context_by_name.keys()))}",
+                response_message=f"Invalid currency code provided. Allowed values are {', '.join(list(currencies_by_name.keys()))}",
                 response_key="error_invalid_currency_code",
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
-        
-        currency: CurrencyLK = currency_lk_global_context_by_name.get(currency_code)
+
+        currency: CurrencyLK = currencies_by_name.get(currency_code)
 
         if not currency:
             raise BadInputError(
@@ -118,13 +139,12 @@ class CreateAccountService(IService):
             user_id=user_id,
             name=account_name,
             currency_id=currency.id,
-            balance=0.0,
             is_deleted=False,
             created_on=datetime.now(),
             created_by=data.get("user_id")
         )
 
-        account: Account = self.account_repository.create_record(
+        account: Account = await self.account_repository.create_record(
             account=account
         )
         self.logger.debug("Created Account")
@@ -134,24 +154,36 @@ class CreateAccountService(IService):
         balances: Balances = Balances(
             account_id=account.id,
             account_urn=account.urn,
-            total_balance=0.0,
-            total_credit_balance=0.0,
-            total_debit_balance=0.0,
+            total_balance=0,
+            total_credit_balance=0,
+            total_debit_balance=0,
             created_on=datetime.now(),
             created_by=data.get("user_id")
         )
-        self.balances_repository.create_record(
+
+        # Queue email notification to the user about the new account creation, to be stored together with the balances
+        self.queue_account_creation_email(user, account, currency, balances)
+
+        await self.balances_repository.create_record(
             balances=balances
         )
         self.logger.debug("Created Account Balances")
 
         # Commit changes to the database
         self.logger.debug("Committing changes to the database")
-        db_session.commit()
+        await self.db_session.commit()
         self.logger.debug("Committed changes to the database")
 
-        # Send email notification to the user about the new account creation
-        self.send_account_creation_email(user, account, currency, balances)
+        # Write the new account through to the account cache together with the user's account listing, re-read after the commit
+        # so it includes the new account; a listing read by a concurrent request before the commit has fewer accounts and
+        # cannot replace it afterwards
+        self.logger.debug("Fetching accounts")
+        accounts = await self.account_repository.retrieve_records_with_balances_by_user_id(
+            user_id=user_id
+        )
+        self.logger.debug("Fetched accounts")
+
+        await self.account_cache_utility.set_accounts(accounts=accounts, user_id=user_id)
 
         # Prepare the response payload to return
         response_payload = {
@@ -160,9 +192,9 @@ class CreateAccountService(IService):
             "name": account.name,
             "currency": currency.name,
             "balances": {
-                "total_balance": balances.total_balance,
-                "total_credit_balance": balances.total_credit_balance,
-                "total_debit_balance": balances.total_debit_balance
+                "total_balance": float(Money(balances.total_balance, currency.exponent)),
+                "total_credit_balance": float(Money(balances.total_credit_balance, currency.exponent)),
+                "total_debit_balance": float(Money(balances.total_debit_balance, currency.exponent))
             }
         }
 
@@ -180,11 +212,9 @@ class CreateAccountService(IService):
 
         return response_dto
 
-    # Email sending logic 
-    def send_account_creation_email(self, user: User, account: Account, currency: CurrencyLK, balances: Balances):
-        # Fetching sender email and password from environment variables
-        sender_email: str = os.getenv("sender_email")
-        sender_password: str = os.getenv("sender_password")
+    # Email notification logic
+    # The email is written to the notification outbox and delivered later by the notification dispatcher
+    def queue_account_creation_email(self, user: User, account: Account, currency: CurrencyLK, balances: Balances):
 
         # Check if user email is available and prepare email content
         if user and user.email:
@@ -194,31 +224,22 @@ class CreateAccountService(IService):
                 f"Account Number: {account.urn}\n"
                 f"Account Name: {account.name}\n"
                 f"Currency: {currency.name}\n"
-                f"Total Balance: {balances.total_balance} {currency.name}\n"
-                f"Total Credit Balance: {balances.total_credit_balance} {currency.name}\n"
-                f"Total Debit Balance: {balances.total_debit_balance} {currency.name}\n\n"
+                f"Total Balance: {Money(balances.total_balance, currency.exponent)} {currency.name}\n"
+                f"Total Credit Balance: {Money(balances.total_credit_balance, currency.exponent)} {currency.name}\n"
+                f"Total Debit Balance: {Money(balances.total_debit_balance, currency.exponent)} {currency.name}\n\n"
                 "Thank you for using our services!\n"
             )
 
-            # Call the method to send the email
-            self.send_email(user.email, subject, message, sender_email, sender_password)
-
-    # Method to handle actual email sending using SMTP
-    def send_email(self, recipient_email, subject, body, sender_email, sender_password):
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        try:
-            # Setup SMTP server and send the email
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-            server.quit()
-            print(f"Email sent to {recipient_email}")
-        except Exception as e:
-            # Handle any errors during the email sending process
-            print(f"Failed to send email to {recipient_email}: {e}")
+            # Add the email to the notification outbox
+            self.notification_outbox_repository.add_record(
+                notification=NotificationOutbox(
+                    urn=ulid.ulid(),
+                    recipient_email=user.email,
+                    subject=subject,
+                    body=message,
+                    status=NotificationStatus.PENDING,
+                    attempts=0,
+                    next_attempt_on=datetime.now(),
+                    created_on=datetime.now()
+                )
+            )
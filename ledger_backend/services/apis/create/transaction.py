@@ -1,15 +1,13 @@
 import ulid
 #
-import os 
 from datetime import datetime
 from http import HTTPStatus
-import smtplib  # Added for sending emails
-from email.mime.multipart import MIMEMultipart  # Added for email format
-from email.mime.text import MIMEText  # Added for email body content
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
 from constants.api_status import APIStatus
+from constants.notification_status import NotificationStatus
 #
 from dtos.responses.base import BaseResponseDTO
 #
@@ -17,57 +15,94 @@ from errors.bad_input_error import BadInputError
 #
 from models.currency_lk import CurrencyLK
 from models.account import Account
-from models.balances import Balances
+from models.notification_outbox import NotificationOutbox
 from models.transaction import Transaction
 from models.user import User
 #
-from repositories.account import AccountRepository
-from repositories.balances import BalancesRepository
-from repositories.transaction import TransactionRepository
-from repositories.user import UserRepository
+from repositories.account import AsyncAccountRepository
+from repositories.account_daily_rollup import AsyncAccountDailyRollupRepository
+from repositories.balance_checkpoint import AsyncBalanceCheckpointRepository
+from repositories.balances import AsyncBalancesRepository
+from repositories.notification_outbox import AsyncNotificationOutboxRepository
+from repositories.transaction import AsyncTransactionRepository
+from repositories.user import AsyncUserRepository
 #
 from start_utils import (
-    db_session,
-    currency_lk_global_context_by_id
+    BALANCE_CHECKPOINT_INTERVAL,
+    account_cache,
+    currency_registry
 )
+#
+from utilities.account_cache import AccountCacheUtility
+from utilities.money import Money
 
 
 class CreateTransactionService(IService):
 
     # Constructor to initialize service and necessary repositories for transactions, accounts, balances, and users
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
+
+        # Initialize the utility writing through to the shared account cache
+        self.account_cache_utility = AccountCacheUtility(
+            cache=account_cache,
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name
+        )
 
         # Initialize repositories for accounts, balances, transactions, and users
-        self.account_repository = AccountRepository(
+        self.account_repository = AsyncAccountRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.balances_repository = AsyncBalancesRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.balances_repository = BalancesRepository(
+        self.account_daily_rollup_repository = AsyncAccountDailyRollupRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.transaction_repository = TransactionRepository(
+        self.balance_checkpoint_repository = AsyncBalanceCheckpointRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session         
+            session=self.db_session
         )
 
-        self.user_repository = UserRepository(
+        self.notification_outbox_repository = AsyncNotificationOutboxRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session     
+            session=self.db_session
+        )
+
+        self.transaction_repository = AsyncTransactionRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.user_repository = AsyncUserRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
         )
 
     # Main method for running transaction logic
@@ -78,7 +113,7 @@ class CreateTransactionService(IService):
 
         # Fetch the user by ID
         self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_id(
+        user: User = await self.user_repository.retrieve_record_by_id(
             id=user_id,
             is_deleted=False
         )
@@ -112,13 +147,12 @@ class CreateTransactionService(IService):
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
         
-        # Fetch payee account and its balances if it exists
+        # Fetch payee account if it exists
         payee_account = None
-        payee_account_balances = None
         if payee_account_urn:
 
             self.logger.debug("Fetching payee account")
-            payee_account: Account = self.account_repository.retrieve_record_by_urn(
+            payee_account: Account = await self.account_repository.retrieve_record_by_urn(
                 urn=payee_account_urn
             )
 
@@ -131,22 +165,12 @@ class CreateTransactionService(IService):
             
             # Assign currency_id from the payee account
             currency_id = payee_account.currency_id
-
-            # Fetch payee balances
-            self.logger.debug("Fetching payee account balances")
-            payee_account_balances: Balances = self.balances_repository.retrieve_record_by_account_urn(
-                account_urn=payee_account.urn
-            )
-
-            if not payee_account_balances:
-                raise RuntimeError("Payee Account Balances not found")
             
-        # Fetch payer account and its balances if it exists
+        # Fetch payer account if it exists
         payer_account = None
-        payer_account_balances = None
         if payer_account_urn:
 
-            payer_account: Account = self.account_repository.retrieve_record_by_urn(
+            payer_account: Account = await self.account_repository.retrieve_record_by_urn(
                 urn=payer_account_urn
             )
 
@@ -159,15 +183,6 @@ class CreateTransactionService(IService):
             
             # Assign currency_id from the payer account
             currency_id = payer_account.currency_id
-
-            # Fetch payer balances
-            self.logger.debug("Fetching payer account balances")
-            payer_account_balances: Balances = self.balances_repository.retrieve_record_by_account_urn(
-                account_urn=payer_account.urn
-            )
-
-            if not payer_account_balances:
-                raise RuntimeError("Payer Account Balances not found")
             
         # Check that one of the accounts belongs to the logged-in user
         payer_user_id = payer_account.user_id if payer_account else None
@@ -195,8 +210,12 @@ class CreateTransactionService(IService):
                     http_status_code=HTTPStatus.BAD_REQUEST
                 )
         
-        # Validate transaction amount
-        amount = data.get("amount")
+        # Validate transaction amount, converting it to minor units of the accounts' currency
+        currency: CurrencyLK = currency_registry.snapshot.by_id.get(currency_id)
+        try:
+            amount = Money.from_major_units(data.get("amount"), currency.exponent).minor_units
+        except ValueError:
+            amount = None
 
         if not amount or amount < 0:
             raise BadInputError(
@@ -205,8 +224,23 @@ class CreateTransactionService(IService):
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
         
+        # Lock the balances of both accounts for the rest of the transfer, in account id order so that concurrent transfers cannot deadlock
+        # The locked rows carry the current balances, so the balance check below cannot be overtaken by another transfer
+        self.logger.debug("Locking account balances")
+        locked_balances = await self.balances_repository.retrieve_records_by_account_ids_for_update(
+            account_ids=[account.id for account in (payer_account, payee_account) if account]
+        )
+        locked_balances_by_account_id = {balances.account_id: balances for balances in locked_balances}
+        payer_balances = locked_balances_by_account_id.get(payer_account.id) if payer_account else None
+        payee_balances = locked_balances_by_account_id.get(payee_account.id) if payee_account else None
+        if payer_account and not payer_balances:
+            raise RuntimeError("Payer Account Balances not found")
+        if payee_account and not payee_balances:
+            raise RuntimeError("Payee Account Balances not found")
+        self.logger.debug("Locked account balances")
+
         # Check for sufficient balance in payer account
-        if payer_account and amount > payer_account.balance:
+        if payer_account and amount > payer_balances.total_balance:
             raise BadInputError(
                     response_message="Insufficient balance in payer account.",
                     response_key="error_insufficient_balance",
@@ -225,41 +259,94 @@ class CreateTransactionService(IService):
             payee_account_urn=payee_account.urn if payee_account else None,
             amount=amount,
             purpose=purpose,
-            created_on=datetime.now(),
+            created_on=datetime.now().replace(microsecond=0),  # Whole seconds, as stored by DATETIME, so the rollup day below matches the stored day
             created_by=user.id
         )
 
-        transaction: Transaction = self.transaction_repository.create_record(
+        transaction: Transaction = await self.transaction_repository.add_record(
             transaction=transaction
         )
         self.logger.debug("Created transaction")
 
-        # Update balances for both payer and payee accounts
+        # Update the balances of both payer and payee accounts with one increment applied in SQL per side
+        # The payer debit is conditional on the balance covering it, which also guards databases without row locks
         self.logger.debug("Updating Payer Account Balances")
-        if payer_account_balances:
-            payer_account_balances.total_debit_balance += amount
-            payer_account_balances.total_balance -= amount
-
+        payer_balance = None
         if payer_account:
-            payer_account.balance -= amount
+            if not await self.balances_repository.increment_record_by_account_id(
+                account_id=payer_account.id,
+                total_balance=-amount,
+                total_debit_balance=amount,
+                minimum_balance=0
+            ):
+                raise BadInputError(
+                    response_message="Insufficient balance in payer account.",
+                    response_key="error_insufficient_balance",
+                    http_status_code=HTTPStatus.BAD_REQUEST
+                )
+
+            payer_balance = payer_balances.total_balance - amount
         self.logger.debug("Updated Payer Account Balances")
 
         self.logger.debug("Updating Payee Account Balances")
-        if payee_account_balances:
-            payee_account_balances.total_credit_balance += amount
-            payee_account_balances.total_balance += amount
-
+        payee_balance = None
         if payee_account:
-            payee_account.balance += amount
+            if not await self.balances_repository.increment_record_by_account_id(
+                account_id=payee_account.id,
+                total_balance=amount,
+                total_credit_balance=amount
+            ):
+                raise RuntimeError("Payee Account Balances not found")
+
+            payee_balance = payee_balances.total_balance + amount
         self.logger.debug("Updated Payee Account Balances")
 
-        # Commit changes to the database
+        # Add the transfer to the daily rollups of both accounts, to be stored by the same commit as the balances
+        self.logger.debug("Updating Account Daily Rollups")
+        day = transaction.created_on.date()
+        previous_counts = await self.account_daily_rollup_repository.add_to_records(rollups=[
+            {
+                "account_id": account.id,
+                "day": day,
+                "credit_amount": amount if account is payee_account else 0,
+                "debit_amount": amount if account is payer_account else 0,
+                "transaction_count": 1,
+                "closing_balance": balance
+            }
+            for account, balance in ((payer_account, payer_balance), (payee_account, payee_balance)) if account
+        ])
+        self.logger.debug("Updated Account Daily Rollups")
+
+        # Checkpoint the balance of every account whose transactions of the day reach a multiple of the checkpoint interval,
+        # so the balance at a past instant never replays more than an interval of transactions
+        checkpoints = [
+            {
+                "account_id": account.id,
+                "transaction_id": transaction.id,
+                "transaction_on": transaction.created_on,
+                "balance": balance
+            }
+            for account, balance in ((payer_account, payer_balance), (payee_account, payee_balance))
+            if account and (previous_counts[(account.id, day)] + 1) % BALANCE_CHECKPOINT_INTERVAL == 0
+        ]
+        if checkpoints:
+            await self.balance_checkpoint_repository.add_records(checkpoints=checkpoints)
+
+        # Queue email notifications for the transaction, to be stored by the same commit as the balances
+        await self.queue_transaction_emails(payer_account, payee_account, amount, currency, payer_balance, payee_balance)
+
+        # Read back both accounts with their updated balances while they are still locked
+        updated_accounts = await self.account_repository.retrieve_records_with_balances_by_ids(
+            ids=[account.id for account in (payer_account, payee_account) if account]
+        )
+
+        # Commit the transaction, balances and notifications to the database at once
         self.logger.debug("Committing changes to the database")
-        db_session.commit()
+        await self.db_session.commit()
         self.logger.debug("Committed changes to the database")
 
-        # Send email notifications for the transaction
-        self.send_transaction_emails(payer_account, payee_account, amount, currency_id)
+        # Write the committed balances through to the account cache
+        await self.account_cache_utility.set_accounts(accounts=updated_accounts)
 
         # Prepare response payload
         response_payload = {
@@ -267,8 +354,8 @@ class CreateTransactionService(IService):
             "user_urn": user.urn,
             "payee_account_urn": transaction.payee_account_urn,
             "payer_account_urn": transaction.payer_account_urn,
-            "currency": currency_lk_global_context_by_id.get(currency_id).name,
-            "amount": transaction.amount
+            "currency": currency.name,
+            "amount": float(Money(transaction.amount, currency.exponent))
         }
 
         # Return the response with success message
@@ -285,40 +372,37 @@ class CreateTransactionService(IService):
 
         return response_dto
 
-    # Email sending logic for payer and payee accounts
-    def send_transaction_emails(self, payer_account, payee_account, amount, currency_id):
-        currency_code = currency_lk_global_context_by_id.get(currency_id).name
-        sender_email: str = os.getenv("sender_email")
-        sender_password: str = os.getenv("sender_password")
+    # Email notification logic for payer and payee accounts
+    # The emails are written to the notification outbox and delivered later by the notification dispatcher
+    # Amounts and balances are in minor units, and are written in major units with all decimal places of the currency
+    async def queue_transaction_emails(self, payer_account, payee_account, amount, currency, payer_balance, payee_balance):
+        currency_code = currency.name
+        amount = Money(amount, currency.exponent)
 
         # Fetch associated users for both payer and payee accounts
-        payer_user = self.user_repository.retrieve_record_by_id(id=payer_account.user_id) if payer_account and payer_account.user_id else None
-        payee_user = self.user_repository.retrieve_record_by_id(id=payee_account.user_id) if payee_account and payee_account.user_id else None
+        payer_user = await self.user_repository.retrieve_record_by_id(id=payer_account.user_id) if payer_account and payer_account.user_id else None
+        payee_user = await self.user_repository.retrieve_record_by_id(id=payee_account.user_id) if payee_account and payee_account.user_id else None
 
-        # Send email notifications to both payer and payee if their emails exist
+        # Queue email notifications to both payer and payee if their emails exist
         if payer_user and payer_user.email:
-            payer_message = f"Your account {payer_account.urn} has been debited by {amount} {currency_code}. The amount was credited to account {payee_account.urn if payee_account else 'N/A'}. Remaining balance is {payer_account.balance} {currency_code}."
-            self.send_email(payer_user.email, "FinTrack Debit Transaction Alert", payer_message, sender_email, sender_password)
+            payer_message = f"Your account {payer_account.urn} has been debited by {amount} {currency_code}. The amount was credited to account {payee_account.urn if payee_account else 'N/A'}. Remaining balance is {Money(payer_balance, currency.exponent)} {currency_code}."
+            self.queue_email(payer_user.email, "FinTrack Debit Transaction Alert", payer_message)
         
         if payee_user and payee_user.email:
-            payee_message = f"Your account {payee_account.urn} has been credited with {amount} {currency_code} from account {payer_account.urn if payer_account else 'N/A'}. Remaining balance is {payee_account.balance} {currency_code}."
-            self.send_email(payee_user.email, "FinTrack Credit Transaction Alert", payee_message, sender_email, sender_password)
+            payee_message = f"Your account {payee_account.urn} has been credited with {amount} {currency_code} from account {payer_account.urn if payer_account else 'N/A'}. Remaining balance is {Money(payee_balance, currency.exponent)} {currency_code}."
+            self.queue_email(payee_user.email, "FinTrack Credit Transaction Alert", payee_message)
     
-    # Method to handle actual email sending
-    def send_email(self, recipient_email, subject, body, sender_email, sender_password):
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        try:
-            # Sending email using Gmail SMTP server
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-            server.quit()
-            print(f"Email sent to {recipient_email}")
-        except Exception as e:
-            print(f"Failed to send email to {recipient_email}: {e}")
+    # Method to add an email to the notification outbox
+    def queue_email(self, recipient_email, subject, body):
+        self.notification_outbox_repository.add_record(
+            notification=NotificationOutbox(
+                urn=ulid.ulid(),
+                recipient_email=recipient_email,
+                subject=subject,
+                body=body,
+                status=NotificationStatus.PENDING,
+                attempts=0,
+                next_attempt_on=datetime.now(),
+                created_on=datetime.now()
+            )
+        )
@@ -0,0 +1,476 @@
+import ulid
+#
+from collections import defaultdict
+from datetime import datetime
+from http import HTTPStatus
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Tuple
+#
+from abstractions.service import IService
+#
+from constants.api_status import APIStatus
+from constants.notification_status import NotificationStatus
+#
+from dtos.responses.base import BaseResponseDTO
+#
+from errors.bad_input_error import BadInputError
+#
+from models.currency_lk import CurrencyLK
+from models.user import User
+#
+from repositories.account import AsyncAccountRepository
+from repositories.account_daily_rollup import AsyncAccountDailyRollupRepository
+from repositories.balance_checkpoint import AsyncBalanceCheckpointRepository
+from repositories.balances import AsyncBalancesRepository
+from repositories.notification_outbox import AsyncNotificationOutboxRepository
+from repositories.transaction import AsyncTransactionRepository
+from repositories.user import AsyncUserRepository
+#
+from start_utils import (
+    BALANCE_CHECKPOINT_INTERVAL,
+    account_cache,
+    currency_registry,
+    TRANSACTION_BATCH_MAX_SIZE
+)
+#
+from utilities.account_cache import AccountCacheUtility
+from utilities.money import Money
+
+
+class CreateTransactionsService(IService):
+
+    # Constructor to initialize service and necessary repositories for transactions, accounts, balances, and users
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.db_session = db_session
+
+        # Initialize the utility writing through to the shared account cache
+        self.account_cache_utility = AccountCacheUtility(
+            cache=account_cache,
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name
+        )
+
+        # Initialize repositories for accounts, balances, transactions, and users
+        self.account_repository = AsyncAccountRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.balances_repository = AsyncBalancesRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.account_daily_rollup_repository = AsyncAccountDailyRollupRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.balance_checkpoint_repository = AsyncBalanceCheckpointRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.notification_outbox_repository = AsyncNotificationOutboxRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.transaction_repository = AsyncTransactionRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.user_repository = AsyncUserRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+    # Main method creating a batch of transactions
+    # Every transfer is validated on its own and reported in the results, so an invalid transfer does not reject the batch.
+    # The accounts of all transfers are locked and read with one query, the valid transfers are applied to running
+    # balances in request order, and their net effect is written with one executemany per table and a single commit.
+    async def run(self, data: dict) -> BaseResponseDTO:
+
+        user_id: str = data.get("user_id")
+        items: List[dict] = data.get("transactions") or []
+
+        # Validate the size of the batch
+        if not items:
+            raise BadInputError(
+                response_message="At least one transaction must be provided.",
+                response_key="error_empty_transactions",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        if len(items) > TRANSACTION_BATCH_MAX_SIZE:
+            raise BadInputError(
+                response_message=f"At most {TRANSACTION_BATCH_MAX_SIZE} transactions can be created at once.",
+                response_key="error_too_many_transactions",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Fetch the user by ID
+        self.logger.debug("Fetching user")
+        user: User = await self.user_repository.retrieve_record_by_id(
+            id=user_id,
+            is_deleted=False
+        )
+
+        if not user:
+            raise RuntimeError("User not found")
+
+        # Treat empty payer and payee URNs as not provided, as a single transaction does
+        for item in items:
+            for key in ("payer_account_urn", "payee_account_urn"):
+                if not item.get(key) or not str(item.get(key)).strip():
+                    item[key] = None
+
+        # Lock the balances of all accounts of the batch at once, in account id order so that concurrent transfers cannot deadlock
+        # The locked rows carry the current balances, so the balance checks below cannot be overtaken by another transfer
+        self.logger.debug("Locking accounts")
+        urns = {item.get(key) for item in items for key in ("payer_account_urn", "payee_account_urn") if item.get(key)}
+        accounts: List[RowMapping] = await self.account_repository.retrieve_records_with_balances_by_urns_for_update(
+            urns=list(urns)
+        )
+        accounts_by_urn: Dict[str, RowMapping] = {account["urn"]: account for account in accounts}
+        self.logger.debug("Locked accounts")
+
+        # Validate every transfer against the running balances, which include the transfers accepted before it
+        running_balances: Dict[int, int] = {account["id"]: account["balance"] for account in accounts}
+        credits: Dict[int, int] = defaultdict(int)
+        debits: Dict[int, int] = defaultdict(int)
+        created_on = datetime.now().replace(microsecond=0)  # Whole seconds, as stored by DATETIME, so the rollup day matches the stored day
+        results: List[dict] = []
+        transactions: List[dict] = []
+
+        for index, item in enumerate(items):
+
+            try:
+                payer_account, payee_account, amount = self.validate_transaction(item, accounts_by_urn, user_id)
+
+                # Check for sufficient balance in payer account
+                if payer_account and amount > running_balances[payer_account["id"]]:
+                    raise BadInputError(
+                        response_message="Insufficient balance in payer account.",
+                        response_key="error_insufficient_balance",
+                        http_status_code=HTTPStatus.BAD_REQUEST
+                    )
+
+            except BadInputError as err:
+                results.append({
+                    "index": index,
+                    "status": APIStatus.FAILED,
+                    "response_message": err.response_message,
+                    "response_key": err.response_key,
+                    "payee_account_urn": item.get("payee_account_urn"),
+                    "payer_account_urn": item.get("payer_account_urn"),
+                    "amount": item.get("amount")
+                })
+                continue
+
+            # Apply the transfer to the running balances and the totals of both accounts
+            if payer_account:
+                running_balances[payer_account["id"]] -= amount
+                debits[payer_account["id"]] += amount
+
+            if payee_account:
+                running_balances[payee_account["id"]] += amount
+                credits[payee_account["id"]] += amount
+
+            transaction_urn = ulid.ulid()
+            transactions.append({
+                "urn": transaction_urn,
+                "payer_account_id": payer_account["id"] if payer_account else None,
+                "payer_account_urn": payer_account["urn"] if payer_account else None,
+                "payee_account_id": payee_account["id"] if payee_account else None,
+                "payee_account_urn": payee_account["urn"] if payee_account else None,
+                "amount": amount,
+                "purpose": item.get("purpose") or data.get("purpose", ""),
+                "created_on": created_on,
+                "created_by": user.id
+            })
+
+            currency = currency_registry.snapshot.by_id.get((payer_account or payee_account)["currency_id"])
+            results.append({
+                "index": index,
+                "status": APIStatus.SUCCESS,
+                "transaction_urn": transaction_urn,
+                "payee_account_urn": item.get("payee_account_urn"),
+                "payer_account_urn": item.get("payer_account_urn"),
+                "currency": currency.name,
+                "amount": float(Money(amount, currency.exponent))
+            })
+
+        if transactions:
+            await self.apply_transactions(transactions, accounts_by_urn, credits, debits, running_balances)
+
+        # Prepare response payload
+        created_count = len(transactions)
+        response_payload = {
+            "user_urn": user.urn,
+            "created_count": created_count,
+            "failed_count": len(items) - created_count,
+            "transactions": results
+        }
+
+        # Return the response, failed only when no transaction could be created
+        self.logger.debug("Preparing response metadata")
+        if created_count:
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.SUCCESS,
+                response_message=f"Successfully created {created_count} of {len(items)} ledger transactions.",
+                response_key="success_ledger_transactions_creation",
+                data=response_payload
+            )
+        else:
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.FAILED,
+                response_message="None of the ledger transactions could be created.",
+                response_key="error_ledger_transactions_creation",
+                data=response_payload
+            )
+        self.logger.debug("Prepared response metadata")
+
+        return response_dto
+
+    # Validate a single transfer of the batch with the rules of a single transaction, except for the balance check
+    # Returns the payer and payee accounts, either of which may be None, and the amount in minor units, or raises BadInputError
+    def validate_transaction(self, item: dict, accounts_by_urn: Dict[str, RowMapping], user_id: str) -> Tuple[RowMapping, RowMapping, int]:
+
+        payer_account_urn = item.get("payer_account_urn")
+        payee_account_urn = item.get("payee_account_urn")
+
+        if not payer_account_urn and not payee_account_urn:
+            raise BadInputError(
+                response_message="Payee and Payer Account URN both cannot be empty or none.",
+                response_key="error_invalid_account_urn",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Check if payer and payee accounts are the same
+        if payer_account_urn == payee_account_urn:
+            raise BadInputError(
+                response_message="Payer and Payee account URNs cannot be the same.",
+                response_key="error_same_account_urn",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        payee_account = accounts_by_urn.get(payee_account_urn) if payee_account_urn else None
+        if payee_account_urn and not payee_account:
+            raise BadInputError(
+                response_message="Payee Account does not exist for the given urn.",
+                response_key="error_account_not_found",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        payer_account = accounts_by_urn.get(payer_account_urn) if payer_account_urn else None
+        if payer_account_urn and not payer_account:
+            raise BadInputError(
+                response_message="Payer Account does not exist for the given urn.",
+                response_key="error_account_not_found",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Ensure the logged-in user owns one of the accounts
+        payer_user_id = payer_account["user_id"] if payer_account else None
+        payee_user_id = payee_account["user_id"] if payee_account else None
+
+        if payer_user_id != user_id and payee_user_id != user_id:
+            raise BadInputError(
+                response_message="At least one of the Payer or Payee accounts must belong to the logged-in user.",
+                response_key="error_no_user_association",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Ensure payer and payee accounts have the same currency
+        if payer_account and payee_account and payer_account["currency_id"] != payee_account["currency_id"]:
+            raise BadInputError(
+                response_message="Payee and Payer account currencies do not match.",
+                response_key="error_invalid_currency",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Validate transaction amount, converting it to minor units of the accounts' currency
+        currency: CurrencyLK = currency_registry.snapshot.by_id.get((payer_account or payee_account)["currency_id"])
+        try:
+            amount = Money.from_major_units(item.get("amount"), currency.exponent).minor_units
+        except ValueError:
+            amount = None
+
+        if not amount or amount < 0:
+            raise BadInputError(
+                response_message="Invalid amount.",
+                response_key="error_invalid_amount",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        return payer_account, payee_account, amount
+
+    # Write the accepted transfers, the net balance change of every account and the notifications, and commit them at once
+    async def apply_transactions(
+        self,
+        transactions: List[dict],
+        accounts_by_urn: Dict[str, RowMapping],
+        credits: Dict[int, int],
+        debits: Dict[int, int],
+        running_balances: Dict[int, int]
+    ) -> None:
+
+        # Insert all transactions with one executemany
+        self.logger.debug("Creating transactions")
+        await self.transaction_repository.add_records(transactions=transactions)
+        self.logger.debug("Created transactions")
+
+        # Apply the net change of every account with one executemany, in id order like the locks
+        # The debits are conditional on the balance covering them, which also guards databases without row locks
+        self.logger.debug("Updating Account Balances")
+        account_ids = sorted(set(credits) | set(debits))
+        if not await self.balances_repository.increment_records_by_account_ids(increments=[
+            {
+                "account_id": account_id,
+                "total_balance": credits.get(account_id, 0) - debits.get(account_id, 0),
+                "total_credit_balance": credits.get(account_id, 0),
+                "total_debit_balance": debits.get(account_id, 0)
+            }
+            for account_id in account_ids
+        ]):
+            raise BadInputError(
+                response_message="Insufficient balance in payer account.",
+                response_key="error_insufficient_balance",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+        self.logger.debug("Updated Account Balances")
+
+        # Add the transfers to the daily rollups of their accounts with their closing balances, to be stored by the same commit
+        # The transfers of a batch share one creation time, so every account has a single rollup for the day of the batch
+        self.logger.debug("Updating Account Daily Rollups")
+        day = transactions[0]["created_on"].date()
+        transaction_counts: Dict[int, int] = defaultdict(int)
+        last_transaction_urns: Dict[int, str] = {}
+        for transaction in transactions:
+            for key in ("payer_account_id", "payee_account_id"):
+                if transaction[key]:
+                    transaction_counts[transaction[key]] += 1
+                    last_transaction_urns[transaction[key]] = transaction["urn"]
+
+        previous_counts = await self.account_daily_rollup_repository.add_to_records(rollups=[
+            {
+                "account_id": account_id,
+                "day": day,
+                "credit_amount": credits.get(account_id, 0),
+                "debit_amount": debits.get(account_id, 0),
+                "transaction_count": transaction_counts[account_id],
+                "closing_balance": running_balances[account_id]
+            }
+            for account_id in account_ids
+        ])
+        self.logger.debug("Updated Account Daily Rollups")
+
+        # Checkpoint the balance of every account whose transactions of the day pass a multiple of the checkpoint interval,
+        # as of its last transaction of the batch, so the balance at a past instant never replays much more than an interval
+        checkpoint_account_ids = [
+            account_id for account_id in account_ids
+            if previous_counts[(account_id, day)] // BALANCE_CHECKPOINT_INTERVAL
+            != (previous_counts[(account_id, day)] + transaction_counts[account_id]) // BALANCE_CHECKPOINT_INTERVAL
+        ]
+        if checkpoint_account_ids:
+            transaction_ids = await self.transaction_repository.retrieve_ids_by_urns(
+                urns=[last_transaction_urns[account_id] for account_id in checkpoint_account_ids]
+            )
+            await self.balance_checkpoint_repository.add_records(checkpoints=[
+                {
+                    "account_id": account_id,
+                    "transaction_id": transaction_ids[last_transaction_urns[account_id]],
+                    "transaction_on": transactions[0]["created_on"],
+                    "balance": running_balances[account_id]
+                }
+                for account_id in checkpoint_account_ids
+            ])
+
+        # Queue email notifications for the transactions, to be stored by the same commit as the balances
+        await self.queue_transaction_emails(transactions, accounts_by_urn, debits, running_balances)
+
+        # Read back the accounts with their updated balances while they are still locked
+        updated_accounts = await self.account_repository.retrieve_records_with_balances_by_ids(ids=account_ids)
+
+        # Commit the transactions, balances and notifications to the database at once
+        self.logger.debug("Committing changes to the database")
+        await self.db_session.commit()
+        self.logger.debug("Committed changes to the database")
+
+        # Write the committed balances through to the account cache
+        await self.account_cache_utility.set_accounts(accounts=updated_accounts)
+
+    # Email notification logic for the batch
+    # Every payee is notified of its credit, while every payer account receives a single summary of its debits,
+    # so that a payout of thousands of transfers does not send thousands of emails to the funding account.
+    # The emails are written to the notification outbox with one executemany and delivered later by the notification dispatcher
+    async def queue_transaction_emails(
+        self,
+        transactions: List[dict],
+        accounts_by_urn: Dict[str, RowMapping],
+        debits: Dict[int, int],
+        running_balances: Dict[int, int]
+    ) -> None:
+
+        # Fetch the users of all accounts of the batch with one query
+        user_ids = {account["user_id"] for account in accounts_by_urn.values() if account["user_id"]}
+        users = await self.user_repository.retrieve_records_by_ids(ids=list(user_ids)) if user_ids else []
+        emails_by_user_id = {user.id: user.email for user in users if user.email}
+        accounts_by_id = {account["id"]: account for account in accounts_by_urn.values()}
+
+        notifications: List[dict] = []
+        transaction_counts: Dict[int, int] = defaultdict(int)
+        for transaction in transactions:
+            transaction_counts[transaction["payer_account_id"]] += 1
+            payee_account = accounts_by_id.get(transaction["payee_account_id"])
+            if payee_account and emails_by_user_id.get(payee_account["user_id"]):
+                currency: CurrencyLK = currency_registry.snapshot.by_id.get(payee_account["currency_id"])
+                payee_message = f"Your account {payee_account['urn']} has been credited with {Money(transaction['amount'], currency.exponent)} {currency.name} from account {transaction['payer_account_urn'] or 'N/A'}."
+                notifications.append(self.build_email(emails_by_user_id[payee_account["user_id"]], "FinTrack Credit Transaction Alert", payee_message))
+
+        for account_id, amount in debits.items():
+            payer_account = accounts_by_id[account_id]
+            if emails_by_user_id.get(payer_account["user_id"]):
+                currency: CurrencyLK = currency_registry.snapshot.by_id.get(payer_account["currency_id"])
+                payer_message = f"Your account {payer_account['urn']} has been debited by {Money(amount, currency.exponent)} {currency.name} in {transaction_counts[account_id]} transactions. Remaining balance is {Money(running_balances[account_id], currency.exponent)} {currency.name}."
+                notifications.append(self.build_email(emails_by_user_id[payer_account["user_id"]], "FinTrack Debit Transaction Alert", payer_message))
+
+        if notifications:
+            await self.notification_outbox_repository.add_records(notifications=notifications)
+
+    # Method to build the column values of an email in the notification outbox
+    def build_email(self, recipient_email, subject, body) -> dict:
+        return {
+            "urn": ulid.ulid(),
+            "recipient_email": recipient_email,
+            "subject": subject,
+            "body": body,
+            "status": NotificationStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_on": datetime.now(),
+            "created_on": datetime.now()
+        }
@@ -1,9 +1,9 @@
 import ulid
-import pandas as pd
 #
 from datetime import datetime
 from http import HTTPStatus
 from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
@@ -15,69 +15,53 @@ from errors.bad_input_error import BadInputError
 #
 from models.currency_lk import CurrencyLK
 from models.account import Account
-from models.balances import Balances
 from models.transaction import Transaction
 from models.user import User
 #
-from repositories.account import AccountRepository
-from repositories.balances import BalancesRepository
-from repositories.transaction import TransactionRepository
-from repositories.user import UserRepository
+from repositories.account import AsyncAccountRepository
+from repositories.transaction import AsyncTransactionRepository
 #
 from start_utils import (
-    db_session,
-    currency_lk_global_context_by_id
+    account_cache,
+    currency_registry
 )
+#
+from utilities.account_cache import AccountCacheUtility
+from utilities.money import Money
 
 # Service class responsible for fetching account details
 class FetchAccountService(IService):
 
     # Constructor to initialize the necessary repositories and context
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
 
-        # Initialize the repositories for account, balances, and user data
-        self.account_repository = AccountRepository(
+        # Initialize the repository for account data
+        self.account_repository = AsyncAccountRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.balances_repository = BalancesRepository(
+        # Initialize the utility reading and writing the shared account cache
+        self.account_cache_utility = AccountCacheUtility(
+            cache=account_cache,
             urn=self.urn,
             user_urn=self.user_urn,
-            api_name=self.api_name,
-            session=db_session
-        )
-
-        self.user_repository = UserRepository(
-            urn=self.urn,
-            user_urn=self.user_urn,
-            api_name=self.api_name,
-            session=db_session     
+            api_name=self.api_name
         )
 
     # Method to handle the core logic of fetching account details
     async def run(self, data: dict) -> dict:
 
-        # Fetching account name and user ID from the request data
-        account_name: str = data.get("account_name")
-        user_id: str = data.get("user_id")
-
-        # Fetch the user details based on the user ID
-        self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_id(
-            id=user_id,
-            is_deleted=False
-        )
-
-        # Raise an error if the user is not found
-        if not user:
-            raise RuntimeError("User not found")
+        # Fetching the user URN from the request data
+        # It comes from the token, whose login session was confirmed by the authentication middleware
+        user_urn: str = data.get("user_urn")
         
         # Get the account URN from the request data
         account_urn = data.get("account_urn", "")
@@ -90,10 +74,18 @@ class FetchAccountService(IService):
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
         
-        # Fetch the account details using the account URN
-        account: Account = self.account_repository.retrieve_record_by_urn(
-            urn=account_urn
-        )
+        # Serve the account and its balances from the account cache, loading them from the database on a cache miss
+        account = await self.account_cache_utility.get_account(account_urn=account_urn)
+        if not account:
+
+            # Fetch the account details joined with its balances using the account URN
+            account = await self.account_repository.retrieve_record_with_balances_by_urn(
+                urn=account_urn
+            )
+
+            # Keep the account in the cache for the next requests
+            if account:
+                await self.account_cache_utility.set_accounts(accounts=[account])
 
         # Raise an error if the account is not found
         if not account:
@@ -104,31 +96,22 @@ class FetchAccountService(IService):
             )
         
         # Fetch the currency details for the account
-        currency: CurrencyLK = currency_lk_global_context_by_id.get(account.currency_id)
+        currency: CurrencyLK = currency_registry.snapshot.by_id.get(account["currency_id"])
 
         # Raise an error if the currency is not found
         if not currency:
             raise RuntimeError("Currency not found")
         
-        # Fetch the account balances for the account URN
-        account_balances: Balances = self.balances_repository.retrieve_record_by_account_urn(
-            account_urn=account.urn
-        )
-
-        # Raise an error if the account balances are not found
-        if not account_balances:
-            raise RuntimeError("Account balances not found")
-        
         # Prepare the response payload containing account details and balances
         response_payload = {
-            "account_urn": account.urn,
-            "user_urn": user.urn,
-            "name": account.name,
+            "account_urn": account["account_urn"],
+            "user_urn": user_urn,
+            "name": account["name"],
             "currency": currency.name,
             "balances": {
-                "total_balance": account_balances.total_balance,
-                "total_credit_balance": account_balances.total_credit_balance,
-                "total_debit_balance": account_balances.total_debit_balance
+                "total_balance": float(Money(account["total_balance"], currency.exponent)),
+                "total_credit_balance": float(Money(account["total_credit_balance"], currency.exponent)),
+                "total_debit_balance": float(Money(account["total_debit_balance"], currency.exponent))
             }
         }
 
@@ -1,9 +1,9 @@
 import ulid
-import pandas as pd
 #
 from datetime import datetime
 from http import HTTPStatus
 from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
@@ -15,72 +15,66 @@ from errors.bad_input_error import BadInputError
 #
 from models.currency_lk import CurrencyLK
 from models.account import Account
-from models.balances import Balances
 from models.transaction import Transaction
 from models.user import User
 #
-from repositories.account import AccountRepository
-from repositories.balances import BalancesRepository
-from repositories.transaction import TransactionRepository
-from repositories.user import UserRepository
+from repositories.account import AsyncAccountRepository
+from repositories.transaction import AsyncTransactionRepository
 #
 from start_utils import (
-    db_session,
-    currency_lk_global_context_by_id
+    account_cache,
+    currency_registry
 )
+#
+from utilities.account_cache import AccountCacheUtility
+from utilities.money import Money
 
 class FetchUsrAccountService(IService):
 
     # Constructor to initialize the service and necessary repositories for fetching user accounts
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
 
-        # Initialize repositories for accounts, balances, and users
-        self.account_repository = AccountRepository(
+        # Initialize the repository for accounts
+        self.account_repository = AsyncAccountRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.balances_repository = BalancesRepository(
+        # Initialize the utility reading and writing the shared account cache
+        self.account_cache_utility = AccountCacheUtility(
+            cache=account_cache,
             urn=self.urn,
             user_urn=self.user_urn,
-            api_name=self.api_name,
-            session=db_session
-        )
-
-        self.user_repository = UserRepository(
-            urn=self.urn,
-            user_urn=self.user_urn,
-            api_name=self.api_name,
-            session=db_session     
+            api_name=self.api_name
         )
 
     # Main method for executing the service logic
     async def run(self, data: dict) -> dict:
 
-        # Fetch the user ID from the request data
+        # Fetch the user ID and URN from the request data
+        # Both come from the token, whose login session was confirmed by the authentication middleware
         user_id: str = data.get("user_id")
+        user_urn: str = data.get("user_urn")
 
-        # Retrieve user details from the database based on the user ID
-        self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_id(
-            id=user_id,
-            is_deleted=False
-        )
+        # Serve the accounts from the account cache, loading them from the database on a cache miss
+        accounts = await self.account_cache_utility.get_user_accounts(user_id=user_id)
+        if accounts is None:
 
-        # If the user does not exist, raise an error
-        if not user:
-            raise RuntimeError("User not found")
+            # Fetch all accounts associated with the user ID, joined with their balances in one query
+            self.logger.debug("Fetching accounts")
+            accounts = await self.account_repository.retrieve_records_with_balances_by_user_id(
+                user_id=user_id
+            )
 
-        # Fetch all accounts associated with the user ID
-        accounts: List[Account] = self.account_repository.retrieve_records_by_user_id(
-            user_id=user_id
-        )
+            # Keep the accounts in the cache for the next requests
+            await self.account_cache_utility.set_accounts(accounts=accounts, user_id=user_id)
 
         # If no accounts are found for the user, raise an error
         if not accounts:
@@ -89,39 +83,30 @@ class FetchUsrAccountService(IService):
         # Prepare a list to store account details
         account_details = []
 
-        # Loop through all accounts and fetch balances for each account
+        # Loop through all accounts and resolve the currency of each account
         for account in accounts:
             # Fetch the currency details for the account using currency ID
-            currency: CurrencyLK = currency_lk_global_context_by_id.get(account.currency_id)
+            currency: CurrencyLK = currency_registry.snapshot.by_id.get(account["currency_id"])
 
             # If the currency is not found, raise an error
             if not currency:
                 raise RuntimeError("Currency not found")
 
-            # Fetch account balances for the account URN
-            account_balances: Balances = self.balances_repository.retrieve_record_by_account_urn(
-                account_urn=account.urn
-            )
-
-            # If account balances are not found, raise an error
-            if not account_balances:
-                raise RuntimeError("Account balances not found")
-
             # Append the account details including balances to the account_details list
             account_details.append({
-                "account_urn": account.urn,
-                "name": account.name,
+                "account_urn": account["account_urn"],
+                "name": account["name"],
                 "currency": currency.name,
                 "balances": {
-                    "total_balance": account_balances.total_balance,
-                    "total_credit_balance": account_balances.total_credit_balance,
-                    "total_debit_balance": account_balances.total_debit_balance
+                    "total_balance": float(Money(account["total_balance"], currency.exponent)),
+                    "total_credit_balance": float(Money(account["total_credit_balance"], currency.exponent)),
+                    "total_debit_balance": float(Money(account["total_debit_balance"], currency.exponent))
                 }
             })
 
         # Prepare the response payload with the user's accounts
         response_payload = {
-            "user_urn": user.urn,
+            "user_urn": user_urn,
             "accounts": account_details  # Return all account details
         }
 
@@ -0,0 +1,181 @@
+from datetime import datetime, time, timedelta
+from http import HTTPStatus
+from sqlalchemy.ext.asyncio import AsyncSession
+#
+from abstractions.service import IService
+#
+from constants.api_status import APIStatus
+#
+from dtos.responses.base import BaseResponseDTO
+#
+from errors.bad_input_error import BadInputError
+#
+from models.account import Account
+from models.account_daily_rollup import AccountDailyRollup
+from models.balance_checkpoint import BalanceCheckpoint
+from models.currency_lk import CurrencyLK
+#
+from repositories.account import AsyncAccountRepository
+from repositories.account_daily_rollup import AsyncAccountDailyRollupRepository
+from repositories.balance_checkpoint import AsyncBalanceCheckpointRepository
+from repositories.transaction import AsyncTransactionRepository
+#
+from start_utils import (
+    currency_registry
+)
+#
+from utilities.money import Money
+
+
+# Service class responsible for computing the balance of an account at a past instant
+# The balance starts from the nearest earlier known balance, which is either a balance checkpoint or the closing balance of
+# the last earlier day with transactions, and only the transactions after it are replayed, so the cost is bounded by the
+# checkpoint spacing rather than by the age of the account
+class FetchBalanceAtService(IService):
+
+    # Constructor to initialize repositories and necessary context
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.db_session = db_session
+
+        # Initializing repositories to interact with database tables
+        self.account_repository = AsyncAccountRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.account_daily_rollup_repository = AsyncAccountDailyRollupRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.balance_checkpoint_repository = AsyncBalanceCheckpointRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.transaction_repository = AsyncTransactionRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+    # Main logic to fetch the balance of the account at the requested instant
+    async def run(self, data: dict) -> dict:
+
+        # Fetch account URN from the request data
+        account_urn = data.get("account_urn", "")
+
+        # Check if account URN is provided; raise an error if missing
+        if not account_urn:
+            raise BadInputError(
+                response_message="Account URN cannot be empty or none.",
+                response_key="error_invalid_account_urn",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Fetch the instant from the request data; raise an error if missing
+        timestamp: datetime = data.get("timestamp")
+
+        if not timestamp:
+            raise BadInputError(
+                response_message="Timestamp cannot be empty or none.",
+                response_key="error_invalid_timestamp",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Transactions are timestamped in the server's local time, so a timestamp with a time zone is converted to it
+        if timestamp.tzinfo:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+
+        # Fetch the account by its URN
+        self.logger.debug("Fetching account")
+        account: Account = await self.account_repository.retrieve_record_by_urn(
+            urn=account_urn
+        )
+
+        # Raise an error if the account is not found or belongs to another user, without telling the two apart
+        if not account or account.user_id != data.get("user_id"):
+            raise BadInputError(
+                response_message="Ledger account not found for the given urn",
+                response_key="error_account_not_found",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        currency: CurrencyLK = currency_registry.snapshot.by_id.get(account.currency_id)
+
+        # Fetch the latest checkpoint at or before the instant, and the last day with transactions before the day of the instant
+        self.logger.debug("Fetching balance checkpoints")
+        checkpoint: BalanceCheckpoint = await self.balance_checkpoint_repository.retrieve_last_record_by_account_id(
+            account_id=account.id,
+            timestamp=timestamp
+        )
+        rollup: AccountDailyRollup = await self.account_daily_rollup_repository.retrieve_last_record_before_day(
+            account_id=account.id,
+            day=timestamp.date()
+        )
+        rollup_end = datetime.combine(rollup.day + timedelta(days=1), time.min) if rollup else None
+        self.logger.debug("Fetched balance checkpoints")
+
+        # Replay the transactions after the later of the two: a checkpoint includes every transaction up to its transaction id,
+        # a daily rollup every transaction created before the end of its day
+        self.logger.debug("Replaying transactions")
+        if checkpoint and (not rollup or checkpoint.transaction_on >= rollup_end):
+            opening_balance = checkpoint.balance
+            checkpoint_on = checkpoint.transaction_on
+            credit_amount, credit_count, debit_amount, debit_count = await self.transaction_repository.retrieve_totals_by_account_urn(
+                account_urn=account.urn,
+                to_timestamp=timestamp,
+                after_id=checkpoint.transaction_id
+            )
+
+        elif rollup:
+            opening_balance = rollup.closing_balance
+            checkpoint_on = rollup_end
+            credit_amount, credit_count, debit_amount, debit_count = await self.transaction_repository.retrieve_totals_by_account_urn(
+                account_urn=account.urn,
+                to_timestamp=timestamp,
+                from_timestamp=rollup_end
+            )
+
+        else:
+            opening_balance = 0
+            checkpoint_on = None
+            credit_amount, credit_count, debit_amount, debit_count = await self.transaction_repository.retrieve_totals_by_account_urn(
+                account_urn=account.urn,
+                to_timestamp=timestamp
+            )
+        self.logger.debug("Replayed transactions")
+
+        balance = opening_balance + credit_amount - debit_amount
+
+        # Prepare the response DTO, with the balance in major units of the account's currency
+        self.logger.debug("Preparing response metadata")
+        response_dto: BaseResponseDTO = BaseResponseDTO(
+            transaction_urn=self.urn,
+            status=APIStatus.SUCCESS,
+            response_message="Successfully fetched account balance.",
+            response_key="success_account_balance_at",
+            data={
+                "account_urn": account.urn,
+                "currency": currency.name,
+                "timestamp": timestamp,
+                "balance": float(Money(balance, currency.exponent)),
+                "checkpoint_on": checkpoint_on,
+                "replayed_transaction_count": credit_count + debit_count
+            }
+        )
+        self.logger.debug("Prepared response metadata")
+
+        # Return the response DTO
+        return response_dto
@@ -1,13 +1,16 @@
+import numpy as np
 import ulid
-import pandas as pd
 #
 from datetime import datetime
 from http import HTTPStatus
 from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
 from constants.api_status import APIStatus
+from constants.pagination import Pagination
+from constants.transaction_type import TransactionType
 #
 from dtos.responses.base import BaseResponseDTO
 #
@@ -19,49 +22,55 @@ from models.balances import Balances
 from models.transaction import Transaction
 from models.user import User
 #
-from repositories.account import AccountRepository
-from repositories.balances import BalancesRepository
-from repositories.transaction import TransactionRepository
-from repositories.user import UserRepository
+from repositories.account import AsyncAccountRepository
+from repositories.balances import AsyncBalancesRepository
+from repositories.transaction import AsyncTransactionRepository
+from repositories.user import AsyncUserRepository
 #
 from start_utils import (
-    db_session,
-    currency_lk_global_context_by_id
+    currency_registry
 )
+#
+from utilities.cursor import CursorUtility
+from utilities.money import Money, to_major_units, to_minor_units_column
 
 
 # Service class responsible for fetching the user's account statement
 class FetchStatementService(IService):
 
     # Constructor to initialize repositories and necessary context
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
 
         # Initializing repositories to interact with database tables
-        self.account_repository = AccountRepository(
+        self.account_repository = AsyncAccountRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
-        self.transaction_repository = TransactionRepository(
+        self.transaction_repository = AsyncTransactionRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session         
+            session=self.db_session
         )
 
-        self.user_repository = UserRepository(
+        self.user_repository = AsyncUserRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session     
+            session=self.db_session
         )
 
+        # Utility to encode and decode the keyset pagination cursors
+        self.cursor_utility = CursorUtility(urn=self.urn)
+
     # Main logic to fetch account statement (credit and debit transactions)
     async def run(self, data: dict) -> dict:
 
@@ -71,7 +80,7 @@ class FetchStatementService(IService):
 
         # Fetch user details based on user_id
         self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_id(
+        user: User = await self.user_repository.retrieve_record_by_id(
             id=user_id,
             is_deleted=False
         )
@@ -91,97 +100,119 @@ class FetchStatementService(IService):
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
 
-        # Initializing an empty list to collect all transaction data
-        all_transactions = []
-
-        # Fetching all credit transactions related to the account
-        self.logger.debug("Fetching Credit transactions")
-        credit_transactions: List[Transaction] = self.transaction_repository.retrieve_record_by_payee_account_urn(
-            payee_account_urn=account_urn
+        # Fetch the account by its URN
+        self.logger.debug("Fetching account")
+        account: Account = await self.account_repository.retrieve_record_by_urn(
+            urn=account_urn
         )
 
-        # Handle if there are no credit transactions
-        if credit_transactions is None:
-           credit_transactions = []
-
-        # Loop through all credit transactions and collect relevant data
-        for credit_transaction in credit_transactions:
-            payer_account = self.account_repository.retrieve_record_by_urn(
-                urn=credit_transaction.payer_account_urn
-            )
-            payee_account = self.account_repository.retrieve_record_by_urn(
-                urn=credit_transaction.payee_account_urn
+        # Raise an error if the account is not found or belongs to another user, without telling the two apart
+        if not account or account.user_id != user_id:
+            raise BadInputError(
+                response_message="Ledger account not found for the given urn",
+                response_key="error_account_not_found",
+                http_status_code=HTTPStatus.BAD_REQUEST
             )
-            # Fetching currency code associated with the transaction
-            currency_code = None
-            if payee_account:
-              currency: CurrencyLK = currency_lk_global_context_by_id.get(payee_account.currency_id)
-              currency_code = currency.code if currency else None
-
-            # Storing credit transaction details in a dictionary
-            transaction_data = {
-                "transaction_urn": credit_transaction.urn,
-                "payer_account_urn": credit_transaction.payer_account_urn,
-                "payee_account_urn": credit_transaction.payee_account_urn,
-                "amount": credit_transaction.amount,
-                "currency_code": currency_code,
-                "transaction_timestamp": credit_transaction.created_on,
-                "transaction_type": "CREDIT",
-                "payer_account_name": payer_account.name if payer_account else None,
-                "payee_account_name": payee_account.name if payee_account else None,
-                "purpose": credit_transaction.purpose
-            }
-            all_transactions.append(transaction_data)
-        self.logger.debug("Fetched Credit transaction")
 
-        # Fetching all debit transactions related to the account
-        self.logger.debug("Fetching Debit transactions")
-        debit_transactions: List[Transaction] = self.transaction_repository.retrieve_record_by_payer_account_urn(
-            payer_account_urn=account_urn
-        )
+        # Validate the page size, defaulting to a bounded page when none is given
+        limit = Pagination.DEFAULT_LIMIT if data.get("limit") is None else data.get("limit")
+
+        if limit < 1 or limit > Pagination.MAX_LIMIT:
+            raise BadInputError(
+                response_message=f"Invalid limit. Allowed values are 1 to {Pagination.MAX_LIMIT}.",
+                response_key="error_invalid_limit",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
 
-        # Handle if there are no debit transactions
-        if debit_transactions is None:
-           debit_transactions = []
+        # Validate the optional credit/debit filter
+        transaction_type = data.get("transaction_type")
 
-        # Loop through all debit transactions and collect relevant data
-        for debit_transaction in debit_transactions:
-            payer_account = self.account_repository.retrieve_record_by_urn(
-                urn=debit_transaction.payer_account_urn
+        if transaction_type and transaction_type not in TransactionType.ALL:
+            raise BadInputError(
+                response_message=f"Invalid transaction type. Allowed values are {', '.join(sorted(TransactionType.ALL))}",
+                response_key="error_invalid_transaction_type",
+                http_status_code=HTTPStatus.BAD_REQUEST
             )
-            payee_account = self.account_repository.retrieve_record_by_urn(
-                urn=debit_transaction.payee_account_urn
+
+        # Validate the optional date range
+        from_timestamp = data.get("from_timestamp")
+        to_timestamp = data.get("to_timestamp")
+
+        if from_timestamp and to_timestamp and from_timestamp >= to_timestamp:
+            raise BadInputError(
+                response_message="From timestamp must be earlier than to timestamp.",
+                response_key="error_invalid_timestamp_range",
+                http_status_code=HTTPStatus.BAD_REQUEST
             )
 
-            # Fetching currency code associated with the transaction
-            currency_code = None
-            if payer_account:
-              currency: CurrencyLK = currency_lk_global_context_by_id.get(payer_account.currency_id)
-              currency_code = currency.code if currency else None
-
-            # Storing debit transaction details in a dictionary
-            transaction_data = {
-                "transaction_urn": debit_transaction.urn,
-                "payer_account_urn": debit_transaction.payer_account_urn,
-                "payee_account_urn": debit_transaction.payee_account_urn,
-                "amount": debit_transaction.amount,
-                "currency_code": currency_code,
-                "transaction_timestamp": debit_transaction.created_on,
-                "transaction_type": "DEBIT",
-                "payer_account_name": payer_account.name if payer_account else None,
-                "payee_account_name": payee_account.name if payee_account else None,
-                "purpose": debit_transaction.purpose
-            }
-            all_transactions.append(transaction_data)
-        self.logger.debug("Fetched Debit transaction")
+        # Decode the cursor of the previous page, if any
+        cursor_created_on = None
+        cursor_id = None
+        if data.get("cursor"):
+
+            try:
+                cursor_created_on, cursor_id = self.cursor_utility.decode(cursor=data.get("cursor"))
+
+            except ValueError:
+                raise BadInputError(
+                    response_message="Invalid cursor.",
+                    response_key="error_invalid_cursor",
+                    http_status_code=HTTPStatus.BAD_REQUEST
+                )
+
+        # Fetching one page of credit and debit transactions of the account in one query
+        # Counterpart account names and the currency code are resolved by the query and rows arrive newest first
+        # One extra row is requested to find out whether another page follows
+        self.logger.debug("Fetching statement transactions")
+        statement_records = await self.transaction_repository.retrieve_statement_records_by_account_urn(
+            account_urn=account_urn,
+            limit=limit + 1,
+            cursor_created_on=cursor_created_on,
+            cursor_id=cursor_id,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            transaction_type=transaction_type
+        )
 
-        # Convert transactions list to a pandas DataFrame for easier manipulation
-        df_transactions = pd.DataFrame(data=all_transactions)
-        df_transactions = df_transactions.sort_values(by="transaction_timestamp", ascending=False)
-        df_transactions['transaction_timestamp'] = df_transactions['transaction_timestamp'].astype("string")
+        # Build the cursor of the next page from the last row returned, if more rows remain
+        next_cursor = None
+        if len(statement_records) > limit:
+            statement_records = statement_records[:limit]
+            next_cursor = self.cursor_utility.encode(
+                created_on=statement_records[-1]["transaction_timestamp"],
+                id=statement_records[-1]["id"]
+            )
 
-        # Convert DataFrame back to dictionary format to return in response
-        all_transactions_data = df_transactions.to_dict("records")
+        # Convert the amounts of the page from minor units with one vector division, and total its credits and debits
+        # with exact int64 vector sums; every row is in the currency of the statement account
+        exponent = statement_records[0]["currency_exponent"] if statement_records else 0
+        minor_units = to_minor_units_column((statement_record["amount"] for statement_record in statement_records), count=len(statement_records))
+        is_credit = np.fromiter((statement_record["transaction_type"] == TransactionType.CREDIT for statement_record in statement_records), dtype=bool, count=len(statement_records))
+        amounts = to_major_units(minor_units, exponent)
+        totals = {
+            "credit_amount": float(Money(int(minor_units[is_credit].sum()), exponent)),
+            "debit_amount": float(Money(int(minor_units[~is_credit].sum()), exponent)),
+            "transaction_count": len(statement_records)
+        }
+
+        # Collect the relevant data of every transaction, leaving out the internal row id
+        # The rows are already ordered by the query, and timestamps are written as strings by the response serializer
+        all_transactions_data = [
+            {
+                "transaction_urn": statement_record["transaction_urn"],
+                "payer_account_urn": statement_record["payer_account_urn"],
+                "payee_account_urn": statement_record["payee_account_urn"],
+                "amount": amount,
+                "currency_code": statement_record["currency_code"],
+                "transaction_timestamp": statement_record["transaction_timestamp"],
+                "transaction_type": statement_record["transaction_type"],
+                "payer_account_name": statement_record["payer_account_name"],
+                "payee_account_name": statement_record["payee_account_name"],
+                "purpose": statement_record["purpose"]
+            }
+            for statement_record, amount in zip(statement_records, amounts)
+        ]
+        self.logger.debug("Fetched statement transactions")
 
         # Prepare the response DTO with transaction data
         self.logger.debug("Preparing response metadata")
@@ -190,7 +221,11 @@ class FetchStatementService(IService):
             status=APIStatus.SUCCESS,
             response_message="Successfully created ledger account.",
             response_key="success_payee_account_creation",
-            data=all_transactions_data
+            data={
+                "transactions": all_transactions_data,
+                "totals": totals,
+                "next_cursor": next_cursor
+            }
         )
         http_status_code = HTTPStatus.OK
         self.logger.debug("Prepared response metadata")
@@ -0,0 +1,203 @@
+import csv
+import io
+#
+from http import HTTPStatus
+from typing import AsyncIterator, Dict, List
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+#
+from abstractions.service import IService
+#
+from constants.export_format import ExportFormat
+from constants.transaction_type import TransactionType
+#
+from errors.bad_input_error import BadInputError
+#
+from models.account import Account
+from models.user import User
+#
+from repositories.account import AsyncAccountRepository
+from repositories.transaction import AsyncTransactionRepository
+from repositories.user import AsyncUserRepository
+#
+from utilities.money import to_major_units, to_minor_units_column
+from utilities.orjson_response import serialize
+
+
+# Service class responsible for exporting the full statement of an account as NDJSON or CSV
+class FetchStatementExportService(IService):
+
+    # Columns written for every transaction, in file order
+    COLUMNS: List[str] = [
+        "transaction_urn",
+        "payer_account_urn",
+        "payee_account_urn",
+        "amount",
+        "currency_code",
+        "transaction_timestamp",
+        "transaction_type",
+        "payer_account_name",
+        "payee_account_name",
+        "purpose",
+    ]
+
+    # Constructor to initialize repositories and necessary context
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.db_session = db_session
+
+        # Initializing repositories to interact with database tables
+        self.account_repository = AsyncAccountRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.transaction_repository = AsyncTransactionRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.user_repository = AsyncUserRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+    # Main logic to validate the export request and return the file content as an async iterator of encoded chunks
+    # Validation happens here, before the first byte is sent, so bad input still gets a regular error response
+    async def run(self, data: dict) -> AsyncIterator[bytes]:
+
+        # Extracting user ID from the request data
+        user_id: str = data.get("user_id")
+
+        # Fetch user details based on user_id
+        self.logger.debug("Fetching user")
+        user: User = await self.user_repository.retrieve_record_by_id(
+            id=user_id,
+            is_deleted=False
+        )
+
+        # Raise an error if user is not found
+        if not user:
+            raise RuntimeError("User not found")
+
+        # Fetch account URN from the request data
+        account_urn = data.get("account_urn", "")
+
+        # Check if account URN is provided; raise an error if missing
+        if not account_urn:
+            raise BadInputError(
+                response_message="Account URN cannot be empty or none.",
+                response_key="error_invalid_account_urn",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Fetch the account by its URN
+        self.logger.debug("Fetching account")
+        account: Account = await self.account_repository.retrieve_record_by_urn(
+            urn=account_urn
+        )
+
+        # Raise an error if the account is not found or belongs to another user, without telling the two apart
+        if not account or account.user_id != user_id:
+            raise BadInputError(
+                response_message="Ledger account not found for the given urn",
+                response_key="error_account_not_found",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Validate the export format
+        export_format = data.get("format") or ExportFormat.NDJSON
+
+        if export_format not in ExportFormat.ALL:
+            raise BadInputError(
+                response_message=f"Invalid format. Allowed values are {', '.join(sorted(ExportFormat.ALL))}",
+                response_key="error_invalid_format",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Validate the optional credit/debit filter
+        transaction_type = data.get("transaction_type")
+
+        if transaction_type and transaction_type not in TransactionType.ALL:
+            raise BadInputError(
+                response_message=f"Invalid transaction type. Allowed values are {', '.join(sorted(TransactionType.ALL))}",
+                response_key="error_invalid_transaction_type",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Validate the optional date range
+        from_timestamp = data.get("from_timestamp")
+        to_timestamp = data.get("to_timestamp")
+
+        if from_timestamp and to_timestamp and from_timestamp >= to_timestamp:
+            raise BadInputError(
+                response_message="From timestamp must be earlier than to timestamp.",
+                response_key="error_invalid_timestamp_range",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Return the lazy file content; nothing is read from the transaction table until the response starts streaming
+        return self.stream_statement(
+            account_urn=account_urn,
+            export_format=export_format,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            transaction_type=transaction_type
+        )
+
+    # Stream the statement rows, encoding one database partition into one chunk of the file at a time
+    async def stream_statement(self, account_urn: str, export_format: str, from_timestamp, to_timestamp, transaction_type) -> AsyncIterator[bytes]:
+
+        self.logger.debug("Streaming statement export")
+
+        # Write the CSV header before the first row
+        if export_format == ExportFormat.CSV:
+            yield self.encode_csv(rows=[self.COLUMNS])
+
+        async for partition in self.transaction_repository.stream_statement_records_by_account_urn(
+            account_urn=account_urn,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            transaction_type=transaction_type,
+            yield_per=ExportFormat.YIELD_PER
+        ):
+            # Convert the amounts of the partition from minor units with one vector division
+            exponent = partition[0]["currency_exponent"] if partition else 0
+            amounts = to_major_units(to_minor_units_column((statement_record["amount"] for statement_record in partition), count=len(partition)), exponent)
+            records = [self.to_record(statement_record=statement_record, amount=amount) for statement_record, amount in zip(partition, amounts)]
+
+            if export_format == ExportFormat.CSV:
+                yield self.encode_csv(rows=[[record[column] for column in self.COLUMNS] for record in records])
+            else:
+                yield self.encode_ndjson(records=records)
+
+        self.logger.debug("Streamed statement export")
+
+    # Collect the exported data of one transaction, leaving out the internal row id, with its amount in major units
+    # Timestamps stay datetimes; both encoders write them in their str() form
+    def to_record(self, statement_record: RowMapping, amount: float) -> Dict:
+
+        record = {column: statement_record[column] for column in self.COLUMNS}
+        record["amount"] = amount
+        return record
+
+    # Encode records as newline-delimited JSON, one object per line, with the serializer of the API responses
+    def encode_ndjson(self, records: List[Dict]) -> bytes:
+
+        return b"".join(serialize(record) + b"\n" for record in records)
+
+    # Encode rows as CSV lines with standard quoting
+    def encode_csv(self, rows: List[List]) -> bytes:
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
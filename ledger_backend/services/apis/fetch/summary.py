@@ -0,0 +1,176 @@
+from datetime import date
+from http import HTTPStatus
+from typing import Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
+#
+from abstractions.service import IService
+#
+from constants.api_status import APIStatus
+from constants.summary_period import SummaryPeriod
+#
+from dtos.responses.base import BaseResponseDTO
+#
+from errors.bad_input_error import BadInputError
+#
+from models.account import Account
+from models.account_daily_rollup import AccountDailyRollup
+from models.currency_lk import CurrencyLK
+#
+from repositories.account import AsyncAccountRepository
+from repositories.account_daily_rollup import AsyncAccountDailyRollupRepository
+#
+from start_utils import (
+    SUMMARY_MAX_DAYS,
+    currency_registry
+)
+#
+from utilities.money import Money
+
+
+# Service class responsible for summarising the credits, debits and balances of an account over a date range
+# The summary is built from the account's daily rollups, so it reads one row per day with transactions, whatever their number
+class FetchSummaryService(IService):
+
+    # Constructor to initialize repositories and necessary context
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
+        self.urn = urn
+        self.user_urn = user_urn
+        self.api_name = api_name
+        self.db_session = db_session
+
+        # Initializing repositories to interact with database tables
+        self.account_repository = AsyncAccountRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+        self.account_daily_rollup_repository = AsyncAccountDailyRollupRepository(
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name,
+            session=self.db_session
+        )
+
+    # Main logic to fetch the account summary
+    async def run(self, data: dict) -> dict:
+
+        # Fetch account URN from the request data
+        account_urn = data.get("account_urn", "")
+
+        # Check if account URN is provided; raise an error if missing
+        if not account_urn:
+            raise BadInputError(
+                response_message="Account URN cannot be empty or none.",
+                response_key="error_invalid_account_urn",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Validate the grouping period
+        period = data.get("period") or SummaryPeriod.DAY
+
+        if period not in SummaryPeriod.ALL:
+            raise BadInputError(
+                response_message=f"Invalid period. Allowed values are {', '.join(sorted(SummaryPeriod.ALL))}",
+                response_key="error_invalid_period",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Validate the date range, which includes both dates and is bounded so a summary never reads more than SUMMARY_MAX_DAYS rollups
+        from_date: date = data.get("from_date")
+        to_date: date = data.get("to_date")
+
+        if from_date > to_date:
+            raise BadInputError(
+                response_message="From date cannot be later than to date.",
+                response_key="error_invalid_date_range",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        if (to_date - from_date).days + 1 > SUMMARY_MAX_DAYS:
+            raise BadInputError(
+                response_message=f"The date range cannot be longer than {SUMMARY_MAX_DAYS} days.",
+                response_key="error_invalid_date_range",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        # Fetch the account by its URN
+        self.logger.debug("Fetching account")
+        account: Account = await self.account_repository.retrieve_record_by_urn(
+            urn=account_urn
+        )
+
+        # Raise an error if the account is not found or belongs to another user, without telling the two apart
+        if not account or account.user_id != data.get("user_id"):
+            raise BadInputError(
+                response_message="Ledger account not found for the given urn",
+                response_key="error_account_not_found",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        currency: CurrencyLK = currency_registry.snapshot.by_id.get(account.currency_id)
+
+        # Fetch the daily rollups of the range, and the closing balance of the last day with transactions before it
+        self.logger.debug("Fetching account daily rollups")
+        rollups: List[AccountDailyRollup] = await self.account_daily_rollup_repository.retrieve_records_by_account_id(
+            account_id=account.id,
+            from_day=from_date,
+            to_day=to_date
+        )
+        previous_rollup: AccountDailyRollup = await self.account_daily_rollup_repository.retrieve_last_record_before_day(
+            account_id=account.id,
+            day=from_date
+        )
+        self.logger.debug("Fetched account daily rollups")
+
+        # Group the daily rollups by period, in minor units; a period closes with the closing balance of its last day
+        periods: Dict[str, dict] = {}
+        for rollup in rollups:
+            key = rollup.day.isoformat() if period == SummaryPeriod.DAY else rollup.day.strftime("%Y-%m")
+            totals = periods.setdefault(key, {"credit_amount": 0, "debit_amount": 0, "transaction_count": 0})
+            totals["credit_amount"] += rollup.credit_amount
+            totals["debit_amount"] += rollup.debit_amount
+            totals["transaction_count"] += rollup.transaction_count
+            totals["closing_balance"] = rollup.closing_balance
+
+        opening_balance = previous_rollup.closing_balance if previous_rollup else 0
+        closing_balance = rollups[-1].closing_balance if rollups else opening_balance
+
+        # Prepare the response DTO, with amounts in major units of the account's currency
+        self.logger.debug("Preparing response metadata")
+        response_dto: BaseResponseDTO = BaseResponseDTO(
+            transaction_urn=self.urn,
+            status=APIStatus.SUCCESS,
+            response_message="Successfully fetched account summary.",
+            response_key="success_account_summary",
+            data={
+                "account_urn": account.urn,
+                "currency": currency.name,
+                "from_date": from_date.isoformat(),
+                "to_date": to_date.isoformat(),
+                "period": period,
+                "opening_balance": float(Money(opening_balance, currency.exponent)),
+                "closing_balance": float(Money(closing_balance, currency.exponent)),
+                "totals": {
+                    "credit_amount": float(Money(sum(rollup.credit_amount for rollup in rollups), currency.exponent)),
+                    "debit_amount": float(Money(sum(rollup.debit_amount for rollup in rollups), currency.exponent)),
+                    "transaction_count": sum(rollup.transaction_count for rollup in rollups)
+                },
+                "periods": [
+                    {
+                        "period": key,
+                        "credit_amount": float(Money(totals["credit_amount"], currency.exponent)),
+                        "debit_amount": float(Money(totals["debit_amount"], currency.exponent)),
+                        "transaction_count": totals["transaction_count"],
+                        "closing_balance": float(Money(totals["closing_balance"], currency.exponent))
+                    }
+                    for key, totals in periods.items()
+                ]
+            }
+        )
+        self.logger.debug("Prepared response metadata")
+
+        # Return the response DTO
+        return response_dto
@@ -1,9 +1,8 @@
-import bcrypt
-import os
 import ulid
 #
 from datetime import datetime
 from http import HTTPStatus
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
@@ -11,59 +10,84 @@ from errors.bad_input_error import BadInputError
 #
 from models.user import User
 #
-from repositories.user import UserRepository
+from repositories.user import AsyncUserRepository
 #
-from start_utils import db_session
+from start_utils import (
+    BCRYPT_ROUNDS,
+    BCRYPT_SALT,
+    password_hashing_executor
+)
 #
 from utilities.jwt import JWTUtility
+from utilities.password import PasswordUtility
 
 
 class UserLoginService(IService):
 
     # Constructor to initialize the service with required dependencies
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
 
-        # Initialize utilities and repositories for JWT and user operations
+        # Initialize utilities and repositories for JWT, password and user operations
         self.jwt_utility = JWTUtility(urn=self.urn)
-        self.user_repository = UserRepository(
+        self.password_utility = PasswordUtility(
+            executor=password_hashing_executor,
+            rounds=BCRYPT_ROUNDS,
+            legacy_salt=BCRYPT_SALT,
+            urn=self.urn
+        )
+
+        self.user_repository = AsyncUserRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
     # Method to execute the user login logic
     async def run(self, data: dict) -> dict:
 
-        # Fetch the user by email and hashed password
+        # Fetch the user by email, then verify the password against the user's own hash
         self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_email_and_password(
+        user: User = await self.user_repository.retrieve_record_by_email(
             email=data.get("email"),
-            password=bcrypt.hashpw(data.get("password").encode("utf8"), os.getenv("BCRYPT_SALT").encode("utf8")).decode("utf8"),
             is_deleted=False
         )
         self.logger.debug("Fetched user")
 
+        self.logger.debug("Verifying password")
+        is_password_valid: bool = await self.password_utility.verify(
+            password=data.get("password"),
+            hashed=user.password if user else None
+        )
+        self.logger.debug("Verified password")
+
         # Raise an error if the user is not found or if the credentials are incorrect
-        if not user:
+        if not user or not is_password_valid:
             raise BadInputError(
                 response_message="User not Found. Incorrect email or password.",
                 response_key="error_authorisation_failed",
                 http_status_code=HTTPStatus.BAD_REQUEST
             )
         
+        # Passwords hashed with the former shared salt are rehashed with their own salt on login
+        new_data = {
+            "is_logged_in": True,
+            "last_login": datetime.now()
+        }
+        if self.password_utility.needs_rehash(hashed=user.password):
+            self.logger.debug("Rehashing password")
+            new_data["password"] = await self.password_utility.hash(password=data.get("password"))
+
         # Update the user's logged-in status and last login time
         self.logger.debug("Updating logged in status")
-        user: User = self.user_repository.update_record(
+        user: User = await self.user_repository.update_record(
             id=user.id,
-            new_data={
-                "is_logged_in": True,
-                "last_login": datetime.now()
-            }
+            new_data=new_data
         )
         self.logger.debug("Updated logged in status")
 
@@ -1,9 +1,5 @@
-import bcrypt
-import os
-import ulid
-#
-from datetime import datetime
 from http import HTTPStatus
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
@@ -11,29 +7,37 @@ from errors.bad_input_error import BadInputError
 #
 from models.user import User
 #
-from repositories.user import UserRepository
+from repositories.user import AsyncUserRepository
 #
-from start_utils import db_session
+from start_utils import logout_cache
 #
 from utilities.jwt import JWTUtility
+from utilities.session_cache import SessionCacheUtility
 
 
 class UserLogoutService(IService):
 
     # Constructor to initialize the service with required dependencies
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
 
         # Initialize utilities and repositories for JWT and user operations
         self.jwt_utility = JWTUtility(urn=self.urn)
-        self.user_repository = UserRepository(
+        self.session_cache_utility = SessionCacheUtility(
+            cache=logout_cache,
+            urn=self.urn,
+            user_urn=self.user_urn,
+            api_name=self.api_name
+        )
+        self.user_repository = AsyncUserRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
     # Method to execute the user logout logic
@@ -41,7 +45,7 @@ class UserLogoutService(IService):
 
         # Fetch the user by user_id and check if logged in
         self.logger.debug("Fetching user")
-        user: User = self.user_repository.retrieve_record_by_id_is_logged_in(
+        user: User = await self.user_repository.retrieve_record_by_id_is_logged_in(
             id=data.get("user_id"),
             is_logged_in=True
         )
@@ -57,7 +61,7 @@ class UserLogoutService(IService):
         
         # Update the user's logged-out status
         self.logger.debug("Updating logged out status")
-        user: User = self.user_repository.update_record(
+        user: User = await self.user_repository.update_record(
             id=user.id,
             new_data={
                 "is_logged_in": False,
@@ -65,6 +69,9 @@ class UserLogoutService(IService):
         )
         self.logger.debug("Updated logged out status")
 
+        # Record the logout once committed, so every worker sharing the logout cache checks the user's cached sessions again
+        await self.session_cache_utility.set_logged_out(user_id=user.id)
+
         # Return the user's logged-out status
         return {
             "status": user.is_logged_in
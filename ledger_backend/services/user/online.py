@@ -2,36 +2,38 @@ import ulid
 #
 from datetime import datetime
 from typing import Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
 from models.user import User
 #
-from repositories.user import UserRepository
+from repositories.user import AsyncUserRepository
 #
-from start_utils import db_session, logger
+from start_utils import logger
 
 
 class OnlineUsersService(IService):
 
     # Constructor to initialize the service with required dependencies
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
 
     # Method to execute the logic for fetching online users
     async def run(self, data: dict) -> List[Dict[str, str]]:
 
         # Fetch the list of online users (who are logged in and not deleted)
         self.logger.debug("Fetching online users")
-        users: List[User] = UserRepository(
+        users: List[User] = await AsyncUserRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            db_session=db_session
-        ).get_record_by_is_logged_in(
+            session=self.db_session
+        ).retrieve_record_by_is_logged_in(
             is_logged_in=True,
             is_deleted=False
         )
@@ -1,9 +1,8 @@
-import bcrypt
-import os
 import ulid
 #
 from datetime import datetime
 from http import HTTPStatus
+from sqlalchemy.ext.asyncio import AsyncSession
 #
 from abstractions.service import IService
 #
@@ -11,25 +10,40 @@ from errors.bad_input_error import BadInputError
 #
 from models.user import User
 #
-from repositories.user import UserRepository
+from repositories.user import AsyncUserRepository
 #
-from start_utils import db_session
+from start_utils import (
+    BCRYPT_ROUNDS,
+    BCRYPT_SALT,
+    password_hashing_executor
+)
+#
+from utilities.password import PasswordUtility
 
 class UserRegistrationService(IService):
 
     # Constructor to initialize the service with the required attributes and repository setup
-    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
-        super().__init__(urn, user_urn, api_name)
+    def __init__(self, urn: str = None, user_urn: str = None, api_name: str = None, db_session: AsyncSession = None) -> None:
+        super().__init__(urn, user_urn, api_name, db_session)
         self.urn = urn
         self.user_urn = user_urn
         self.api_name = api_name
+        self.db_session = db_session
+
+        # Initialize the utility hashing passwords on the shared password hashing pool
+        self.password_utility = PasswordUtility(
+            executor=password_hashing_executor,
+            rounds=BCRYPT_ROUNDS,
+            legacy_salt=BCRYPT_SALT,
+            urn=self.urn
+        )
 
-        # Initializing the UserRepository with the required parameters
-        self.user_repository = UserRepository(
+        # Initializing the AsyncUserRepository with the required parameters
+        self.user_repository = AsyncUserRepository(
             urn=self.urn,
             user_urn=self.user_urn,
             api_name=self.api_name,
-            session=db_session
+            session=self.db_session
         )
 
     # Main logic for the user registration process
@@ -37,7 +51,7 @@ class UserRegistrationService(IService):
 
         # Check if a user already exists with the given email
         self.logger.debug("Checking if user exists")
-        user: User = self.user_repository.retrieve_record_by_email(
+        user: User = await self.user_repository.retrieve_record_by_email(
             email=data.get("email")
         )
 
@@ -55,13 +69,13 @@ class UserRegistrationService(IService):
         user: User = User(
             urn=ulid.ulid(),  # Generate a unique URN for the new user
             email=data.get("email"),
-            password=bcrypt.hashpw(data.get("password").encode("utf-8"), os.getenv("BCRYPT_SALT").encode("utf8")).decode("utf8"),  # Hash the password using bcrypt
+            password=await self.password_utility.hash(password=data.get("password")),  # Hash the password using bcrypt with its own salt
             is_deleted=False,
             created_at=datetime.now()  # Set the creation timestamp
         )
         
         # Save the user record in the database
-        user: User = self.user_repository.create_record(
+        user: User = await self.user_repository.create_record(
             user=user
         )
         self.logger.debug("Prepared user data")
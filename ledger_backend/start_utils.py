@@ -1,22 +1,32 @@
 # Import necessary Python libraries for environment variable loading, logging, and SQLAlchemy
+import asyncio
 import os
 import sys
 #
+from concurrent.futures import ThreadPoolExecutor  # For the pool hashing passwords off the event loop
+from functools import lru_cache  # For building the database engines once, on first use
 from dotenv import load_dotenv  # For loading environment variables from a .env file
 from loguru import logger  # Loguru for enhanced logging features
-from sqlalchemy import create_engine  # For creating a SQLAlchemy engine
+from sqlalchemy import create_engine, event  # For creating a SQLAlchemy engine and hooking into its queries
+from sqlalchemy.engine import URL, Engine  # For building database URLs from the configuration
+from sqlalchemy.exc import OperationalError  # Raised when the database cannot be reached
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine  # For the asyncio engine used by requests
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool  # Connection pools shared by the request-scoped sessions
 from sqlalchemy.orm import sessionmaker  # For creating database sessions
 from sqlalchemy.ext.declarative import declarative_base  # For defining SQLAlchemy ORM models
-from typing import List  # For type hinting
 #
 # Import configurations, models, and utility classes from your application
 from configurations.db import DBConfiguration, DBConfigurationDTO  # For database configuration
 #
-from models.currency_lk import CurrencyLK  # ORM model for CurrencyLK
+from abstractions.cache import ICache  # Interface of the account and session cache backends
 #
-from repositories.currency_lk import CurrencyLKRepository  # Repository for handling CurrencyLK data
+from constants.metric import Metric  # Names of the metrics exposed on /metrics
 #
-from utilities.dictionary import DictionaryUtility  # Utility for dictionary operations
+from factories.cache import CacheFactory  # For building the configured account and session cache backends
+#
+from utilities.currency_registry import CurrencyRegistry  # In-memory currencies refreshed in the background
+from utilities.metrics import MetricsRegistry  # Metrics of the worker exposed on /metrics
+from utilities.ttl_cache import TTLCache  # In-process cache with expiring entries
 
 # Configure the loguru logger with a custom format and colorized output
 logger.remove(0)
@@ -25,59 +35,239 @@ logger.add(sys.stderr, colorize=True, format="<green>{time:MMMM-D-YYYY}</green>
 # Load environment variables from the .env file using dotenv
 load_dotenv()
 
-# Log the start of configuration loading
-logger.info("Loading Configurations")
-db_configuration: DBConfigurationDTO = DBConfiguration().get_config()  # Load DB configurations
-logger.info("Loaded Configurations")
-
 # Access the necessary environment variables for app configuration and security
 logger.info("Loading environment variables")
 APP_NAME: str = os.environ.get('APP_NAME')  # Application name from environment
 SECRET_KEY: str = os.getenv("SECRET_KEY")  # Secret key for app security
 ALGORITHM: str = os.getenv("ALGORITHM")  # Algorithm used for token generation
 ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))  # Token expiry time
+BCRYPT_SALT: str = os.getenv("BCRYPT_SALT")  # Shared salt of passwords hashed before per-user salts, upgraded on login
+BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))  # bcrypt cost of new password hashes
+PASSWORD_HASHING_MAX_WORKERS: int = int(os.getenv("PASSWORD_HASHING_MAX_WORKERS", min(4, os.cpu_count() or 1)))  # Password hashes computed at once per worker
+# Every worker caches sessions on its own and checks them against the logouts recorded in SESSION_CACHE_BACKEND; with the memory
+# backend logouts are only seen by the worker serving them, so the other workers keep accepting the user's tokens for up to
+# SESSION_CACHE_TTL_SECONDS
+SESSION_CACHE_TTL_SECONDS: int = int(os.getenv("SESSION_CACHE_TTL_SECONDS", 30))  # How long a validated login session is trusted without a DB check
+SENDER_EMAIL: str = os.getenv("sender_email")  # Address notifications are sent from, also the SMTP user name
+SENDER_PASSWORD: str = os.getenv("sender_password")  # SMTP password of the sender address
+SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")  # SMTP server used to deliver notifications
+SMTP_PORT: int = int(os.getenv("SMTP_PORT", 587))  # Port of the SMTP server
+SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() == "true"  # Upgrade the SMTP connection with STARTTLS
+ACCOUNT_CACHE_BACKEND: str = os.getenv("ACCOUNT_CACHE_BACKEND", "memory")  # Where accounts and balances are cached: memory or redis
+ACCOUNT_CACHE_TTL_SECONDS: int = int(os.getenv("ACCOUNT_CACHE_TTL_SECONDS", 60))  # How long a cached account is served before it is reloaded
+ACCOUNT_CACHE_MAX_SIZE: int = int(os.getenv("ACCOUNT_CACHE_MAX_SIZE", 100000))  # Entries kept per worker by the memory backend
+REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")  # Redis server used by the redis cache backend
+SESSION_CACHE_BACKEND: str = os.getenv("SESSION_CACHE_BACKEND", ACCOUNT_CACHE_BACKEND)  # Where logouts are recorded for every worker: memory or redis
+TRANSACTION_BATCH_MAX_SIZE: int = int(os.getenv("TRANSACTION_BATCH_MAX_SIZE", 5000))  # Transfers accepted by one /apis/create/transactions request
+SUMMARY_MAX_DAYS: int = int(os.getenv("SUMMARY_MAX_DAYS", 3660))  # Longest date range, in days, of one /apis/fetch/summary request
+BALANCE_CHECKPOINT_INTERVAL: int = int(os.getenv("BALANCE_CHECKPOINT_INTERVAL", 500))  # Transactions of an account and day between two balance checkpoints
+CURRENCY_REFRESH_INTERVAL_SECONDS: float = float(os.getenv("CURRENCY_REFRESH_INTERVAL_SECONDS", 30))  # How often each worker checks the currency table for changes
+STARTUP_DB_RETRIES: int = int(os.getenv("STARTUP_DB_RETRIES", 5))  # Attempts to reach the database when a worker starts
+STARTUP_DB_RETRY_DELAY_SECONDS: float = float(os.getenv("STARTUP_DB_RETRY_DELAY_SECONDS", 1))  # Delay before the first retry, doubled on each retry
+NOTIFICATION_TRANSPORT: str = os.getenv("NOTIFICATION_TRANSPORT", "smtp")  # How notifications are delivered: smtp or log
+NOTIFICATION_DISPATCHER_ENABLED: bool = os.getenv("NOTIFICATION_DISPATCHER_ENABLED", "true").lower() == "true"  # Run the dispatcher inside the app
+NOTIFICATION_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_BATCH_SIZE", 50))  # Notifications delivered per batch
+NOTIFICATION_POLL_INTERVAL_SECONDS: float = float(os.getenv("NOTIFICATION_POLL_INTERVAL_SECONDS", 2))  # Wait between polls of an empty outbox
+NOTIFICATION_MAX_ATTEMPTS: int = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5))  # Delivery attempts before a notification is marked failed
+NOTIFICATION_RETRY_BACKOFF_SECONDS: float = float(os.getenv("NOTIFICATION_RETRY_BACKOFF_SECONDS", 30))  # Delay before the first retry, doubled on each retry
+NOTIFICATION_LEASE_SECONDS: float = float(os.getenv("NOTIFICATION_LEASE_SECONDS", 300))  # How long a claimed batch is kept from other dispatchers
+SERVER_MODE: str = os.getenv("SERVER_MODE", "development")  # How the server is launched: development or production
+SERVER_HOST: str = os.getenv("SERVER_HOST", "127.0.0.1")  # Address the server listens on
+SERVER_PORT: int = int(os.getenv("SERVER_PORT", 8002))  # Port the server listens on
+SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1))  # Worker processes in production mode
+SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = int(os.getenv("SERVER_GRACEFUL_SHUTDOWN_SECONDS", 30))  # How long a stopping worker waits for in-flight requests
+SERVER_KEEP_ALIVE_SECONDS: int = int(os.getenv("SERVER_KEEP_ALIVE_SECONDS", 5))  # How long an idle keep-alive connection is held open
 logger.info("Loaded environment variables")
 
-# Initialize the MySQL database using SQLAlchemy
-logger.info("Initializing MySQL database")
-# Create an engine to connect to the MySQL database using the configuration values
-engine = create_engine(f'mysql+pymysql://{db_configuration.user_name}:{db_configuration.password}@{db_configuration.host}:{db_configuration.port}/{db_configuration.database}')
-# Set up the session maker for handling database sessions
-Session = sessionmaker(bind=engine)
-db_session = Session()  # Create a new database session
+# Nothing below connects to the database at import time: configuration, engines and session factories are built
+# by the accessors on first use, and the currency loading runs in the FastAPI lifespan.
+# Modules can therefore be imported without a database, and every worker process builds its own engines.
+
+# Load the database configuration on first use
+@lru_cache(maxsize=None)
+def get_db_configuration() -> DBConfigurationDTO:
+
+    logger.info("Loading Configurations")
+    db_configuration: DBConfigurationDTO = DBConfiguration().get_config()  # Load DB configurations
+    logger.info("Loaded Configurations")
+
+    return db_configuration
+
+# Build the database URL for the given driver from the configuration values
+# SQLite (e.g. the local ledger.db) only needs the database file, server databases need the full set of credentials
+def build_database_url(driver: str) -> URL:
+
+    db_configuration = get_db_configuration()
+    if db_configuration.dialect == "sqlite":
+        return URL.create(
+            drivername=f"{db_configuration.dialect}+{driver}",
+            database=db_configuration.database
+        )
+
+    return URL.create(
+        drivername=f"{db_configuration.dialect}+{driver}",
+        username=db_configuration.user_name,
+        password=db_configuration.password,
+        host=db_configuration.host,
+        port=db_configuration.port,
+        database=db_configuration.database
+    )
+
+# Metrics of the worker: repository method and request durations, query counts and connection pool usage
+metrics_registry: MetricsRegistry = MetricsRegistry()
+
+# Count every query run through the engines, for the worker and for the request being handled
+def count_query(*args) -> None:
+    metrics_registry.record_query()
+
+# Create the engine connecting to the database using the configuration values, on first use
+# The synchronous engine serves scripts, requests go through the asyncio engine below
+# The engine owns a QueuePool sized from config.json so that every worker keeps its own bounded set of connections
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+
+    db_configuration = get_db_configuration()
+    logger.info("Initializing database engine")
+    engine = create_engine(
+        build_database_url(driver=db_configuration.driver),
+        poolclass=QueuePool,
+        pool_size=db_configuration.pool_size,  # Connections kept open in the pool
+        max_overflow=db_configuration.max_overflow,  # Extra connections allowed under burst load
+        pool_timeout=db_configuration.pool_timeout,  # Seconds to wait for a free connection
+        pool_recycle=db_configuration.pool_recycle,  # Seconds after which a connection is replaced
+        pool_pre_ping=db_configuration.pool_pre_ping  # Validate connections before handing them out
+    )
+    event.listen(engine, "before_cursor_execute", count_query)
+    return engine
+
+# Set up the session maker for handling synchronous database sessions, on first use
+@lru_cache(maxsize=None)
+def get_session_factory() -> sessionmaker:
+    return sessionmaker(bind=get_engine())
+
+# Create the asyncio engine used on the request path with the same pool settings, on first use
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+
+    db_configuration = get_db_configuration()
+    logger.info("Initializing async database engine")
+    async_engine = create_async_engine(
+        build_database_url(driver=db_configuration.async_driver),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=db_configuration.pool_size,
+        max_overflow=db_configuration.max_overflow,
+        pool_timeout=db_configuration.pool_timeout,
+        pool_recycle=db_configuration.pool_recycle,
+        pool_pre_ping=db_configuration.pool_pre_ping
+    )
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_query)
+    return async_engine
+
+# Set up the async session maker on first use; sessions are opened per request by DBSessionMiddleware
+# Objects are not expired on commit so that services can keep reading them without triggering lazy IO
+@lru_cache(maxsize=None)
+def get_async_session_factory() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(), expire_on_commit=False)
+
 Base = declarative_base()  # Set up the base class for SQLAlchemy models
-logger.info("Initialized MySQL database")
-
-# Initialize the dictionary utility for use throughout the application
-dictionary_utility = DictionaryUtility(urn=None)
-
-# Log the start of registering CurrencyLK repository into the global context
-logger.info(f"Registering {CurrencyLKRepository.__name__} global context.")
-# Retrieve all records of CurrencyLK from the database using the repository pattern
-currency_lk_records: List[CurrencyLK] = CurrencyLKRepository(
-    urn=None, 
-    session=db_session
-).retrieve_all_records()
-
-# Build a dictionary for CurrencyLK records with 'name' as the key
-currency_lk_global_context_by_name: dict = dictionary_utility.build_dictonary_with_key(
-    records=currency_lk_records,
-    key="name"
+
+# Currencies of the lookup table held in memory by every worker, loaded at startup and refreshed in the background
+# Readers look currencies up in currency_registry.snapshot, which a refresh replaces as a whole when the table changed
+currency_registry: CurrencyRegistry = CurrencyRegistry(
+    session_factory=get_async_session_factory,
+    refresh_interval_seconds=CURRENCY_REFRESH_INTERVAL_SECONDS
+)
+
+# Prepare the database for serving requests: load the currencies
+# The schema is not created here; it is owned by the migrations in scripts/updates/sql
+# A database that is briefly unavailable is retried with a growing delay instead of failing the worker right away
+async def initialize_database() -> None:
+
+    for attempt in range(1, STARTUP_DB_RETRIES + 1):
+        try:
+            await currency_registry.refresh()
+            return
+
+        except (OperationalError, OSError) as err:
+            if attempt == STARTUP_DB_RETRIES:
+                raise
+
+            delay = STARTUP_DB_RETRY_DELAY_SECONDS * 2 ** (attempt - 1)
+            logger.warning(f"Database unavailable on startup attempt {attempt} of {STARTUP_DB_RETRIES}, retrying in {delay} seconds: {err}")
+            await asyncio.sleep(delay)
+
+# Return a value of the pools of the engines created by this process, keyed by the engine
+# Engines are only read once built, so reading the metrics never connects to the database
+def collect_db_pool_metric(read) -> dict:
+
+    pools = {}
+    if get_engine.cache_info().currsize:
+        pools[("sync",)] = read(get_engine().pool)
+    if get_async_engine.cache_info().currsize:
+        pools[("async",)] = read(get_async_engine().pool)
+    return pools
+
+metrics_registry.add_gauge(
+    name=Metric.DB_POOL_SIZE,
+    documentation="Connections kept open in the pool.",
+    label_names=("engine",),
+    collect=lambda: collect_db_pool_metric(lambda pool: pool.size())
+)
+metrics_registry.add_gauge(
+    name=Metric.DB_POOL_CHECKED_OUT,
+    documentation="Connections of the pool currently in use.",
+    label_names=("engine",),
+    collect=lambda: collect_db_pool_metric(lambda pool: pool.checkedout())
+)
+metrics_registry.add_gauge(
+    name=Metric.DB_POOL_OVERFLOW,
+    documentation="Connections opened beyond the pool size, negative while the pool is not yet full.",
+    label_names=("engine",),
+    collect=lambda: collect_db_pool_metric(lambda pool: pool.overflow())
+)
+
+# Close the pooled connections of the engines created by this process
+async def dispose_database() -> None:
+
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+
+# Cache of bearer tokens whose login session was recently confirmed in the database, keyed on the token with the user_id and
+# the time of the confirmation as value
+# Entries expire after SESSION_CACHE_TTL_SECONDS and are not trusted once a later logout of the user is recorded in logout_cache
+session_cache: TTLCache = TTLCache(ttl_seconds=SESSION_CACHE_TTL_SECONDS)
+
+# Cache of the time of every user's last logout, shared by all workers with the Redis backend
+# Entries only need to outlive the sessions cached before the logout, so they expire after SESSION_CACHE_TTL_SECONDS too
+logout_cache: ICache = CacheFactory(urn=None).build(
+    name=SESSION_CACHE_BACKEND,
+    ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+    redis_url=REDIS_URL
+)
+
+# Cache of accounts with their balances read by the fetch APIs, written through by the APIs that change them
+# Entries expire after ACCOUNT_CACHE_TTL_SECONDS, which bounds how long another worker's memory cache can lag behind a write
+account_cache: ICache = CacheFactory(urn=None).build(
+    name=ACCOUNT_CACHE_BACKEND,
+    ttl_seconds=ACCOUNT_CACHE_TTL_SECONDS,
+    max_size=ACCOUNT_CACHE_MAX_SIZE,
+    redis_url=REDIS_URL
 )
 
-# Build another dictionary for CurrencyLK records with 'id' as the key
-currency_lk_global_context_by_id: dict = dictionary_utility.build_dictonary_with_key(
-    records=currency_lk_records,
-    key="id"
+# Pool hashing and verifying passwords, so that bcrypt never runs on the event loop
+# Its size caps the CPU spent on password hashing; logins and registrations beyond it wait for a free thread
+password_hashing_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASHING_MAX_WORKERS,
+    thread_name_prefix="password-hashing"
 )
-# Log the completion of registering CurrencyLK repository into the global context
-logger.info(f"Registered {CurrencyLKRepository.__name__} global context.")
 
 # Define a set of unprotected routes that do not require authentication
 unprotected_routes: set = {
     "/user/register",
-    "/user/login"
+    "/user/login",
+    "/metrics"
 }
 
-# Commit the session to save any pending changes to the database
-db_session.commit()
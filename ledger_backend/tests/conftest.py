@@ -0,0 +1,113 @@
+# Shared setup of the tests: the backend runs on a throwaway SQLite database with seeded currencies.
+# The backend reads config/db/config.json relative to the working directory and its settings from the environment when
+# start_utils is imported, so the database is prepared before the app is imported, once for the whole test session.
+# The configuration is loaded before switching back to the directory pytest was started in, which it keeps collecting from.
+# Tests share the database and keep apart by registering their own users and accounts.
+import asyncio
+import os
+import pytest
+import sqlite3
+import tempfile
+import ulid
+#
+from fastapi.testclient import TestClient
+from typing import Callable, Dict, Iterator
+#
+from scripts.benchmarks.sqlite_app import prepare
+
+INVOCATION_DIR: str = os.getcwd()
+DATABASE: str = prepare(work_dir=tempfile.mkdtemp(prefix="fintrack-tests-"))
+
+from app import app
+from start_utils import dispose_database, get_db_configuration
+
+get_db_configuration()
+os.chdir(INVOCATION_DIR)
+
+
+# Run the async tests on asyncio, the event loop the app runs on
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+# Close the pooled database connections once every test has run, whose threads would otherwise keep pytest from exiting
+@pytest.fixture(scope="session", autouse=True)
+def close_database() -> Iterator[None]:
+
+    yield
+    asyncio.run(dispose_database())
+
+
+# Client of the app, whose lifespan loads the currencies once for the whole session
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+
+    with TestClient(app) as client:
+        yield client
+
+
+# Connection to the test database, for checking what the APIs stored
+@pytest.fixture
+def database() -> Iterator[sqlite3.Connection]:
+
+    connection = sqlite3.connect(DATABASE)
+    yield connection
+    connection.close()
+
+
+# Fields every API request carries
+@pytest.fixture
+def base_payload() -> Dict[str, object]:
+    return {"reference_number": "1", "consent": True, "purpose": "test"}
+
+
+# Register and log in a new user, returning the headers of their requests
+@pytest.fixture
+def login(client: TestClient) -> Callable[[], Dict[str, str]]:
+
+    def login() -> Dict[str, str]:
+
+        email = f"{ulid.ulid().lower()}@example.com"
+        response = client.post("/user/register", json={"reference_number": "1", "email": email, "password": "password"})
+        assert response.status_code == 200, response.text
+
+        response = client.post("/user/login", json={"reference_number": "1", "email": email, "password": "password"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+    return login
+
+
+# Create an account of the logged in user, returning its URN
+@pytest.fixture
+def create_account(client: TestClient, base_payload: Dict[str, object]) -> Callable[..., str]:
+
+    def create_account(headers: Dict[str, str], currency_code: str = "USD") -> str:
+
+        response = client.post(
+            "/apis/create/account",
+            json={**base_payload, "account_name": ulid.ulid(), "currency_code": currency_code},
+            headers=headers
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["data"]["account_urn"]
+
+    return create_account
+
+
+# Transfer an amount between accounts, depositing it when there is no payer, returning the response data
+@pytest.fixture
+def transfer(client: TestClient, base_payload: Dict[str, object]) -> Callable[..., dict]:
+
+    def transfer(headers: Dict[str, str], payee_account_urn: str, amount: float, payer_account_urn: str = None) -> dict:
+
+        response = client.post(
+            "/apis/create/transaction",
+            json={**base_payload, "payee_account_urn": payee_account_urn, "payer_account_urn": payer_account_urn, "amount": amount},
+            headers=headers
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["data"]
+
+    return transfer
@@ -0,0 +1,128 @@
+# Tests of the account cache: the version guard of both backends, with Redis replaced by an in-process fake that runs the
+# Lua script, and the write-through of the services that change accounts, against the memory backend the tests run with.
+import fakeredis
+import pytest
+#
+from fastapi.testclient import TestClient
+from typing import Callable, Iterator
+#
+from abstractions.cache import ICache
+#
+from constants.cache_key import CacheKey
+#
+from start_utils import account_cache
+#
+from utilities.account_cache import AccountCacheUtility
+from utilities.cache import MemoryCache, RedisCache
+
+
+# Every cache backend, Redis served by an in-process fake
+@pytest.fixture(params=["memory", "redis"])
+def cache(request: pytest.FixtureRequest) -> Iterator[ICache]:
+
+    if request.param == "memory":
+        yield MemoryCache(ttl_seconds=60)
+        return
+
+    cache = RedisCache(url="redis://localhost:6379/0", ttl_seconds=60)
+    cache.client = fakeredis.FakeAsyncRedis()
+    yield cache
+
+
+@pytest.mark.anyio
+async def test_set_many_if_newer_keeps_the_newer_version(cache: ICache) -> None:
+
+    await cache.set_many_if_newer({"account:a": {"balances_version": 5, "total_balance": 50}}, version_field="balances_version")
+    await cache.set_many_if_newer(
+        {"account:a": {"balances_version": 3, "total_balance": 30}, "account:b": {"balances_version": 0, "total_balance": 0}},
+        version_field="balances_version"
+    )
+
+    assert await cache.get_many(["account:a", "account:b"]) == [
+        {"balances_version": 5, "total_balance": 50},
+        {"balances_version": 0, "total_balance": 0}
+    ]
+
+
+@pytest.mark.anyio
+async def test_set_many_if_newer_replaces_the_same_or_an_older_version(cache: ICache) -> None:
+
+    await cache.set_many_if_newer({"account:a": {"balances_version": 5, "total_balance": 50}}, version_field="balances_version")
+    await cache.set_many_if_newer({"account:a": {"balances_version": 5, "total_balance": 51}}, version_field="balances_version")
+    assert await cache.get("account:a") == {"balances_version": 5, "total_balance": 51}
+
+    await cache.set_many_if_newer({"account:a": {"balances_version": 7, "total_balance": 20}}, version_field="balances_version")
+    assert await cache.get("account:a") == {"balances_version": 7, "total_balance": 20}
+
+
+@pytest.mark.anyio
+async def test_redis_entries_expire() -> None:
+
+    cache = RedisCache(url="redis://localhost:6379/0", ttl_seconds=60)
+    cache.client = fakeredis.FakeAsyncRedis()
+
+    await cache.set_many_if_newer({"account:a": {"balances_version": 1}}, version_field="balances_version")
+    await cache.set_many({"account:b": {"balances_version": 1}})
+
+    assert 0 < await cache.client.ttl("fintrack:account:a") <= 60
+    assert 0 < await cache.client.ttl("fintrack:account:b") <= 60
+
+
+@pytest.mark.anyio
+async def test_a_stale_listing_does_not_replace_a_longer_one(cache: ICache) -> None:
+
+    account_cache_utility = AccountCacheUtility(cache=cache)
+    first = {"account_urn": "A1", "total_balance": 0, "balances_version": 0}
+    second = {"account_urn": "A2", "total_balance": 0, "balances_version": 0}
+
+    await account_cache_utility.set_accounts(accounts=[first, second], user_id=1)
+    await account_cache_utility.set_accounts(accounts=[first], user_id=1)
+
+    assert await account_cache_utility.get_user_accounts(user_id=1) == [first, second]
+
+
+@pytest.mark.anyio
+async def test_a_listing_with_an_expired_account_is_a_miss(cache: ICache) -> None:
+
+    account_cache_utility = AccountCacheUtility(cache=cache)
+    await account_cache_utility.set_accounts(accounts=[{"account_urn": "A1", "balances_version": 0}], user_id=1)
+    await cache.delete(CacheKey.ACCOUNT.format(account_urn="A1"))
+
+    assert await account_cache_utility.get_user_accounts(user_id=1) is None
+
+
+@pytest.mark.anyio
+async def test_transfers_write_balances_through(client: TestClient, base_payload: dict, login: Callable, create_account: Callable, transfer: Callable) -> None:
+
+    headers = login()
+    payer_account_urn = create_account(headers=headers)
+    payee_account_urn = create_account(headers=headers)
+    transfer(headers=headers, payee_account_urn=payer_account_urn, amount=100)
+    transfer(headers=headers, payee_account_urn=payee_account_urn, payer_account_urn=payer_account_urn, amount=30)
+
+    payer = account_cache.entries.get(CacheKey.ACCOUNT.format(account_urn=payer_account_urn))
+    payee = account_cache.entries.get(CacheKey.ACCOUNT.format(account_urn=payee_account_urn))
+    assert (payer["total_balance"], payer["balances_version"]) == (7000, 13000)
+    assert (payee["total_balance"], payee["balances_version"]) == (3000, 3000)
+
+    # A copy read from the database between the two transfers cannot replace the balance the second one wrote through
+    await AccountCacheUtility(cache=account_cache).set_accounts(accounts=[{**payer, "total_balance": 10000, "balances_version": 10000}])
+
+    response = client.post("/apis/fetch/account", json={**base_payload, "account_urn": payer_account_urn}, headers=headers)
+    assert response.json()["data"]["balances"]["total_balance"] == 70
+
+
+@pytest.mark.anyio
+async def test_account_creation_writes_the_listing_through(client: TestClient, database, login: Callable, create_account: Callable) -> None:
+
+    headers = login()
+    first_account_urn = create_account(headers=headers)
+    first = account_cache.entries.get(CacheKey.ACCOUNT.format(account_urn=first_account_urn))
+    second_account_urn = create_account(headers=headers)
+    user_id = database.execute("SELECT user_id FROM account WHERE urn = ?", (first_account_urn,)).fetchone()[0]
+
+    # A listing read by a concurrent request before the second account was committed cannot replace the one written after it
+    await AccountCacheUtility(cache=account_cache).set_accounts(accounts=[first], user_id=user_id)
+
+    response = client.get("/apis/fetch/usr-account", headers=headers)
+    assert [account["account_urn"] for account in response.json()["data"]["accounts"]] == [first_account_urn, second_account_urn]
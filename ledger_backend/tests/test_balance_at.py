@@ -0,0 +1,127 @@
+# Tests of /apis/fetch/balance-at, over each way the balance can be rebuilt: from nothing, from the closing balance of an
+# earlier day's rollup, and from a balance checkpoint, and of the day boundary the rollups and the replay must agree on.
+import pytest
+import services.apis.create.transaction
+#
+from datetime import datetime
+from fastapi.testclient import TestClient
+from typing import Callable, Dict
+
+
+# Make transfers created from now on carry the given creation time
+def freeze_transfer_time(monkeypatch: pytest.MonkeyPatch, now: datetime) -> None:
+
+    class FrozenDatetime(datetime):
+
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(services.apis.create.transaction, "datetime", FrozenDatetime)
+
+
+# Fetch the balance of an account at an instant, returning the response data
+def fetch_balance_at(client: TestClient, base_payload: dict, headers: Dict[str, str], account_urn: str, timestamp: datetime) -> dict:
+
+    response = client.post(
+        "/apis/fetch/balance-at",
+        json={**base_payload, "account_urn": account_urn, "timestamp": timestamp.isoformat()},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def test_balance_before_any_transaction_is_zero(client: TestClient, base_payload: dict, login: Callable, create_account: Callable, transfer: Callable) -> None:
+
+    headers = login()
+    account_urn = create_account(headers=headers)
+    transfer(headers=headers, payee_account_urn=account_urn, amount=10)
+
+    data = fetch_balance_at(client, base_payload, headers, account_urn, datetime(2000, 1, 1))
+
+    assert data["balance"] == 0
+    assert data["checkpoint_on"] is None
+    assert data["replayed_transaction_count"] == 0
+
+
+def test_transfer_just_before_midnight_is_counted_once(
+    monkeypatch: pytest.MonkeyPatch, client: TestClient, base_payload: dict, database, login: Callable, create_account: Callable, transfer: Callable
+) -> None:
+
+    headers = login()
+    payer_account_urn = create_account(headers=headers)
+    payee_account_urn = create_account(headers=headers)
+
+    freeze_transfer_time(monkeypatch, datetime(2024, 3, 10, 12, 0, 0))
+    transfer(headers=headers, payee_account_urn=payer_account_urn, amount=100)
+    freeze_transfer_time(monkeypatch, datetime(2024, 3, 10, 23, 59, 59, 700000))
+    transfer(headers=headers, payee_account_urn=payee_account_urn, payer_account_urn=payer_account_urn, amount=30)
+    freeze_transfer_time(monkeypatch, datetime(2024, 3, 11, 10, 0, 0))
+    transfer(headers=headers, payee_account_urn=payee_account_urn, payer_account_urn=payer_account_urn, amount=10)
+
+    # The transfer is stored in whole seconds, on the day its rollup counts it in
+    created_on, day = database.execute(
+        'SELECT "transaction".created_on, account_daily_rollup.day FROM "transaction" '
+        'JOIN account_daily_rollup ON account_daily_rollup.account_id = "transaction".payer_account_id '
+        'WHERE "transaction".payer_account_urn = ? ORDER BY "transaction".id LIMIT 1',
+        (payer_account_urn,)
+    ).fetchone()
+    assert created_on == "2024-03-10 23:59:59.000000"
+    assert day == "2024-03-10"
+
+    # Before the transfer, the balance is replayed from the start of the account
+    data = fetch_balance_at(client, base_payload, headers, payer_account_urn, datetime(2024, 3, 10, 23, 59, 58))
+    assert data["balance"] == 100
+    assert data["replayed_transaction_count"] == 1
+
+    # After midnight, the balance starts from the closing balance of the 10th and replays nothing of that day again
+    data = fetch_balance_at(client, base_payload, headers, payer_account_urn, datetime(2024, 3, 11, 0, 0, 5))
+    assert data["balance"] == 70
+    assert data["checkpoint_on"] == "2024-03-11 00:00:00"
+    assert data["replayed_transaction_count"] == 0
+
+    data = fetch_balance_at(client, base_payload, headers, payer_account_urn, datetime(2024, 3, 11, 12, 0, 0))
+    assert data["balance"] == 60
+    assert data["replayed_transaction_count"] == 1
+
+    data = fetch_balance_at(client, base_payload, headers, payee_account_urn, datetime(2024, 3, 11, 12, 0, 0))
+    assert data["balance"] == 40
+
+
+def test_balance_starts_from_the_latest_checkpoint(
+    monkeypatch: pytest.MonkeyPatch, client: TestClient, base_payload: dict, login: Callable, create_account: Callable, transfer: Callable
+) -> None:
+
+    monkeypatch.setattr(services.apis.create.transaction, "BALANCE_CHECKPOINT_INTERVAL", 2)
+
+    headers = login()
+    account_urn = create_account(headers=headers)
+    for second in range(5):
+        freeze_transfer_time(monkeypatch, datetime(2024, 4, 2, 10, 0, second))
+        transfer(headers=headers, payee_account_urn=account_urn, amount=1)
+
+    # Checkpoints follow the 2nd and 4th transfers of the day
+    data = fetch_balance_at(client, base_payload, headers, account_urn, datetime(2024, 4, 2, 10, 0, 2))
+    assert data["balance"] == 3
+    assert data["checkpoint_on"] == "2024-04-02 10:00:01"
+    assert data["replayed_transaction_count"] == 1
+
+    data = fetch_balance_at(client, base_payload, headers, account_urn, datetime(2024, 4, 2, 10, 0, 4))
+    assert data["balance"] == 5
+    assert data["checkpoint_on"] == "2024-04-02 10:00:03"
+    assert data["replayed_transaction_count"] == 1
+
+
+def test_balance_of_another_users_account_is_not_found(client: TestClient, base_payload: dict, login: Callable, create_account: Callable) -> None:
+
+    account_urn = create_account(headers=login())
+
+    response = client.post(
+        "/apis/fetch/balance-at",
+        json={**base_payload, "account_urn": account_urn, "timestamp": "2024-01-01T00:00:00"},
+        headers=login()
+    )
+
+    assert response.status_code == 400
+    assert response.json()["response_key"] == "error_account_not_found"
@@ -0,0 +1,81 @@
+# Test of how long importing the app takes, and that importing it does not touch the database.
+# The app is imported in a fresh interpreter, so nothing is already loaded, with a configuration pointing at a
+# database that cannot be opened: any connection made at import fails the import. After the import the engine
+# accessors are checked to not have built an engine yet, and the best of several runs is compared against the budget.
+import json
+import os
+import subprocess
+import sys
+#
+from pathlib import Path
+
+# Root of the backend package, one level above this folder
+BACKEND_DIR: Path = Path(__file__).resolve().parents[1]
+
+# Longest the best import may take, and how many imports are measured
+IMPORT_BUDGET_MS: float = 1500
+IMPORT_RUNS: int = 3
+
+# Imports the app and prints the import time and how many engines the accessors have built
+IMPORT_SCRIPT: str = """
+import json
+import time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+from start_utils import get_async_engine, get_engine
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "engines": get_engine.cache_info().currsize + get_async_engine.cache_info().currsize
+}))
+"""
+
+
+# Write a configuration whose database cannot be opened into work_dir
+def write_unreachable_config(work_dir: Path) -> None:
+
+    os.makedirs(work_dir / "config" / "db", exist_ok=True)
+    with open(work_dir / "config" / "db" / "config.json", "w") as file:
+        json.dump(
+            {
+                "dialect": "sqlite",
+                "driver": "pysqlite",
+                "async_driver": "aiosqlite",
+                "database": str(work_dir / "missing" / "fintrack.db"),
+            },
+            file
+        )
+
+
+# Import the app once in a fresh interpreter and return what it reported
+def measure_import(work_dir: Path) -> dict:
+
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = str(BACKEND_DIR)
+    environment["PYTHONDONTWRITEBYTECODE"] = "1"
+    environment.setdefault("SECRET_KEY", "import-time-secret")
+    environment.setdefault("ALGORITHM", "HS256")
+    environment.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=work_dir,
+        env=environment,
+        capture_output=True,
+        text=True
+    )
+    assert completed.returncode == 0, f"Importing the app failed; it must not need a database\n{completed.stderr}"
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_app_is_fast_and_does_not_connect(tmp_path: Path) -> None:
+
+    write_unreachable_config(work_dir=tmp_path)
+
+    results = [measure_import(work_dir=tmp_path) for _ in range(IMPORT_RUNS)]
+
+    assert not any(result["engines"] for result in results), "Importing the app built a database engine"
+
+    best_import_ms = min(result["import_ms"] for result in results)
+    assert best_import_ms <= IMPORT_BUDGET_MS, f"Importing the app took {best_import_ms:.0f} ms, over the budget of {IMPORT_BUDGET_MS:.0f} ms"
@@ -0,0 +1,96 @@
+# Tests of logout against the login sessions cached by the authentication middleware, with the logout cache kept in an
+# in-process fake of Redis, the backend that shares logouts between workers.
+import fakeredis
+import pytest
+import ulid
+#
+from fastapi.testclient import TestClient
+from typing import Dict
+#
+from start_utils import session_cache
+#
+from utilities.cache import RedisCache
+from utilities.session_cache import SessionCacheUtility
+
+
+# Logout cache shared by the middleware and the logout service, Redis served by an in-process fake
+@pytest.fixture
+def logout_cache(monkeypatch: pytest.MonkeyPatch) -> RedisCache:
+
+    cache = RedisCache(url="redis://localhost:6379/0", ttl_seconds=60)
+    cache.client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr("middlewares.authetication.logout_cache", cache)
+    monkeypatch.setattr("services.user.logout.logout_cache", cache)
+    return cache
+
+
+# Log the user in, returning the headers of their requests
+def login(client: TestClient, email: str) -> Dict[str, str]:
+
+    response = client.post("/user/login", json={"reference_number": "1", "email": email, "password": "password"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+
+# Create an account with the headers, returning the HTTP status of the response
+def create_account(client: TestClient, base_payload: Dict[str, object], headers: Dict[str, str]) -> int:
+
+    response = client.post(
+        "/apis/create/account",
+        json={**base_payload, "account_name": ulid.ulid(), "currency_code": "USD"},
+        headers=headers
+    )
+    return response.status_code
+
+
+# The cached session is left in place, as it is in the other workers, and rejected because of the recorded logout
+def test_logout_rejects_the_cached_session(
+    client: TestClient,
+    base_payload: Dict[str, object],
+    logout_cache: RedisCache
+) -> None:
+
+    email = f"{ulid.ulid().lower()}@example.com"
+    response = client.post("/user/register", json={"reference_number": "1", "email": email, "password": "password"})
+    assert response.status_code == 200, response.text
+
+    headers = login(client, email)
+    assert create_account(client, base_payload, headers) == 200
+    token = headers["Authorization"].split(" ")[1]
+    assert session_cache.get(token) is not None
+
+    response = client.post("/user/logout", json={"reference_number": "1"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert session_cache.get(token) is not None
+    assert create_account(client, base_payload, headers) == 401
+
+    # A session confirmed after the logout is trusted again
+    headers = login(client, email)
+    assert create_account(client, base_payload, headers) == 200
+    assert create_account(client, base_payload, headers) == 200
+
+
+@pytest.mark.anyio
+async def test_is_session_current_compares_with_the_last_logout(logout_cache: RedisCache) -> None:
+
+    worker = SessionCacheUtility(cache=logout_cache)
+    other_worker = SessionCacheUtility(cache=logout_cache)
+
+    confirmed_on = worker.now()
+    assert await worker.is_session_current(user_id=1, confirmed_on=confirmed_on)
+
+    await other_worker.set_logged_out(user_id=1)
+    assert not await worker.is_session_current(user_id=1, confirmed_on=confirmed_on)
+    assert await worker.is_session_current(user_id=1, confirmed_on=worker.now())
+    assert await worker.is_session_current(user_id=2, confirmed_on=confirmed_on)
+
+
+@pytest.mark.anyio
+async def test_is_session_current_checks_the_database_when_the_cache_fails(logout_cache: RedisCache) -> None:
+
+    async def fail(*args, **kwargs) -> None:
+        raise ConnectionError("Redis is down")
+
+    logout_cache.client.get = fail
+    assert not await SessionCacheUtility(cache=logout_cache).is_session_current(user_id=1, confirmed_on=0)
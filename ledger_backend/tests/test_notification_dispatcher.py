@@ -0,0 +1,172 @@
+# Tests of the notification dispatcher against a stub transport: delivery, retries, connection failures, leases, and
+# concurrent dispatchers on the SQLite database, which has no row locks to keep them apart.
+import asyncio
+import pytest
+import sqlite3
+import ulid
+#
+from contextlib import closing
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List
+#
+from abstractions.email_transport import IEmailTransport
+#
+from workers.notification_dispatcher import NotificationDispatcher
+
+
+# Transport recording the messages it is asked to send, failing to connect or to send when told to
+class StubEmailTransport(IEmailTransport):
+
+    def __init__(self, connect_error: Exception = None, send_error: Exception = None) -> None:
+        super().__init__()
+        self.connect_error = connect_error
+        self.send_error = send_error
+        self.open_count = 0
+        self.sent: List[str] = []
+        self.statuses_while_sending: List[str] = []
+        self.database_path: str = None
+
+    def open(self) -> None:
+        self.open_count += 1
+        if self.connect_error:
+            raise self.connect_error
+
+    # Messages are sent from a worker thread, so the outbox is read over a connection of that thread
+    def send(self, message: EmailMessage) -> None:
+        if self.database_path:
+            with closing(sqlite3.connect(self.database_path)) as database:
+                self.statuses_while_sending.append(
+                    database.execute("SELECT status FROM notification_outbox WHERE subject = ?", (message["Subject"],)).fetchone()[0]
+                )
+        if self.send_error:
+            raise self.send_error
+        self.sent.append(message["Subject"])
+
+
+# Format a time as SQLAlchemy stores it in SQLite
+def to_sqlite(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+# Start every test from an empty outbox, without the notifications queued by the other tests
+@pytest.fixture(autouse=True)
+def empty_outbox(database: sqlite3.Connection) -> None:
+
+    database.execute("DELETE FROM notification_outbox")
+    database.commit()
+
+
+# Queue notifications directly in the outbox, returning their subjects
+def queue(database: sqlite3.Connection, count: int, status: str = "PENDING", next_attempt_on: datetime = None, attempts: int = 0) -> List[str]:
+
+    subjects = [f"Subject {ulid.ulid()}" for _ in range(count)]
+    database.executemany(
+        "INSERT INTO notification_outbox (urn, recipient_email, subject, body, status, attempts, next_attempt_on, created_on) "
+        "VALUES (?, 'user@example.com', ?, 'body', ?, ?, ?, ?)",
+        [
+            (ulid.ulid(), subject, status, attempts, to_sqlite(next_attempt_on or datetime.now() - timedelta(seconds=1)), to_sqlite(datetime.now()))
+            for subject in subjects
+        ]
+    )
+    database.commit()
+    return subjects
+
+
+# Return the status, attempts and claim of every notification by subject
+def outbox(database: sqlite3.Connection) -> dict:
+    return {
+        subject: (status, attempts, claim_urn)
+        for subject, status, attempts, claim_urn in database.execute("SELECT subject, status, attempts, claim_urn FROM notification_outbox")
+    }
+
+
+@pytest.mark.anyio
+async def test_a_batch_is_sent_outside_of_its_claim(database: sqlite3.Connection) -> None:
+
+    subjects = queue(database, count=3)
+    transport = StubEmailTransport()
+    transport.database_path = database.execute("PRAGMA database_list").fetchone()[2]
+
+    assert await NotificationDispatcher(transport=transport).dispatch_batch() == 3
+
+    # The claim was committed before sending, so another connection saw the batch as SENDING
+    assert transport.statuses_while_sending == ["SENDING"] * 3
+    assert sorted(transport.sent) == sorted(subjects)
+    assert outbox(database) == {subject: ("SENT", 1, None) for subject in subjects}
+
+
+@pytest.mark.anyio
+async def test_failed_deliveries_are_retried_until_the_attempts_run_out(database: sqlite3.Connection) -> None:
+
+    subjects = queue(database, count=2)
+    dispatcher = NotificationDispatcher(transport=StubEmailTransport(send_error=OSError("rejected")), retry_backoff_seconds=0, max_attempts=2)
+
+    assert await dispatcher.dispatch_batch() == 2
+    assert outbox(database) == {subject: ("PENDING", 1, None) for subject in subjects}
+    assert {error for error, in database.execute("SELECT last_error FROM notification_outbox")} == {"OSError: rejected"}
+
+    assert await dispatcher.dispatch_batch() == 2
+    assert outbox(database) == {subject: ("FAILED", 2, None) for subject in subjects}
+
+    assert await dispatcher.dispatch_batch() == 0
+
+
+@pytest.mark.anyio
+async def test_retries_wait_for_their_backoff(database: sqlite3.Connection) -> None:
+
+    queue(database, count=1)
+    dispatcher = NotificationDispatcher(transport=StubEmailTransport(send_error=OSError("rejected")), retry_backoff_seconds=60)
+
+    assert await dispatcher.dispatch_batch() == 1
+    assert await dispatcher.dispatch_batch() == 0
+
+
+@pytest.mark.anyio
+async def test_a_connection_failure_fails_the_batch_without_reconnecting(database: sqlite3.Connection) -> None:
+
+    subjects = queue(database, count=4)
+    transport = StubEmailTransport(connect_error=ConnectionRefusedError("no server"))
+
+    assert await NotificationDispatcher(transport=transport, retry_backoff_seconds=0).dispatch_batch() == 4
+
+    assert transport.open_count == 1
+    assert outbox(database) == {subject: ("PENDING", 1, None) for subject in subjects}
+    assert {error for error, in database.execute("SELECT last_error FROM notification_outbox")} == {"ConnectionRefusedError: no server"}
+
+
+@pytest.mark.anyio
+async def test_only_expired_leases_are_claimed_again(database: sqlite3.Connection) -> None:
+
+    expired = queue(database, count=1, status="SENDING", next_attempt_on=datetime.now() - timedelta(minutes=1))
+    leased = queue(database, count=1, status="SENDING", next_attempt_on=datetime.now() + timedelta(minutes=5))
+    transport = StubEmailTransport()
+
+    assert await NotificationDispatcher(transport=transport).dispatch_batch() == 1
+
+    assert transport.sent == expired
+    assert outbox(database)[expired[0]] == ("SENT", 1, None)
+    assert outbox(database)[leased[0]][0] == "SENDING"
+
+
+@pytest.mark.anyio
+async def test_concurrent_dispatchers_send_every_notification_once(database: sqlite3.Connection) -> None:
+
+    subjects = queue(database, count=12)
+    transports = [StubEmailTransport() for _ in range(4)]
+    dispatchers = [NotificationDispatcher(transport=transport, batch_size=3) for transport in transports]
+
+    # Dispatch until the outbox is drained; a dispatcher losing a race on the SQLite write lock simply tries again
+    async def drain(dispatcher: NotificationDispatcher) -> None:
+        for _ in range(20):
+            try:
+                if not await dispatcher.dispatch_batch():
+                    return
+            except Exception:
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(*[drain(dispatcher) for dispatcher in dispatchers])
+
+    sent = [subject for transport in transports for subject in transport.sent]
+    assert sorted(sent) == sorted(subjects)
+    assert outbox(database) == {subject: ("SENT", 1, None) for subject in subjects}
@@ -0,0 +1,77 @@
+from typing import Iterable, List, Mapping, Optional
+#
+from abstractions.cache import ICache
+from abstractions.utility import IUtility
+#
+from constants.cache_key import CacheKey
+
+
+# AccountCacheUtility reads and writes accounts with their balances in the account cache.
+# Every account is stored once under its URN, and a user's account listing only stores the account URNs,
+# so a balance written through after a transfer is seen by both the account and the account listing reads.
+# Every cached account carries its balances version, the sum of its total credits and debits, which grows with every transfer.
+# Writes never replace a cached account with an older version, so a database read racing a transfer cannot overwrite the
+# balance the transfer wrote through, in this worker or, with the Redis backend, in any other.
+# Accounts are never removed, so a listing is versioned by its number of accounts and a listing read before an account was
+# created cannot replace the one written after it either.
+# A failing cache backend never fails a request: reads fall back to the database and failed writes are only logged.
+class AccountCacheUtility(IUtility):
+
+    # Initialize the utility with the shared cache backend and the request context used for logging.
+    def __init__(self, cache: ICache, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
+        super().__init__(urn, user_urn, api_name)
+        self.cache = cache
+
+    # Return the cached account with its balances, or None on a cache miss.
+    async def get_account(self, account_urn: str) -> Optional[dict]:
+
+        try:
+            return await self.cache.get(CacheKey.ACCOUNT.format(account_urn=account_urn))
+
+        except Exception as err:
+            self.logger.warning(f"{err.__class__} occurred while reading the account cache, {err}")
+            return None
+
+    # Return the cached accounts of a user with their balances, or None if the listing or any of its accounts is missing.
+    async def get_user_accounts(self, user_id: int) -> Optional[List[dict]]:
+
+        try:
+            listing = await self.cache.get(CacheKey.USER_ACCOUNTS.format(user_id=user_id))
+            if listing is None:
+                return None
+
+            accounts = await self.cache.get_many(
+                [CacheKey.ACCOUNT.format(account_urn=account_urn) for account_urn in listing["account_urns"]]
+            )
+            if any(account is None for account in accounts):
+                return None
+
+            return accounts
+
+        except Exception as err:
+            self.logger.warning(f"{err.__class__} occurred while reading the account cache, {err}")
+            return None
+
+    # Store the accounts with their balances, replacing every cached copy with an older balances version.
+    # When a user id is given, the accounts are also stored as the complete account listing of that user, unless a listing
+    # with more accounts is cached.
+    async def set_accounts(self, accounts: Iterable[Mapping], user_id: int = None) -> None:
+
+        accounts = [dict(account) for account in accounts]
+
+        try:
+            await self.cache.set_many_if_newer(
+                {CacheKey.ACCOUNT.format(account_urn=account["account_urn"]): account for account in accounts},
+                version_field="balances_version"
+            )
+            if user_id is not None:
+                await self.cache.set_many_if_newer(
+                    {CacheKey.USER_ACCOUNTS.format(user_id=user_id): {
+                        "account_urns": [account["account_urn"] for account in accounts],
+                        "listing_version": len(accounts)
+                    }},
+                    version_field="listing_version"
+                )
+
+        except Exception as err:
+            self.logger.warning(f"{err.__class__} occurred while writing the account cache, {err}")
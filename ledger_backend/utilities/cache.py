@@ -0,0 +1,102 @@
+import json
+#
+from redis import asyncio as redis
+from typing import Any, Dict, List, Optional
+#
+from abstractions.cache import ICache
+#
+from utilities.ttl_cache import TTLCache
+
+# Lua script storing every key with the JSON value at ARGV[1 + 2i] and the expiry in ARGV[1], unless the JSON value already
+# stored holds a higher number than ARGV[2 + 2i] under the field named by ARGV[2]
+SET_IF_NEWER_SCRIPT: str = """
+for index, key in ipairs(KEYS) do
+    local value = ARGV[1 + 2 * index]
+    local version = tonumber(ARGV[2 + 2 * index])
+    local cached = redis.call('GET', key)
+    local cached_version = cached and tonumber(cjson.decode(cached)[ARGV[2]]) or nil
+    if cached_version == nil or cached_version <= version then
+        redis.call('SET', key, value, 'EX', ARGV[1])
+    end
+end
+return 1
+"""
+
+
+# MemoryCache keeps the entries in the worker process, in a least recently used cache with a time-to-live.
+# Entries are not shared between workers, so a write made by one worker is only seen by the others once their entry expires.
+class MemoryCache(ICache):
+
+    # Initialize the cache with the time-to-live of an entry in seconds and the maximum number of entries kept.
+    def __init__(self, ttl_seconds: float, max_size: int = 100000, urn: str = None) -> None:
+        super().__init__(urn)
+        self.entries = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return [self.entries.get(key) for key in keys]
+
+    async def set_many(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            self.entries.set(key, value)
+
+    # Each comparison and write runs without awaiting, so no other request of the worker can write in between.
+    async def set_many_if_newer(self, values: Dict[str, dict], version_field: str) -> None:
+        for key, value in values.items():
+            cached = self.entries.get(key)
+            if cached is None or cached.get(version_field, 0) <= value[version_field]:
+                self.entries.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.entries.delete(key)
+
+
+# RedisCache keeps the entries in a Redis server shared by all workers, encoded as JSON under a common key prefix.
+# Any server speaking the Redis protocol can be used, which is what lets a local fake stand in for it.
+class RedisCache(ICache):
+
+    # Initialize the cache with the Redis URL, the time-to-live of an entry in seconds and the prefix of its keys.
+    # The connection pool is opened lazily by the client on the first command.
+    def __init__(self, url: str, ttl_seconds: float, key_prefix: str = "fintrack:", urn: str = None) -> None:
+        super().__init__(urn)
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = int(ttl_seconds)
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.client.get(self.key_prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+
+        values = await self.client.mget([self.key_prefix + key for key in keys])
+        return [json.loads(value) if value is not None else None for value in values]
+
+    # Store all the values in one round-trip, each with its own expiry.
+    async def set_many(self, values: Dict[str, Any]) -> None:
+        async with self.client.pipeline(transaction=False) as pipeline:
+            for key, value in values.items():
+                pipeline.set(self.key_prefix + key, json.dumps(value), ex=self.ttl_seconds)
+            await pipeline.execute()
+
+    # Compare and store all the values in one round-trip with a Lua script, which Redis runs atomically.
+    async def set_many_if_newer(self, values: Dict[str, dict], version_field: str) -> None:
+        if not values:
+            return
+
+        arguments = [self.ttl_seconds, version_field]
+        for value in values.values():
+            arguments += [json.dumps(value), value[version_field]]
+        await self.client.eval(SET_IF_NEWER_SCRIPT, len(values), *[self.key_prefix + key for key in values], *arguments)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*[self.key_prefix + key for key in keys])
+
+    async def close(self) -> None:
+        await self.client.aclose()
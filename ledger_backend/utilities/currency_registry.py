@@ -0,0 +1,86 @@
+import asyncio
+#
+from types import MappingProxyType
+from typing import Callable
+from sqlalchemy.ext.asyncio import async_sessionmaker
+#
+from abstractions.utility import IUtility
+#
+from dtos.currency_snapshot import CurrencySnapshotDTO
+#
+from repositories.currency_lk import AsyncCurrencyLKRepository
+#
+from utilities.dictionary import DictionaryUtility
+
+
+# CurrencyRegistry holds the currencies of the lookup table in memory for the whole worker.
+# Readers take the current snapshot and look currencies up in its dictionaries, without locks or database queries.
+# The snapshot is copy-on-write: a refresh loads the table into new dictionaries and then swaps the snapshot reference,
+# so a reader holding a snapshot always sees one consistent version of the table.
+# A background task checks the table version every refresh interval and only reloads the records when it changed,
+# so currencies added to the table are picked up by every worker without a restart.
+class CurrencyRegistry(IUtility):
+
+    # Initialize the registry with an empty snapshot, the accessor of the session factory and the refresh interval.
+    def __init__(self, session_factory: Callable[[], async_sessionmaker], refresh_interval_seconds: float, urn: str = None) -> None:
+        super().__init__(urn)
+        self.session_factory = session_factory
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.dictionary_utility = DictionaryUtility(urn=urn)
+        self.snapshot: CurrencySnapshotDTO = CurrencySnapshotDTO()
+        self.stop_event: asyncio.Event = None
+        self.task: asyncio.Task = None
+
+    # Reload the currencies if the table changed since the current snapshot; returns whether a new snapshot was installed.
+    # The version is read before the records, so the records are at least as new as the version they are stored with.
+    async def refresh(self) -> bool:
+
+        async with self.session_factory()() as session:
+
+            currency_lk_repository = AsyncCurrencyLKRepository(urn=self.urn, session=session)
+            version = await currency_lk_repository.retrieve_version()
+            if version == self.snapshot.version:
+                return False
+
+            currency_lk_records = await currency_lk_repository.retrieve_all_records()
+
+        self.snapshot = CurrencySnapshotDTO(
+            version=version,
+            by_id=MappingProxyType(self.dictionary_utility.build_dictonary_with_key(records=currency_lk_records, key="id")),
+            by_name=MappingProxyType(self.dictionary_utility.build_dictonary_with_key(records=currency_lk_records, key="name"))
+        )
+        self.logger.info(f"Loaded {len(currency_lk_records)} currencies")
+        return True
+
+    # Start the refresh loop as a background task of the running event loop
+    def start(self) -> None:
+
+        self.logger.info("Starting currency registry refresh")
+        self.stop_event = asyncio.Event()
+        self.task = asyncio.create_task(self.run_forever())
+
+    # Stop the refresh loop
+    async def stop(self) -> None:
+
+        self.logger.info("Stopping currency registry refresh")
+        if self.task:
+            self.stop_event.set()
+            await self.task
+            self.task = None
+
+    # Refresh the snapshot every refresh interval until stopped, keeping the current snapshot when a refresh fails
+    async def run_forever(self) -> None:
+
+        while not self.stop_event.is_set():
+
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=self.refresh_interval_seconds)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.refresh()
+
+            except Exception as err:
+                self.logger.error(f"{err.__class__} error occurred while refreshing currencies: {err}")
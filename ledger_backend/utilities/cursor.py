@@ -0,0 +1,38 @@
+import base64
+import json
+#
+from datetime import datetime
+from typing import Tuple
+#
+from abstractions.utility import IUtility
+
+
+# CursorUtility encodes and decodes the opaque cursors used for keyset pagination.
+# A cursor carries the (created_on, id) of the last row of a page so that the next page can continue strictly after it.
+class CursorUtility(IUtility):
+
+    # Initialize the utility with a unique request identifier (URN).
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+
+    # Encode the position of the last returned row into a URL-safe cursor string.
+    def encode(self, created_on: datetime, id: int) -> str:
+
+        payload: dict = {
+            "created_on": created_on.isoformat(),
+            "id": id
+        }
+
+        return base64.urlsafe_b64encode(json.dumps(payload).encode("utf8")).decode("utf8")
+
+    # Decode a cursor string back into the (created_on, id) position it was built from.
+    # Raises ValueError if the cursor was not produced by encode.
+    def decode(self, cursor: str) -> Tuple[datetime, int]:
+
+        try:
+            payload: dict = json.loads(base64.urlsafe_b64decode(cursor.encode("utf8")))
+            return datetime.fromisoformat(payload["created_on"]), int(payload["id"])
+
+        except (TypeError, KeyError, json.JSONDecodeError, UnicodeDecodeError) as err:
+            raise ValueError(f"Invalid cursor: {err}")
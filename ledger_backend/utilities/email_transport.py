@@ -0,0 +1,87 @@
+import smtplib
+#
+from email.message import EmailMessage
+#
+from abstractions.email_transport import IEmailTransport
+
+
+# SMTPEmailTransport delivers emails through an SMTP server over a single connection that is reused between messages.
+# The connection is opened on the first message and reopened once if the server has dropped it in the meantime.
+class SMTPEmailTransport(IEmailTransport):
+
+    # Initialize the transport with the SMTP server address and credentials.
+    # Without a password no login is attempted, which is what a local SMTP stub expects.
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_tls: bool = True,
+        user_name: str = None,
+        password: str = None,
+        timeout: float = 30,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.user_name = user_name
+        self.password = password
+        self.timeout = timeout
+        self.connection: smtplib.SMTP = None
+
+    # Open a connection to the SMTP server, upgrading it to TLS and logging in when configured.
+    def connect(self) -> smtplib.SMTP:
+
+        self.logger.debug(f"Connecting to SMTP server {self.host}:{self.port}")
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.user_name and self.password:
+            connection.login(self.user_name, self.password)
+        self.logger.debug(f"Connected to SMTP server {self.host}:{self.port}")
+
+        return connection
+
+    # Open the connection to the SMTP server unless it is already open.
+    def open(self) -> None:
+
+        if not self.connection:
+            self.connection = self.connect()
+
+    # Send the message over the open connection, reconnecting once if the server closed it.
+    def send(self, message: EmailMessage) -> None:
+
+        if not self.connection:
+            self.connection = self.connect()
+
+        try:
+            self.connection.send_message(message)
+
+        except smtplib.SMTPServerDisconnected:
+            self.logger.debug("SMTP connection was closed by the server, reconnecting")
+            self.connection = self.connect()
+            self.connection.send_message(message)
+
+    # Close the connection to the SMTP server.
+    def close(self) -> None:
+
+        if not self.connection:
+            return
+
+        try:
+            self.connection.quit()
+
+        except smtplib.SMTPException as err:
+            self.logger.debug(f"Failed to close SMTP connection: {err}")
+
+        self.connection = None
+
+
+# LogEmailTransport only writes the emails to the log, for development setups without an SMTP server.
+class LogEmailTransport(IEmailTransport):
+
+    # Log the recipient, subject and body of the message.
+    def send(self, message: EmailMessage) -> None:
+
+        self.logger.info(f"Email to {message['To']}: {message['Subject']}\n{message.get_content()}")
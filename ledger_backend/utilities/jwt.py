@@ -46,14 +46,11 @@ class JWTUtility(IUtility):
     def decode_token(self, token: str) -> Union[Dict[str, str]]:
         try:
 
-            # Log the token, secret key, and algorithm for debugging purposes.
-            print(token, SECRET_KEY, ALGORITHM)
-
             # Decode the token using the secret key and the specified algorithm.
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             return payload
         
         except PyJWTError as err:
             # Log and re-raise the error if token decoding fails.
-            print(err)
+            self.logger.debug(f"Failed to decode token: {err}")
             raise err
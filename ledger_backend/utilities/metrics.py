@@ -0,0 +1,215 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+#
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+#
+from constants.metric import Metric
+
+# Upper bounds in seconds of the latency histogram buckets, from sub-millisecond cache hits to slow requests
+LATENCY_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the histogram buckets of the number of queries run by a request
+QUERY_COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+# Number of queries run by the request being handled, set by MetricsMiddleware and counted by the engine event hook
+# The value is a one-element list so that the hook can increment it in place from any nested context
+request_query_count: ContextVar[Optional[List[int]]] = ContextVar("request_query_count", default=None)
+
+
+# Escape a label value as required by the Prometheus text format
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Format the labels of a sample, with an optional extra label such as the upper bound of a histogram bucket
+def format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+
+    labels = [f'{name}="{escape_label_value(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+# Counter is a monotonically increasing value per combination of label values.
+class Counter:
+
+    # Initialize the counter with its name, help text and label names.
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.lock = threading.Lock()  # Guards the values when the counter is also updated from worker threads.
+
+    # Add the amount to the counter of the given label values.
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    # Render the counter in Prometheus text format.
+    def render(self) -> List[str]:
+
+        with self.lock:
+            values = sorted(self.values.items())
+
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_values, value in values:
+            lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+# Histogram counts observations into fixed buckets per combination of label values, with their sum and count.
+# An observation is one bisect and two additions, so it can be recorded on every query and request.
+class Histogram:
+
+    # Initialize the histogram with its name, help text, label names and the upper bounds of its buckets.
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: Dict[Tuple[str, ...], list] = {}  # Per label values: the count of each bucket, then of +Inf, then the sum.
+        self.lock = threading.Lock()  # Guards the series when the histogram is also updated from worker threads.
+
+    # Record an observation for the given label values.
+    def observe(self, value: float, *label_values: str) -> None:
+
+        index = bisect.bisect_left(self.buckets, value)  # First bucket whose upper bound is at least the value.
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    # Render the histogram in Prometheus text format, with cumulative bucket counts.
+    def render(self) -> List[str]:
+
+        with self.lock:
+            series_items = sorted((label_values, list(series)) for label_values, series in self.series.items())
+
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, series in series_items:
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                bucket_labels = format_labels(self.label_names, label_values, extra='le="' + str(upper_bound) + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# MetricsRegistry holds the metrics of the worker process and renders them in Prometheus text format.
+# It follows the Singleton pattern so that repositories, middlewares and the engine event hooks record into the same metrics.
+# Gauges are read from their collect function when the metrics are rendered, so they cost nothing between scrapes.
+class MetricsRegistry:
+    _instance = None
+
+    def __new__(cls):
+
+        if cls._instance is None:
+            cls._instance = super(MetricsRegistry, cls).__new__(cls)
+            cls._instance.repository_method_duration = Histogram(
+                name=Metric.REPOSITORY_METHOD_DURATION_SECONDS,
+                documentation="Duration of repository methods in seconds.",
+                label_names=("repository", "method"),
+                buckets=LATENCY_BUCKETS
+            )
+            cls._instance.http_request_duration = Histogram(
+                name=Metric.HTTP_REQUEST_DURATION_SECONDS,
+                documentation="Duration of HTTP requests in seconds, until the whole response was sent.",
+                label_names=("method", "route", "status"),
+                buckets=LATENCY_BUCKETS
+            )
+            cls._instance.http_request_queries = Histogram(
+                name=Metric.HTTP_REQUEST_QUERIES,
+                documentation="Number of database queries run by an HTTP request.",
+                label_names=("method", "route"),
+                buckets=QUERY_COUNT_BUCKETS
+            )
+            cls._instance.db_queries = Counter(
+                name=Metric.DB_QUERIES_TOTAL,
+                documentation="Number of database queries run by the worker."
+            )
+            cls._instance.gauges = {}
+        return cls._instance
+
+    # Register a gauge whose values, keyed by label values, are returned by collect when the metrics are rendered.
+    def add_gauge(self, name: str, documentation: str, label_names: Tuple[str, ...], collect: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        self.gauges[name] = (documentation, label_names, collect)
+
+    # Count one query for the worker and for the request being handled, if any.
+    def record_query(self) -> None:
+
+        self.db_queries.inc()
+        query_count = request_query_count.get()
+        if query_count is not None:
+            query_count[0] += 1
+
+    # Render every metric in Prometheus text format.
+    def render(self) -> str:
+
+        lines: List[str] = []
+        for metric in (self.http_request_duration, self.http_request_queries, self.repository_method_duration, self.db_queries):
+            lines.extend(metric.render())
+
+        for name, (documentation, label_names, collect) in self.gauges.items():
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge"])
+            for label_values, value in collect().items():
+                lines.append(f"{name}{format_labels(label_names, label_values)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Decorator recording the duration of a repository method in the repository method histogram.
+# It replaces the datetime.now() pairs and "Execution time" log lines of the repositories: perf_counter_ns is a
+# monotonic clock read without a datetime object, and the durations can be aggregated instead of only being logged.
+# Coroutines, async generators and plain methods are supported; a generator is measured until it is exhausted or closed.
+def measure_execution_time(function: Callable) -> Callable:
+
+    histogram = MetricsRegistry().repository_method_duration
+    repository, method = function.__qualname__.split(".")[-2:]
+
+    if inspect.isasyncgenfunction(function):
+
+        @functools.wraps(function)
+        async def async_generator_wrapper(*args, **kwargs):
+            start_time = time.perf_counter_ns()
+            generator = function(*args, **kwargs)
+            try:
+                async for item in generator:
+                    yield item
+            finally:
+                await generator.aclose()
+                histogram.observe((time.perf_counter_ns() - start_time) / 1e9, repository, method)
+
+        return async_generator_wrapper
+
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def coroutine_wrapper(*args, **kwargs):
+            start_time = time.perf_counter_ns()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                histogram.observe((time.perf_counter_ns() - start_time) / 1e9, repository, method)
+
+        return coroutine_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe((time.perf_counter_ns() - start_time) / 1e9, repository, method)
+
+    return wrapper
@@ -0,0 +1,90 @@
+import numpy as np
+#
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, List
+
+# Smallest and largest amounts, in minor units, that fit the BIGINT money columns
+MIN_MINOR_UNITS: int = -(2 ** 63)
+MAX_MINOR_UNITS: int = 2 ** 63 - 1
+
+
+# Money is an amount in a currency, held as an integer number of the currency's minor units, e.g. cents.
+# The exponent is the number of decimal places of the minor unit, taken from the currency (CurrencyLK.exponent).
+# Amounts are stored, compared and summed as integers; only requests and responses use major units, e.g. dollars.
+@dataclass(frozen=True)
+class Money:
+
+    minor_units: int
+    exponent: int
+
+    # Build an amount from a value in major units, e.g. 12.34 dollars.
+    # Floats are read through their shortest decimal representation, so 0.1 is exactly ten cents.
+    # Raises ValueError when the value has more decimal places than the currency or does not fit a BIGINT column.
+    @classmethod
+    def from_major_units(cls, amount, exponent: int) -> "Money":
+
+        try:
+            major_units = Decimal(str(amount))
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount {amount}")
+
+        if not major_units.is_finite():
+            raise ValueError(f"Invalid amount {amount}")
+
+        minor_units = major_units.scaleb(exponent)
+        if minor_units != minor_units.to_integral_value():
+            raise ValueError(f"Amount {amount} has more than {exponent} decimal places")
+
+        minor_units = int(minor_units)
+        if not MIN_MINOR_UNITS <= minor_units <= MAX_MINOR_UNITS:
+            raise ValueError(f"Amount {amount} is out of range")
+
+        return cls(minor_units=minor_units, exponent=exponent)
+
+    # Return the exact amount in major units.
+    def to_major_units(self) -> Decimal:
+        return Decimal(self.minor_units).scaleb(-self.exponent)
+
+    # Return the amount in major units as the float written to JSON responses.
+    # Integer true division is correctly rounded, so this is the float closest to the exact amount.
+    def __float__(self) -> float:
+        return self.minor_units / 10 ** self.exponent
+
+    # Format the amount with all decimal places of the currency, e.g. 12.50.
+    def __str__(self) -> str:
+        return f"{self.to_major_units():.{self.exponent}f}"
+
+
+# Build an int64 column from amounts in minor units, e.g. the amounts of fetched rows, for vectorised arithmetic.
+def to_minor_units_column(minor_units: Iterable[int], count: int = -1) -> np.ndarray:
+    return np.fromiter(minor_units, dtype=np.int64, count=count)
+
+
+# Convert a column of amounts in minor units to major units for a response, with one vector division.
+# Like Money.__float__, every value is the float closest to the exact amount while it is below 2 ** 53 minor units.
+def to_major_units(minor_units: np.ndarray, exponent: int) -> List[float]:
+    return (minor_units / 10 ** exponent).tolist()
+
+
+# Total the credits and debits of every account over a chunk of transactions, as exact int64 vector sums.
+# The transaction columns are parallel arrays; payer and payee ids of 0 stand for deposits and withdrawals without that side.
+# The totals are added in place to the credits and debits arrays, which are indexed like the account_ids array,
+# so a job can feed the transaction table chunk by chunk without ever holding all of it.
+# Account ids are auto-incremented, so they are mapped to their index through a table as long as the largest id.
+def add_account_totals(
+    account_ids: np.ndarray,
+    credits: np.ndarray,
+    debits: np.ndarray,
+    payer_account_ids: np.ndarray,
+    payee_account_ids: np.ndarray,
+    amounts: np.ndarray
+) -> None:
+
+    positions = np.full(int(account_ids.max(initial=0)) + 2, -1, dtype=np.int64)
+    positions[account_ids] = np.arange(len(account_ids))
+
+    for side_account_ids, totals in ((payee_account_ids, credits), (payer_account_ids, debits)):
+        indexes = positions[np.clip(side_account_ids, 0, len(positions) - 1)]  # Ids of unknown accounts map to -1.
+        known = indexes >= 0
+        np.add.at(totals, indexes[known], amounts[known])
@@ -0,0 +1,33 @@
+import orjson
+#
+from datetime import date, datetime, time
+from fastapi.responses import JSONResponse
+from typing import Any
+
+# Datetimes are passed to the default hook rather than written in orjson's RFC 3339 form,
+# so that they keep the "YYYY-MM-DD HH:MM:SS" form the clients split on.
+SERIALIZE_OPTIONS: int = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+# Encode the values orjson leaves to the caller: dates and times, as str() writes them.
+def serialize_default(value: Any) -> Any:
+
+    if isinstance(value, (datetime, date, time)):
+        return str(value)
+
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+# Serialize response content to JSON bytes in one pass.
+# DTO dataclasses such as BaseResponseDTO are encoded by orjson's compiled dataclass support,
+# so no intermediate dictionary is built; the output matches JSONResponse for the same content.
+def serialize(content: Any) -> bytes:
+    return orjson.dumps(content, default=serialize_default, option=SERIALIZE_OPTIONS)
+
+
+# ORJSONResponse is the JSON response of the controllers and middlewares.
+# It accepts a response DTO as its content directly and renders it with orjson.
+class ORJSONResponse(JSONResponse):
+
+    def render(self, content: Any) -> bytes:
+        return serialize(content)
@@ -0,0 +1,58 @@
+import asyncio
+import bcrypt
+#
+from concurrent.futures import Executor
+#
+from abstractions.utility import IUtility
+
+
+# PasswordUtility hashes and verifies passwords with bcrypt, each password with its own random salt.
+# bcrypt deliberately burns hundreds of milliseconds of CPU per call, so every call runs on the given executor
+# instead of the event loop; the executor's worker count caps how many hashes run at once, and further calls queue.
+# bcrypt releases the GIL while hashing, so a thread pool hashes in parallel without blocking the event loop.
+class PasswordUtility(IUtility):
+
+    # Hash compared against when no user matches the email, so an unknown email takes as long as a wrong password.
+    # It is built on first use with the configured cost.
+    dummy_hash: bytes = None
+
+    # Initialize the utility with the executor running bcrypt, the bcrypt cost of new hashes,
+    # and the shared salt that passwords were hashed with before per-user salts.
+    def __init__(self, executor: Executor, rounds: int = 12, legacy_salt: str = None, urn: str = None) -> None:
+        super().__init__(urn)
+        self.executor = executor
+        self.rounds = rounds
+        self.legacy_salt = legacy_salt
+
+    # Run a bcrypt function on the executor and wait for its result without blocking the event loop.
+    async def run_in_executor(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # Return the bcrypt hash of the password with a new random salt.
+    async def hash(self, password: str) -> str:
+
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self.run_in_executor(bcrypt.hashpw, password.encode("utf8"), salt)
+        return hashed.decode("utf8")
+
+    # Return whether the password matches the stored hash.
+    # The salt and cost are read from the stored hash, so hashes made with the former shared salt verify as well.
+    # Without a stored hash the password is checked against a dummy hash and False is returned.
+    async def verify(self, password: str, hashed: str = None) -> bool:
+
+        if not hashed:
+            if not PasswordUtility.dummy_hash:
+                PasswordUtility.dummy_hash = await self.run_in_executor(bcrypt.hashpw, b"", bcrypt.gensalt(rounds=self.rounds))
+            await self.run_in_executor(bcrypt.checkpw, password.encode("utf8"), PasswordUtility.dummy_hash)
+            return False
+
+        return await self.run_in_executor(bcrypt.checkpw, password.encode("utf8"), hashed.encode("utf8"))
+
+    # Return whether a stored hash should be replaced after a successful login,
+    # because it was made with the former shared salt or with a lower cost than the current one.
+    def needs_rehash(self, hashed: str) -> bool:
+
+        if self.legacy_salt and hashed.startswith(self.legacy_salt):
+            return True
+
+        return int(hashed.split("$")[2]) < self.rounds
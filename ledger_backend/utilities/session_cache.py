@@ -0,0 +1,48 @@
+import time
+#
+from abstractions.cache import ICache
+from abstractions.utility import IUtility
+#
+from constants.cache_key import CacheKey
+
+
+# SessionCacheUtility records logouts in the logout cache, so every worker stops trusting the login sessions it cached.
+# Workers cache a confirmed session under its token with the time it was confirmed; a logout stores its own time under the user,
+# and a cached session confirmed before the user's last logout is checked in the database again.
+# With the Redis backend a logout is seen by every worker on their next request, not only by the worker serving it.
+# A failing cache backend never fails a request: cached sessions are checked in the database and failed writes are only logged.
+class SessionCacheUtility(IUtility):
+
+    # Initialize the utility with the shared cache backend and the request context used for logging.
+    def __init__(self, cache: ICache, urn: str = None, user_urn: str = None, api_name: str = None) -> None:
+        super().__init__(urn, user_urn, api_name)
+        self.cache = cache
+
+    # Return the current time in nanoseconds, the clock sessions are confirmed and logouts are recorded with.
+    @staticmethod
+    def now() -> int:
+        return time.time_ns()
+
+    # Return whether a session of the user confirmed at the given time is still trusted, that is no logout was recorded since.
+    async def is_session_current(self, user_id: int, confirmed_on: int) -> bool:
+
+        try:
+            logout = await self.cache.get(CacheKey.USER_LOGOUT.format(user_id=user_id))
+            return logout is None or logout["logged_out_on"] < confirmed_on
+
+        except Exception as err:
+            self.logger.warning(f"{err.__class__} occurred while reading the logout cache, {err}")
+            return False
+
+    # Record that the user logged out now, so sessions confirmed until now are checked in the database again.
+    # Must be called after the logout is committed, or a worker could confirm the session again before it is.
+    async def set_logged_out(self, user_id: int) -> None:
+
+        try:
+            await self.cache.set_many_if_newer(
+                {CacheKey.USER_LOGOUT.format(user_id=user_id): {"logged_out_on": self.now()}},
+                version_field="logged_out_on"
+            )
+
+        except Exception as err:
+            self.logger.warning(f"{err.__class__} occurred while writing the logout cache, {err}")
@@ -0,0 +1,56 @@
+import threading
+import time
+#
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+# TTLCache is a small in-process cache whose entries expire after a fixed time-to-live.
+# When the cache is full the least recently used entry is evicted, so memory stays bounded.
+# A single instance is shared by all requests of a worker, which is why it is not bound to a request URN like other utilities.
+class TTLCache:
+
+    # Initialize the cache with the time-to-live of an entry in seconds and the maximum number of entries kept.
+    def __init__(self, ttl_seconds: float, max_size: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.lock = threading.Lock()  # Guards the entries when the cache is also used from worker threads.
+
+    # Return the cached value for the key, or None if it is missing or expired.
+    def get(self, key: Hashable) -> Optional[Any]:
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]  # Drop the expired entry so it is looked up again.
+                return None
+
+            self.entries.move_to_end(key)  # Mark the entry as recently used.
+            return value
+
+    # Store the value for the key, evicting the least recently used entry if the cache is full.
+    def set(self, key: Hashable, value: Any) -> None:
+
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    # Remove the entry for the key, if any.
+    def delete(self, key: Hashable) -> None:
+
+        with self.lock:
+            self.entries.pop(key, None)
+
+    # Remove every entry.
+    def clear(self) -> None:
+
+        with self.lock:
+            self.entries.clear()
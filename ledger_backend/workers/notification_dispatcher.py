@@ -0,0 +1,211 @@
+# Import necessary Python libraries for the background loop and building emails
+import asyncio
+import ulid
+#
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+#
+from abstractions.email_transport import IEmailTransport
+#
+from constants.notification_status import NotificationStatus
+#
+from factories.email_transport import EmailTransportFactory
+#
+from repositories.notification_outbox import AsyncNotificationOutboxRepository
+#
+from start_utils import (
+    logger,
+    dispose_database,
+    get_async_session_factory,
+    SENDER_EMAIL,
+    NOTIFICATION_BATCH_SIZE,
+    NOTIFICATION_LEASE_SECONDS,
+    NOTIFICATION_MAX_ATTEMPTS,
+    NOTIFICATION_POLL_INTERVAL_SECONDS,
+    NOTIFICATION_RETRY_BACKOFF_SECONDS,
+    NOTIFICATION_TRANSPORT
+)
+
+
+# The NotificationDispatcher delivers the notifications written to the outbox by the services.
+# It claims due notifications in batches, sends a whole batch over the transport's single connection from a worker thread,
+# and records the outcome: SENT on success, or a retry with exponential backoff until the attempts run out and it is FAILED.
+# The claim, the delivery and the outcome are three steps, so no database transaction is held open while the emails are sent:
+# the claim leases the batch to this dispatcher and is committed before sending, and the outcome is committed afterwards.
+# A batch whose outcome is never recorded, because the dispatcher stopped while sending it, is delivered again once its lease ends.
+class NotificationDispatcher:
+
+    # Initialize the dispatcher with the transport to deliver with and its batching and retry settings
+    def __init__(
+        self,
+        transport: IEmailTransport,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        poll_interval_seconds: float = NOTIFICATION_POLL_INTERVAL_SECONDS,
+        max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+        retry_backoff_seconds: float = NOTIFICATION_RETRY_BACKOFF_SECONDS,
+        lease_seconds: float = NOTIFICATION_LEASE_SECONDS
+    ) -> None:
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.stop_event = asyncio.Event()
+        self.task: asyncio.Task = None
+
+    # Start the dispatch loop as a background task of the running event loop
+    def start(self) -> None:
+
+        logger.info("Starting notification dispatcher")
+        self.task = asyncio.create_task(self.run_forever())
+
+    # Stop the dispatch loop after the batch in progress and close the transport
+    async def stop(self) -> None:
+
+        logger.info("Stopping notification dispatcher")
+        self.stop_event.set()
+        if self.task:
+            await self.task
+        await asyncio.to_thread(self.transport.close)
+        logger.info("Stopped notification dispatcher")
+
+    # Dispatch batches until stopped, waiting between polls only when the outbox has been drained
+    async def run_forever(self) -> None:
+
+        while not self.stop_event.is_set():
+
+            try:
+                dispatched = await self.dispatch_batch()
+
+            except Exception as err:
+                logger.error(f"{err.__class__} error occurred while dispatching notifications: {err}")
+                dispatched = 0
+
+            if dispatched < self.batch_size:
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    # Claim one batch of due notifications, deliver it and record the outcome; returns the number of notifications handled
+    async def dispatch_batch(self) -> int:
+
+        claim_urn = f"NOTIFICATION_CLAIM_{ulid.ulid()}"
+
+        # Claim the batch in a short transaction of its own
+        async with get_async_session_factory()() as session:
+
+            notification_outbox_repository = AsyncNotificationOutboxRepository(session=session)
+            now = datetime.now()
+            claimed = await notification_outbox_repository.claim_due_records(
+                limit=self.batch_size,
+                now=now,
+                lease_until=now + timedelta(seconds=self.lease_seconds),
+                claim_urn=claim_urn
+            )
+            await session.commit()
+
+            if not claimed:
+                return 0
+
+            # Build the messages here, so the worker thread never touches the ORM objects
+            notifications = await notification_outbox_repository.retrieve_records_by_claim_urn(claim_urn=claim_urn)
+            notification_ids = [notification.id for notification in notifications]
+            messages = [self.build_message(notification=notification) for notification in notifications]
+
+        # Deliver the batch outside of any database transaction
+        errors = await asyncio.to_thread(self.deliver, messages)
+
+        # Record the outcome in a second transaction, for the notifications whose lease has not been taken over meanwhile
+        async with get_async_session_factory()() as session:
+
+            notification_outbox_repository = AsyncNotificationOutboxRepository(session=session)
+            notifications = await notification_outbox_repository.retrieve_records_by_claim_urn(claim_urn=claim_urn)
+            errors_by_id = dict(zip(notification_ids, errors))
+
+            now = datetime.now()
+            for notification in notifications:
+                error = errors_by_id[notification.id]
+                notification.attempts += 1
+                notification.claim_urn = None
+                notification.updated_on = now
+
+                if not error:
+                    notification.status = NotificationStatus.SENT
+                    notification.sent_on = now
+                    notification.last_error = None
+
+                elif notification.attempts >= self.max_attempts:
+                    notification.status = NotificationStatus.FAILED
+                    notification.last_error = error
+
+                else:
+                    notification.status = NotificationStatus.PENDING
+                    notification.last_error = error
+                    notification.next_attempt_on = now + timedelta(
+                        seconds=self.retry_backoff_seconds * 2 ** (notification.attempts - 1)
+                    )
+
+            await session.commit()
+
+        sent = sum(1 for error in errors if not error)
+        logger.info(f"Dispatched {len(messages)} notifications, {sent} sent")
+        return len(messages)
+
+    # Build the email of an outbox notification
+    def build_message(self, notification) -> EmailMessage:
+
+        message = EmailMessage()
+        message["From"] = SENDER_EMAIL
+        message["To"] = notification.recipient_email
+        message["Subject"] = notification.subject
+        message.set_content(notification.body)
+        return message
+
+    # Send the messages one after another over the transport, returning the error of each message or None if it was sent
+    # Once the transport cannot connect, the rest of the batch fails with the same error without trying to connect again
+    def deliver(self, messages: List[EmailMessage]) -> List[Optional[str]]:
+
+        errors: List[Optional[str]] = []
+        for message in messages:
+
+            try:
+                self.transport.open()
+
+            except Exception as err:
+                logger.error(f"{err.__class__} error occurred while connecting to deliver notifications: {err}")
+                self.transport.close()
+                errors.extend([f"{err.__class__.__name__}: {err}"] * (len(messages) - len(errors)))
+                break
+
+            try:
+                self.transport.send(message)
+                errors.append(None)
+
+            except Exception as err:
+                logger.error(f"{err.__class__} error occurred while sending notification to {message['To']}: {err}")
+                self.transport.close()  # Start from a fresh connection for the next message
+                errors.append(f"{err.__class__.__name__}: {err}")
+
+        return errors
+
+
+# Run the dispatcher as a standalone process, for deployments that disable the dispatcher inside the app workers
+async def main() -> None:
+
+    dispatcher = NotificationDispatcher(
+        transport=EmailTransportFactory().build(name=NOTIFICATION_TRANSPORT)
+    )
+    dispatcher.start()
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await dispatcher.stop()
+        await dispose_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
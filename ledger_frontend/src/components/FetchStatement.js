@@ -7,6 +7,16 @@ import DatePicker from 'react-datepicker'; // Importing the DatePicker component
 import 'react-datepicker/dist/react-datepicker.css'; // Importing CSS for DatePicker
 import './FetchStatement.css'; // Import the CSS file for styling
 
+const STATEMENT_PAGE_SIZE = 500; // Number of transactions requested per statement page
+
+/*
+ * Formats a date as a local 'YYYY-MM-DDT00:00:00' timestamp for the statement date range.
+ */
+const formatTimestamp = (date) => {
+  const pad = (value) => String(value).padStart(2, '0');
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T00:00:00`;
+};
+
 /*
  * The FetchStatement component allows users to select an account, pick a date range,
  * provide consent, and fetch a financial statement. It also manages user logout functionality.
@@ -135,31 +145,42 @@ function FetchStatement() {
       return;
     }
 
-    try {
-      const response = await axios({
-        method: 'post',
-        url: 'http://127.0.0.1:8002/apis/fetch/statement',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`, // Add the token in Authorization header
-        },
-        data: {
-          reference_number,
-          purpose: purpose || 'viewing the statement', // Use default if empty
-          account_urn: accountURN,
-          consent,
-        },
-      });
+    const inclusiveToDate = new Date(toDate);
+    inclusiveToDate.setDate(inclusiveToDate.getDate() + 1); // Ensure 'To Date' includes the full day
 
-      if (response.status === 200) {
-        const inclusiveToDate = new Date(toDate);
-        inclusiveToDate.setDate(inclusiveToDate.getDate() + 1); // Ensure 'To Date' includes the full day
+    try {
+      // The statement API is paginated; follow next_cursor until every page of the date range is loaded
+      let transactions = [];
+      let cursor = null;
 
-        // Navigate to the statement details page with the fetched data
-        navigate('/statement-details', {
-          state: { data: response.data.data, fromDate, toDate: inclusiveToDate },
+      do {
+        const response = await axios({
+          method: 'post',
+          url: 'http://127.0.0.1:8002/apis/fetch/statement',
+          headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${token}`, // Add the token in Authorization header
+          },
+          data: {
+            reference_number,
+            purpose: purpose || 'viewing the statement', // Use default if empty
+            account_urn: accountURN,
+            consent,
+            from_timestamp: formatTimestamp(fromDate),
+            to_timestamp: formatTimestamp(inclusiveToDate),
+            limit: STATEMENT_PAGE_SIZE,
+            cursor,
+          },
         });
-      }
+
+        transactions = transactions.concat(response.data.data.transactions);
+        cursor = response.data.data.next_cursor;
+      } while (cursor);
+
+      // Navigate to the statement details page with the fetched data
+      navigate('/statement-details', {
+        state: { data: transactions, fromDate, toDate: inclusiveToDate },
+      });
     } catch (error) {
       if (error.response && error.response.data) {
         setResponseMessage(error.response.data.response_message || 'Statement fetching failed.');